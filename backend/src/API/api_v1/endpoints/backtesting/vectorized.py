@@ -0,0 +1,88 @@
+"""Async endpoint of the vectorized backtest, over the stored klines.
+
+The klines are obtained as the klines endpoints do (sharing their
+coalesced queries) and the classification and backtest run on the
+threadpool; concurrent identical backtests are coalesced too.
+"""
+
+# pylint: disable=no-name-in-module
+
+from typing import Optional
+
+from fastapi import APIRouter, Body, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from .....config.preferences import Trading
+from .....lib.marketdata.klines.base import DF
+from .....lib.marketdata.klines.operators.classifiers.didi_v1 import Setup
+from .....lib.trading.vectorized_backtest import (
+    BacktestSummary,
+    backtest,
+    summarize,
+)
+from .....services.backtesting.runner import warm_up_samples
+from .....utils.exceptions import TimeFormatError
+from .....utils.tools.time_handlers import int_timestamp, time_frame_to_seconds
+from ..klines import (
+    KlinesRange,
+    KlinesRequest,
+    coalescer,
+    get_klines,
+    validate_klines_range,
+    validate_klines_request,
+)
+
+endpoint = APIRouter()
+
+
+def _backtest(
+    klines: DF, since: int, setup: Setup, trading: Trading
+) -> BacktestSummary:
+    klines = klines.copy()  # The shared klines are not modified
+    klines.classifier.didi.apply(setup)
+    result = backtest(klines[klines.Open_time >= since], trading=trading)
+    return summarize(result)
+
+
+@endpoint.post(
+    "/{broker_name}/{ticker_symbol}", response_model=BacktestSummary
+)
+async def run_backtest(
+    broker_name: str,
+    ticker_symbol: str,
+    since: str = Query(...),
+    until: str = Query(...),
+    setup: Optional[Setup] = Body(None),
+    trading: Optional[Trading] = Body(None),
+) -> BacktestSummary:
+    """Backtests the Didi classifier (score-threshold strategy) over the
+    stored klines of [since, until], plus the classifier warm up ones
+    before it."""
+
+    setup, trading = setup or Setup(), trading or Trading()
+    validate_klines_request(broker_name, ticker_symbol, setup.time_frame)
+    try:
+        _since = int_timestamp(since)
+    except TimeFormatError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+
+    warm_up = warm_up_samples(setup) * time_frame_to_seconds(setup.time_frame)
+    request = KlinesRequest(
+        broker_name=broker_name,
+        ticker_symbol=ticker_symbol,
+        time_frame=setup.time_frame,
+        klines_range=KlinesRange(since=str(_since - warm_up), until=until),
+    )
+    validate_klines_range(request.klines_range)
+
+    async def summary() -> BacktestSummary:
+        klines = await get_klines(request)
+        if not len(klines[klines.Open_time >= _since]):
+            raise HTTPException(status_code=404, detail="No stored klines")
+        return await run_in_threadpool(
+            _backtest, klines, _since, setup, trading
+        )
+
+    return await coalescer.run(
+        ("backtest", setup.json(), trading.json(), *request.key()), summary
+    )
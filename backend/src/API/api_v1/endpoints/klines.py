@@ -0,0 +1,225 @@
+"""Async klines and indicators endpoints.
+
+The event loop never waits on the storage nor on the broker: the klines
+of the broker are requested through its async client, while the
+blocking work (the storage queries, the getters set up and the
+indicators computation) runs on the threadpool. Concurrent identical
+requests are coalesced, sharing a single upstream query.
+"""
+
+# pylint: disable=no-name-in-module
+# pylint: disable=too-few-public-methods
+
+import re
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from ....lib.brokers_wrappers import BrokerFabric
+from ....lib.marketdata.klines.base import DF
+from ....lib.marketdata.klines.from_broker import GetterFromBroker
+from ....lib.marketdata.klines.operators.indicators import (
+    bollinger_bands,
+    didi_index,
+    simple_moving_average as sma,
+)
+from ....lib.marketdata.klines.storage import GetterFromStorage
+from ....utils.exceptions import (
+    BrokerError,
+    KlinesError,
+    StorageError,
+    TimeFormatError,
+)
+from ....utils.schemas.generics import Ticker
+from ....utils.tools.coalescing import RequestCoalescer
+from ....utils.tools.formatting import json_columns
+from ....utils.tools.time_handlers import int_timestamp
+
+endpoint = APIRouter()
+
+coalescer = RequestCoalescer()
+
+getters = dict(storage=GetterFromStorage, broker=GetterFromBroker)
+
+# Setup model and 'apply' method of each indicator
+indicators: Dict[str, Tuple[Type[BaseModel], Callable]] = dict(
+    sma=(
+        sma.Setup,
+        lambda klines: klines.indicator.simple_moving_average.apply,
+    ),
+    bollinger_bands=(
+        bollinger_bands.Setup,
+        lambda klines: klines.indicator.bollinger_bands.apply,
+    ),
+    didi_index=(
+        didi_index.Setup,
+        lambda klines: klines.indicator.didi_index.apply,
+    ),
+)
+
+
+class KlinesRange(BaseModel):
+    """At least 2 of them, as the 'Getter.get' arguments"""
+
+    since: Optional[str] = None
+    until: Optional[str] = None
+    number_samples: Optional[int] = None
+
+
+class KlinesRequest(BaseModel):
+    broker_name: str
+    ticker_symbol: str
+    time_frame: str
+    source: str = "storage"
+    klines_range: KlinesRange = KlinesRange()
+
+    def key(self) -> tuple:
+        """Identifies the identical requests"""
+
+        return (
+            self.source,
+            self.broker_name.lower(),
+            self.ticker_symbol.upper(),
+            self.time_frame,
+            *self.klines_range.dict().values(),
+        )
+
+
+def validate_klines_request(
+    broker_name: str, ticker_symbol: str, time_frame: str
+) -> None:
+    """The broker must be implemented, the time frame one of its own and
+    the ticker symbol alphanumeric, since they end up on the storage
+    queries.
+
+    Raises:
+        HTTPException: 400, if any of them is not valid.
+    """
+
+    try:
+        time_frames = BrokerFabric(broker_name).real().settings.time_frames
+    except NotImplementedError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    if time_frame not in time_frames:
+        raise HTTPException(
+            status_code=400,
+            detail="time_frame should be in {}".format(time_frames),
+        )
+    if not re.fullmatch("[A-Za-z0-9]+", ticker_symbol):
+        raise HTTPException(
+            status_code=400, detail="ticker_symbol should be alphanumeric"
+        )
+
+
+def validate_klines_range(klines_range: KlinesRange) -> None:
+    """Its since and until, if given, must be timestamps or human
+    readable datetimes.
+
+    Raises:
+        HTTPException: 400, if any of them is not valid.
+    """
+
+    for date_time in (klines_range.since, klines_range.until):
+        if date_time is None:
+            continue
+        try:
+            int_timestamp(date_time)
+        except TimeFormatError as error:
+            raise HTTPException(status_code=400, detail=str(error)) from error
+
+
+def klines_request(
+    broker_name: str,
+    ticker_symbol: str,
+    time_frame: str,
+    source: str = Query("storage", regex="^(storage|broker)$"),
+    klines_range: KlinesRange = Depends(),
+) -> KlinesRequest:
+    """The path and query parameters of the klines endpoints"""
+
+    validate_klines_request(broker_name, ticker_symbol, time_frame)
+    validate_klines_range(klines_range)
+    return KlinesRequest(
+        broker_name=broker_name,
+        ticker_symbol=ticker_symbol,
+        time_frame=time_frame,
+        source=source,
+        klines_range=klines_range,
+    )
+
+
+async def _get_klines(request: KlinesRequest) -> DF:
+    try:
+        getter = await run_in_threadpool(
+            getters[request.source],
+            request.broker_name,
+            Ticker(symbol=request.ticker_symbol.upper()),
+            request.time_frame,
+        )
+        getter.settings.return_as_human_readable = False
+        getter.settings.infinite_request_attempts = False
+        return await getter.async_get(**request.klines_range.dict())
+
+    except (NotImplementedError, ValueError, TimeFormatError) as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    except (BrokerError, StorageError, KlinesError) as error:
+        raise HTTPException(status_code=502, detail=str(error)) from error
+
+
+async def get_klines(request: KlinesRequest) -> DF:
+    """The requested klines (timestamps 'Open_time'); shared by the
+    concurrent identical requests, so it must not be modified."""
+
+    return await coalescer.run(
+        ("klines", *request.key()), lambda: _get_klines(request)
+    )
+
+
+@endpoint.get("/{broker_name}/{ticker_symbol}/{time_frame}")
+async def read_klines(
+    request: KlinesRequest = Depends(klines_request),
+) -> Dict[str, list]:
+    async def columns() -> Dict[str, list]:
+        return await run_in_threadpool(json_columns, await get_klines(request))
+
+    return await coalescer.run(("columns", *request.key()), columns)
+
+
+def _apply_indicator(klines: DF, indicator: str, setup: BaseModel) -> DF:
+    klines = klines.copy()  # The shared klines are not modified
+    indicators[indicator][1](klines)(setup)
+    return klines
+
+
+@endpoint.post(
+    "/{broker_name}/{ticker_symbol}/{time_frame}/indicators/{indicator}"
+)
+async def read_indicator(
+    indicator: str,
+    request: KlinesRequest = Depends(klines_request),
+    setup: Optional[dict] = Body(None),
+) -> Dict[str, list]:
+    """The klines with the columns of the indicator, computed with the
+    setup given on the body (defaults to the indicator one)."""
+
+    if indicator not in indicators:
+        raise HTTPException(
+            status_code=404,
+            detail="Indicator should be in {}".format(list(indicators)),
+        )
+    try:
+        setup = indicators[indicator][0](**(setup or dict()))
+    except ValidationError as error:
+        raise HTTPException(status_code=422, detail=error.errors()) from error
+
+    async def columns() -> Dict[str, list]:
+        klines = await get_klines(request)
+        return await run_in_threadpool(
+            lambda: json_columns(_apply_indicator(klines, indicator, setup))
+        )
+
+    return await coalescer.run(
+        ("indicator", indicator, setup.json(), *request.key()), columns
+    )
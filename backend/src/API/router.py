@@ -1,8 +1,11 @@
 from fastapi import APIRouter
 
-from .api_v1.endpoints import items, users
+from .api_v1.endpoints import items, klines, users
+from .api_v1.endpoints.backtesting import vectorized as backtesting
 
 api = APIRouter()
 
 api.include_router(items.endpoint, prefix="/items")
 api.include_router(users.endpoint, prefix="/users")
+api.include_router(klines.endpoint, prefix="/klines")
+api.include_router(backtesting.endpoint, prefix="/backtesting")
@@ -4,7 +4,9 @@
 # pylint:disable=too-few-public-methods
 # pylint:disable=no-name-in-module
 
+import os
 import sys
+import tempfile
 from typing import Union
 
 from environs import Env
@@ -66,6 +68,11 @@ class InfluxDbSettings(BaseModel):
             password=env.str("INFLUXDB_USER_PASSWORD", default="anansi2020"),
             gzip=env.bool("INFLUXDB_GZIP", default=True),
         )
+        pool_size = env.int("INFLUXDB_POOL_SIZE", default=4)
+        write_batch_size = env.int("INFLUXDB_WRITE_BATCH_SIZE", default=5000)
+        max_pending_writes = env.int(
+            "INFLUXDB_MAX_PENDING_WRITES", default=16
+        )
 
     class V2:
         credentials = dict(
@@ -76,6 +83,11 @@ class InfluxDbSettings(BaseModel):
             org=env.str("DOCKER_INFLUXDB_INIT_ORG", default="anansi"),
             debug=False,
         )
+        pool_size = env.int("INFLUXDB_POOL_SIZE", default=4)
+        write_batch_size = env.int("INFLUXDB_WRITE_BATCH_SIZE", default=5000)
+        max_pending_writes = env.int(
+            "INFLUXDB_MAX_PENDING_WRITES", default=16
+        )
         write_opts = dict(
             batch_size=1000,
             flush_interval=1000,
@@ -88,6 +100,30 @@ class InfluxDbSettings(BaseModel):
         system_columns = ["result", "table", "_start", "_stop", "_measurement"]
 
 
+class KlinesCacheSettings(BaseModel):
+    # Opt-in; under the user cache directory, not the working one
+    enabled: bool = env.bool("KLINES_CACHE_ENABLED", default=False)
+    directory: str = env.str(
+        "KLINES_CACHE_DIRECTORY",
+        default=os.path.join(
+            os.environ.get("XDG_CACHE_HOME")
+            or os.path.join(os.path.expanduser("~"), ".cache"),
+            "anansi",
+            "klines",
+        ),
+    )
+
+
+class SharedKlinesSettings(BaseModel):
+    # On a RAM filesystem, if there is one
+    directory: str = env.str(
+        "SHARED_KLINES_DIRECTORY",
+        default="/dev/shm/anansi_klines"
+        if os.path.isdir("/dev/shm")
+        else os.path.join(tempfile.gettempdir(), "anansi_klines"),
+    )
+
+
 def get_relational_database_settings(
     provider: str,
 ) -> Union[PostgresRelationalDb, SqliteRelationalDb]:
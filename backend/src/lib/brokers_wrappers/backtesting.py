@@ -1,52 +1,333 @@
-from .base import Broker, DocInherit, DF, Order
-from typing import List
+"""Event-driven backtesting engine, behind the 'Broker' interface.
+
+The klines of the backtested tickers are loaded once, as contiguous
+NumPy arrays (one per OHLCV column), and replayed candle by candle: at
+each step the clock of the broker is the close time of the candle just
+closed, so 'get_price' and 'get_klines' are served from memory, never
+seeing a kline closed after the clock (no lookahead), and the orders
+are filled against a simulated wallet, paying 'fee_rate_decimal'.
+"""
+
+# pylint: disable=too-many-instance-attributes
+
+import copy
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from ...config.preferences import BackTesting, initial_wallet
+from ...utils.exceptions import BrokerError
+from ...utils.schemas.generics import Order, Signals, Ticker, Wallet
+from ...utils.tools.time_handlers import int_timestamp, time_frame_to_seconds
+from ..marketdata.klines.operators.indicators.price import columns
+from ..marketdata.klines.resampling import resample
+from .base import DF, Broker, DocInherit
+
+signals = Signals()
+
+klines_columns = ["Open_time", "Open", "High", "Low", "Close", "Volume"]
+
+
+class BackTestingSettings(BaseModel):
+    """Market rules of the simulated broker"""
+
+    min_notional: float = 10.0  # Quote amount, as the Binance spot one
+    price_metrics: str = BackTesting().price_metrics  # Market fill price
+
 
 class BackTestingBroker(Broker):
-    def __init__(self, real_broker:Broker, assets:List[str]):
-        super().__init__()
+    """Simulated broker, which replays stored klines.
+
+    Args:
+        real_broker (Broker): Whose settings (e.g. fees) are simulated.
+        assets (List[Union[str, Ticker]]): Assets whose information must
+        be kept in memory; the 'Ticker' ones have their klines loaded
+        from the storage on the first replay (see 'load_klines', to
+        load them from a dataframe instead).
+        time_frame (str, optional): Of the replayed klines. Defaults to
+        "1m".
+        wallet (Wallet, optional): Initial balance of each asset.
+        Defaults to 'initial_wallet' (config.preferences).
+    """
+
+    def __init__(
+        self,
+        real_broker: Broker,
+        assets: List[Union[str, Ticker]],
+        time_frame: str = "1m",
+        wallet: Optional[Wallet] = None,
+    ):
+        super().__init__(settings=getattr(real_broker, "settings", None))
         self.real_broker = real_broker
         self.assets = assets
-        #self._create_cache()
+        self.time_frame = time_frame
+        self.backtesting_settings = BackTestingSettings()
+        self.wallet: Wallet = dict(wallet or initial_wallet)
+        self.orders: List[Order] = list()
+        self.tickers: Dict[str, Ticker] = dict()
+        self.now: Optional[int] = None  # Close time of the last candle
+
+        self._step = time_frame_to_seconds(time_frame)
+        self._klines: Dict[str, Dict[str, np.ndarray]] = dict()
+        self._cursor: Dict[str, int] = dict()  # Index of the last candle
+
+    def _create_cache(
+        self, since: Optional[int] = None, until: Optional[int] = None
+    ) -> None:
+        """Loads, from the storage, the klines of the 'Ticker' assets
+        not loaded yet."""
+
+        # Local import: the marketdata package imports the brokers one
+        # pylint: disable=import-outside-toplevel
+        from ..marketdata.klines.storage import GetterFromStorage
+
+        broker_name = self.real_broker.__class__.__name__.lower()
+        for ticker in self.assets:
+            if not isinstance(ticker, Ticker):
+                continue
+            if ticker.symbol not in self._klines:
+                getter = GetterFromStorage(
+                    broker_name, ticker, self.time_frame
+                )
+                getter.settings.return_as_human_readable = False
+                kwargs = dict(since=since, until=until)
+                self.load_klines(
+                    ticker,
+                    getter.get(**{k: v for k, v in kwargs.items() if v}),
+                )
+
+    def load_klines(self, ticker: Ticker, klines: DF) -> None:
+        """Keeps the klines (timestamps 'Open_time') of the ticker in
+        memory, as contiguous arrays, ready to be replayed."""
+
+        klines = klines.sort_values("Open_time")
+        arrays = {
+            column: np.ascontiguousarray(klines[column], dtype="float64")
+            for column in klines_columns[1:]
+        }
+        arrays["Open_time"] = np.ascontiguousarray(
+            klines.Open_time, dtype="int64"
+        )
+        arrays["Price"] = np.mean(
+            [
+                arrays[column]
+                for column in columns[self.backtesting_settings.price_metrics]
+            ],
+            axis=0,
+        )
+
+        self.tickers[ticker.symbol] = ticker
+        self._klines[ticker.symbol] = arrays
+        self._cursor[ticker.symbol] = -1
+
+    def replay(self, since=None, until=None) -> Iterator[int]:
+        """Moves the clock, candle by candle, over the loaded klines.
 
-    def _create_cache(self):
-        pass
+        Args:
+            since, until (DateTimeType, optional): Open times of the first
+            and last replayed candles. Default to the loaded range.
+
+        Yields:
+            int: The clock (close time of the candle just closed), after
+            moving it; meanwhile, the broker methods see the market as
+            at that instant.
+        """
+
+        if not self._klines:
+            self._create_cache(since, until)
+        if not self._klines:
+            raise BrokerError("No klines loaded to replay")
+
+        timeline = np.unique(
+            np.concatenate(
+                [arrays["Open_time"] for arrays in self._klines.values()]
+            )
+        )
+        if since is not None:
+            timeline = timeline[timeline >= int_timestamp(since)]
+        if until is not None:
+            timeline = timeline[timeline <= int_timestamp(until)]
+
+        # Vectorized: the candle of each ticker at every step
+        positions = {
+            symbol: np.searchsorted(arrays["Open_time"], timeline, "right") - 1
+            for symbol, arrays in self._klines.items()
+        }
+        for step, open_time in enumerate(timeline.tolist()):
+            for symbol, position in positions.items():
+                self._cursor[symbol] = int(position[step])
+            self.now = open_time + self._step
+            yield self.now
+
+    def _arrays(self, ticker_symbol: str) -> Dict[str, np.ndarray]:
+        try:
+            return self._klines[ticker_symbol]
+        except KeyError as error:
+            raise BrokerError(
+                "No klines loaded for {}".format(ticker_symbol)
+            ) from error
+
+    def _current(self, ticker_symbol: str, column: str) -> float:
+        """'column' value of the last candle closed of the ticker"""
+
+        cursor = self._cursor.get(ticker_symbol, -1)
+        if cursor < 0:
+            raise BrokerError(
+                "No {} candle closed yet, at {}".format(
+                    ticker_symbol, self.now
+                )
+            )
+        return float(self._arrays(ticker_symbol)[column][cursor])
 
     @DocInherit
     def server_time(self) -> int:
-        pass
+        return self.now
 
     @DocInherit
     def max_requests_limit_hit(self) -> bool:
-        pass
+        return False
 
     @DocInherit
     def get_klines(self, ticker_symbol: str, time_frame: str, **kwargs) -> DF:
-        pass
+        arrays = self._arrays(ticker_symbol)
+        last = self._cursor.get(ticker_symbol, -1) + 1
+        open_times = arrays["Open_time"][:last]
+
+        first = 0
+        if kwargs.get("since"):
+            first = np.searchsorted(
+                open_times, int_timestamp(kwargs["since"]), "left"
+            )
+        if kwargs.get("until"):
+            last = np.searchsorted(
+                open_times, int_timestamp(kwargs["until"]), "right"
+            )
+        klines = pd.DataFrame(
+            {
+                column: arrays[column][first:last]
+                for column in klines_columns
+            }
+        )
+        if time_frame != self.time_frame:
+            klines = resample(klines, time_frame, self.time_frame)
+
+        number_samples = kwargs.get("number_samples")
+        if number_samples:
+            klines = (
+                klines[:number_samples]
+                if kwargs.get("since") and not kwargs.get("until")
+                else klines[-number_samples:]
+            )
+        return klines.reset_index(drop=True)
 
     @DocInherit
     def get_price(self, ticker_symbol: str, **kwargs) -> float:
-        raise NotImplementedError
+        return self._current(ticker_symbol, "Price")
 
     @DocInherit
     def ticker_info(self, ticker_symbol: str) -> dict:
-        raise NotImplementedError
+        ticker = self.tickers[ticker_symbol]
+        return dict(
+            symbol=ticker.symbol,
+            baseAsset=ticker.base,
+            quoteAsset=ticker.quote,
+            minNotional=self.backtesting_settings.min_notional,
+        )
 
     @DocInherit
     def free_quantity_asset(self, asset_symbol: str) -> float:
-        raise NotImplementedError
+        return self.wallet.get(asset_symbol, 0.0)
 
     @DocInherit
     def min_notional(self, ticker_symbol: str) -> float:
-        raise NotImplementedError
+        return self.backtesting_settings.min_notional
 
     @DocInherit
     def minimal_order_quantity(self, ticker_symbol) -> float:
-        raise NotImplementedError
+        min_notional = self.min_notional(ticker_symbol)
+        price = self.get_price(ticker_symbol)
+
+        return 1.03 * min_notional / price
+
+    def _fill_price(self, order: Order) -> Optional[float]:
+        """Market orders are filled at the price of the last candle; the
+        limit ones, at their price, if the candle traded at it."""
+
+        if order.order_type != "limit":
+            return self.get_price(order.ticker_symbol)
+
+        low = self._current(order.ticker_symbol, "Low")
+        high = self._current(order.ticker_symbol, "High")
+        return order.price if low <= order.price <= high else None
 
     @DocInherit
-    def execute_order(self, order: Order):
-        raise NotImplementedError
+    def execute_order(self, order: Order) -> Order:
+        if order.signal == signals.hold:
+            order.warnings = "By pass due to hold signal"
+            return order
+
+        if order.signal not in (signals.buy, signals.sell):
+            order.warnings = "Signal '{}' not supported on backtesting".format(
+                order.signal
+            )
+            return order
+
+        ticker = self.tickers[order.ticker_symbol]
+        price = self._fill_price(order)
+        if price is None:
+            order.warnings = "Limit price not reached"
+            return order
+
+        quantity = order.quantity or 0.0
+        notional = price * quantity
+        fee = self.settings.fee_rate_decimal * notional
+        if notional < self.min_notional(order.ticker_symbol):
+            order.warnings = "Insufficient quantity"
+            return order
+
+        if order.signal == signals.buy:
+            if self.free_quantity_asset(ticker.quote) < notional + fee:
+                order.warnings = "Insufficient balance"
+                return order
+            self.wallet[ticker.quote] -= notional + fee
+            self.wallet[ticker.base] = self.wallet.get(ticker.base, 0.0)
+            self.wallet[ticker.base] += quantity
+        else:
+            if self.free_quantity_asset(ticker.base) < quantity:
+                order.warnings = "Insufficient balance"
+                return order
+            self.wallet[ticker.base] -= quantity
+            self.wallet[ticker.quote] = self.wallet.get(ticker.quote, 0.0)
+            self.wallet[ticker.quote] += notional - fee
+
+        order.price = price
+        order.timestamp = self.now
+        order.fulfilled = True
+        order.fee = fee
+        order.id_by_broker = str(len(self.orders) + 1)
+        self.orders.append(order)
+        return order
 
     @DocInherit
-    def execute_test_order(self, order: Order):
-        raise NotImplementedError
+    def execute_test_order(self, order: Order) -> Order:
+        wallet, orders = copy.copy(self.wallet), copy.copy(self.orders)
+        order = self.execute_order(order.copy(update=dict(test_order=True)))
+        self.wallet, self.orders = wallet, orders
+        return order
+
+    def portfolio_value(self, quote: str) -> float:
+        """Value of the wallet, in 'quote', at the current clock; assets
+        without a loaded ticker to 'quote' are not accounted."""
+
+        value = 0.0
+        for asset, amount in self.wallet.items():
+            if asset == quote:
+                value += amount
+                continue
+            for symbol, ticker in self.tickers.items():
+                if ticker.base == asset and ticker.quote == quote:
+                    value += amount * self.get_price(symbol)
+                    break
+        return value
@@ -5,12 +5,18 @@
 # pylint: disable=too-few-public-methods
 
 
-from typing import Union
+import asyncio
+import threading
+import time
+from typing import Dict, Mapping, Tuple, Union
 
+import aiohttp
 import pandas as pd
 import requests
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 
+from ...utils.exceptions import BrokerError
 from ...utils.schemas.generics import Order, Quantity
 from ...utils.tools.documentation import DocInherit
 from ...utils.tools.formatting import FormatKlines
@@ -18,17 +24,246 @@ from ...utils.tools.formatting import FormatKlines
 DF = pd.core.frame.DataFrame
 
 
-def get_response(endpoint: str) -> Union[requests.models.Response, None]:
-    """A try/cath to handler with request/response."""
+HTTP_HEADERS = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+
+
+def get_response(
+    endpoint: str, session: requests.Session = None, timeout: float = None
+) -> Union[requests.models.Response, None]:
+    """A try/cath to handler with request/response. If a 'session' is
+    given, its pooled (keep-alive) connections are reused.
+
+    Raises:
+        BrokerError: On connection failures and timeouts.
+    """
     try:
-        response = requests.get(endpoint)
+        response = (session or requests).get(endpoint, timeout=timeout)
         if response.status_code == 200:
             return response
 
         return None
 
-    except ConnectionError as error:
-        raise Exception from error
+    except requests.RequestException as error:
+        raise BrokerError(
+            "Request to {} failed: {}".format(endpoint, error)
+        ) from error
+
+
+async def async_get_response(
+    endpoint: str, session: aiohttp.ClientSession
+) -> Union[Tuple[Union[dict, list], Mapping], None]:
+    """Async counterpart of 'get_response'. As the body of an aiohttp
+    response can only be read inside the request context, returns the
+    decoded json and the headers of the response (or None).
+
+    Raises:
+        BrokerError: On connection failures and timeouts.
+    """
+    try:
+        async with session.get(endpoint) as response:
+            if response.status == 200:
+                return await response.json(), response.headers
+
+            return None
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        raise BrokerError(
+            "Request to {} failed: {}".format(endpoint, error)
+        ) from error
+
+
+_http_sessions: Dict[str, requests.Session] = dict()
+_http_sessions_lock = threading.Lock()
+_async_http_sessions: Dict[tuple, aiohttp.ClientSession] = dict()
+
+
+def http_session(settings: "BrokerSettings") -> requests.Session:
+    """The process wide HTTP session of a broker, which keeps a pool of
+    up to 'settings.http_pool_size' keep-alive connections, so
+    consecutive requests do not pay a new TCP + TLS handshake."""
+
+    with _http_sessions_lock:
+        key = settings.base_endpoint
+        if key not in _http_sessions:
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=settings.http_pool_size
+            )
+            session = requests.Session()
+            session.headers.update(HTTP_HEADERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[key] = session
+        return _http_sessions[key]
+
+
+def async_http_session(settings: "BrokerSettings") -> aiohttp.ClientSession:
+    """Async counterpart of 'http_session'; as an aiohttp session is
+    bound to an event loop, there is one session per broker and loop.
+    The sessions of the closed loops (e.g. of finished 'asyncio.run'
+    calls) are dropped. Must be called from a coroutine."""
+
+    loop = asyncio.get_running_loop()
+    key = (settings.base_endpoint, loop)
+    with _http_sessions_lock:
+        for _key in list(_async_http_sessions):
+            if _key[1].is_closed():
+                del _async_http_sessions[_key]
+
+        session = _async_http_sessions.get(key)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                headers=HTTP_HEADERS,
+                connector=aiohttp.TCPConnector(limit=settings.http_pool_size),
+                timeout=aiohttp.ClientTimeout(total=settings.http_timeout),
+            )
+            _async_http_sessions[key] = session
+        return session
+
+
+def close_http_sessions() -> None:
+    """Closes the pooled connections of all the brokers."""
+
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
+
+async def close_async_http_sessions() -> None:
+    """Closes the async sessions bound to the running event loop."""
+
+    loop = asyncio.get_running_loop()
+    with _http_sessions_lock:
+        sessions = [
+            _async_http_sessions.pop(key)
+            for key in list(_async_http_sessions)
+            if key[1] is loop
+        ]
+    for session in sessions:
+        await session.close()
+
+
+class RequestWeightBucket:
+    """Token bucket which meters the request weight spent against a
+    broker. The bucket holds up to 'weight_per_minute' tokens and is
+    refilled continuously, at 'weight_per_minute / 60' tokens per
+    second; each request takes its weight from the bucket, waiting
+    (only the calling thread) when there are not enough tokens left.
+
+    Args:
+        weight_per_minute (int): The broker limit of request weight per
+        minute. If None, the bucket never blocks.
+    """
+
+    __slots__ = [
+        "capacity",
+        "refill_rate",
+        "_tokens",
+        "_last_refill",
+        "_lock",
+    ]
+
+    def __init__(self, weight_per_minute: int = None):
+        self.capacity = weight_per_minute
+        self.refill_rate = weight_per_minute / 60 if weight_per_minute else 0
+        self._tokens = float(weight_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(
+            self.capacity, self._tokens + elapsed * self.refill_rate
+        )
+        self._last_refill = now
+
+    def available(self) -> float:
+        """Amount of weight that can be spent right now."""
+
+        if not self.capacity:
+            return float("inf")
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, weight: int = 1) -> float:
+        """Takes 'weight' tokens from the bucket, if there are enough.
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise the seconds
+            to wait until the bucket holds the desired weight.
+        """
+
+        if not self.capacity:
+            return 0.0
+        with self._lock:
+            self._refill()
+            if self._tokens >= weight:
+                self._tokens -= weight
+                return 0.0
+            return (weight - self._tokens) / self.refill_rate
+
+    def acquire(self, weight: int = 1) -> None:
+        """Blocks the calling thread until 'weight' tokens are taken."""
+
+        while True:
+            delay = self.try_acquire(weight)
+            if not delay:
+                return
+            time.sleep(delay)
+
+    async def async_acquire(self, weight: int = 1) -> None:
+        """Waits, without blocking the event loop, until 'weight' tokens
+        are taken."""
+
+        while True:
+            delay = self.try_acquire(weight)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def sync(self, used_weight: int) -> None:
+        """Corrects the local prediction with the weight that the broker
+        reports as already used on the current minute. The prediction is
+        only lowered, so requests made by other processes (on the same
+        IP) are taken into account, and out of order responses can not
+        overestimate the budget."""
+
+        if not self.capacity:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = max(
+                0.0, min(self._tokens, self.capacity - used_weight)
+            )
+
+    def drain(self) -> None:
+        """Empties the bucket, e.g. when the broker warns that the
+        limit was hit by requests not accounted here."""
+
+        with self._lock:
+            self._tokens = 0.0
+            self._last_refill = time.monotonic()
+
+
+_request_weight_buckets: Dict[str, RequestWeightBucket] = dict()
+_request_weight_buckets_lock = threading.Lock()
+
+
+def request_weight_bucket(settings: "BrokerSettings") -> RequestWeightBucket:
+    """The process wide 'RequestWeightBucket' of a broker; the same
+    instance is shared by every wrapper (and so every 'Getter') that
+    talks to the same broker base endpoint."""
+
+    with _request_weight_buckets_lock:
+        key = settings.base_endpoint
+        if key not in _request_weight_buckets:
+            _request_weight_buckets[key] = RequestWeightBucket(
+                settings.request_weight_per_minute
+            )
+        return _request_weight_buckets[key]
+
 
 class BrokerSettings(BaseModel):
     """Broker parent class """
@@ -39,7 +274,12 @@ class BrokerSettings(BaseModel):
     ping_endpoint: str = str()
     time_endpoint: str = str()
     klines_endpoint: str = str()
+    stream_endpoint: str = str()
     request_weight_per_minute: int = None
+    klines_request_weight: int = 1
+    used_weight_header: str = str()
+    http_pool_size: int = 10  # Keep-alive connections per broker
+    http_timeout: float = 10.0  # Seconds
     records_per_request: int = None
     time_frames: list = [
         "1m",
@@ -78,6 +318,62 @@ class Broker:
     def __init__(self, settings=None):
         self.settings = settings
 
+    @property
+    def request_weight(self) -> RequestWeightBucket:
+        """The request weight budget shared by all the instances of
+        this broker, in the current process."""
+
+        return request_weight_bucket(self.settings)
+
+    def sync_request_weight(self, headers: dict) -> None:
+        """Updates the shared request weight budget from the used weight
+        header (if the broker sends one) of a response."""
+
+        used_weight = headers.get(self.settings.used_weight_header)
+        if used_weight is not None:
+            self.request_weight.sync(int(used_weight))
+
+    def request(self, endpoint: str, weight: int = 1) -> requests.Response:
+        """GET on a broker endpoint, spending 'weight' from the shared
+        request weight budget (waiting for it, if needed) and accounting
+        the used weight returned by the broker.
+
+        Raises:
+            BrokerError: If the broker do not answer with success.
+        """
+
+        self.request_weight.acquire(weight)
+        response = get_response(
+            endpoint,
+            session=http_session(self.settings),
+            timeout=self.settings.http_timeout,
+        )
+        if response is None:
+            raise BrokerError("Unsuccessful request to {}".format(endpoint))
+
+        self.sync_request_weight(response.headers)
+        return response
+
+    async def async_request(
+        self, endpoint: str, weight: int = 1
+    ) -> Union[dict, list]:
+        """Async counterpart of 'request'; returns the decoded json.
+
+        Raises:
+            BrokerError: If the broker do not answer with success.
+        """
+
+        await self.request_weight.async_acquire(weight)
+        response = await async_get_response(
+            endpoint, session=async_http_session(self.settings)
+        )
+        if response is None:
+            raise BrokerError("Unsuccessful request to {}".format(endpoint))
+
+        content, headers = response
+        self.sync_request_weight(headers)
+        return content
+
     def server_time(self) -> int:
         """Date time of broker server.
 
@@ -127,6 +423,13 @@ class Broker:
             ticker_symbol, time_frame, since=1, number_samples=1
         )[:1]
 
+    def klines_stream(
+        self, ticker_symbol: str, time_frame: str, last_open_time=None
+    ):
+        """A 'KlinesStream' (module 'streams') of the closed klines, as
+        they finalize; starting after 'last_open_time', if given."""
+        raise NotImplementedError
+
     def get_price(self, ticker_symbol: str, **kwargs) -> float:
         """Instant average trading price"""
         raise NotImplementedError
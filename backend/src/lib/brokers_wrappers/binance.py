@@ -4,7 +4,9 @@
 
 # pylint: disable=too-few-public-methods
 
+import json
 from decimal import Decimal
+from typing import Optional
 
 from binance.client import Client as BinanceClient
 from binance.exceptions import BinanceOrderException
@@ -17,8 +19,8 @@ from .base import (
     FormatKlines,
     Order,
     Quantity,
-    get_response,
 )
+from .streams import KlinesStream
 
 
 class Settings(BrokerSettings):
@@ -31,7 +33,9 @@ class Settings(BrokerSettings):
     ping_endpoint = base_endpoint + "ping"
     time_endpoint = base_endpoint + "time"
     klines_endpoint = base_endpoint + "klines?symbol={}&interval={}"
+    stream_endpoint = "wss://stream.binance.com:9443/ws/"
     request_weight_per_minute = 1100  # Default: 1200/min/IP
+    used_weight_header = "x-mbx-used-weight-1m"
     records_per_request = 500  # Default: 500 | Limit: 1000 samples/response))
 
     # Which information (IN ORDER!), about each candle, is returned by Binance
@@ -44,6 +48,35 @@ class Settings(BrokerSettings):
     ]
 
 
+class BinanceKlinesStream(KlinesStream):
+    """https://github.com/binance/binance-spot-api-docs/blob/master/
+    web-socket-streams.md#klinecandlestick-streams"""
+
+    __slots__ = list()
+
+    def url(self) -> str:
+        return "{}{}@kline_{}".format(
+            self.broker.settings.stream_endpoint,
+            self.ticker_symbol.lower(),
+            self.time_frame,
+        )
+
+    def closed_kline(self, message: str) -> Optional[dict]:
+        kline = json.loads(message).get("k")
+        if not kline or not kline["x"]:  # Not a kline or not closed yet
+            return None
+
+        return dict(
+            Open_time=kline["t"] // 1000,
+            Open=float(kline["o"]),
+            High=float(kline["h"]),
+            Low=float(kline["l"]),
+            Close=float(kline["c"]),
+            Volume=float(kline["v"]),
+            Close_time=kline["T"] // 1000,
+        )
+
+
 class Binance(Broker):
     """All needed functions, wrapping the communication with binance"""
 
@@ -54,20 +87,26 @@ class Binance(Broker):
     @DocInherit
     def server_time(self) -> int:
         endpoint = self.settings.time_endpoint
-        time_str = (get_response(endpoint)).json()["serverTime"]
+        time_str = (self.request(endpoint)).json()["serverTime"]
         return int(float(time_str) / 1000)
 
-    @DocInherit
-    def max_requests_limit_hit(self) -> bool:
-        ping_endpoint = self.settings.ping_endpoint
-        request_weight_per_minute = self.settings.request_weight_per_minute
-        requests_on_current_minute = int(
-            (get_response(ping_endpoint)).headers["x-mbx-used-weight-1m"]
-        )
-        return requests_on_current_minute >= request_weight_per_minute
+    async def async_server_time(self) -> int:
+        """Async counterpart of 'server_time'"""
+
+        endpoint = self.settings.time_endpoint
+        time_str = (await self.async_request(endpoint))["serverTime"]
+        return int(float(time_str) / 1000)
 
     @DocInherit
-    def get_klines(self, ticker_symbol: str, time_frame: str, **kwargs) -> DF:
+    def max_requests_limit_hit(self) -> bool:
+        # Predicted locally, from the 'x-mbx-used-weight-1m' header of the
+        # real requests; there is no need to ping the broker.
+        weight = self.settings.klines_request_weight
+        return self.request_weight.available() < weight
+
+    def _klines_endpoint(
+        self, ticker_symbol: str, time_frame: str, **kwargs
+    ) -> str:
         since: int = kwargs.get("since")
         until: int = kwargs.get("until")
         number_of_candles: int = kwargs.get("number_of_candles")
@@ -82,18 +121,52 @@ class Binance(Broker):
             endpoint += "&endTime={}".format(str(until * 1000))
         if number_of_candles:
             endpoint += "&limit={}".format(str(number_of_candles))
+        return endpoint
+
+    def _klines_dataframe(self, raw_klines: list) -> DF:
+        # The undesired columns are not even converted
+        return FormatKlines(raw_klines, self.settings).to_dataframe(
+            self.settings.klines_desired_informations
+            if self.settings.show_only_desired_info
+            else None
+        )
 
-        raw_klines = (get_response(endpoint)).json()
-
-        klines = FormatKlines(raw_klines, self.settings).to_dataframe()
+    @DocInherit
+    def get_klines(self, ticker_symbol: str, time_frame: str, **kwargs) -> DF:
+        endpoint = self._klines_endpoint(ticker_symbol, time_frame, **kwargs)
+        raw_klines = (
+            self.request(endpoint, weight=self.settings.klines_request_weight)
+        ).json()
+        return self._klines_dataframe(raw_klines)
+
+    async def async_get_klines(
+        self, ticker_symbol: str, time_frame: str, **kwargs
+    ) -> DF:
+        """Async counterpart of 'get_klines'"""
+
+        endpoint = self._klines_endpoint(ticker_symbol, time_frame, **kwargs)
+        raw_klines = await self.async_request(
+            endpoint, weight=self.settings.klines_request_weight
+        )
+        return self._klines_dataframe(raw_klines)
 
-        if self.settings.show_only_desired_info:
-            return klines[self.settings.klines_desired_informations]
-        return klines
+    @DocInherit
+    def klines_stream(
+        self,
+        ticker_symbol: str,
+        time_frame: str,
+        last_open_time: Optional[int] = None,
+    ) -> BinanceKlinesStream:
+        return BinanceKlinesStream(
+            self, ticker_symbol, time_frame, last_open_time
+        )
 
     @DocInherit
     def get_price(self, ticker_symbol, **kwargs) -> float:
-        return float(self.client.get_avg_price(symbol=ticker_symbol)["price"])
+        self.request_weight.acquire()
+        price = self.client.get_avg_price(symbol=ticker_symbol)["price"]
+        self.sync_request_weight(self.client.response.headers)
+        return float(price)
 
     @DocInherit
     def ticker_info(self, ticker_symbol: str) -> dict:
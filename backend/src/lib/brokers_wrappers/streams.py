@@ -0,0 +1,181 @@
+"""Streaming (websocket) market data sources of the brokers"""
+
+# pylint: disable=too-few-public-methods
+
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional
+
+import aiohttp
+import websockets
+
+from ...utils.exceptions import BrokerError
+from ...utils.tools.formatting import json_columns
+from ...utils.tools.time_handlers import (
+    Now,
+    cooldown_time,
+    time_frame_to_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+# Keys of the emitted klines
+kline_columns = [
+    "Open_time",
+    "Open",
+    "High",
+    "Low",
+    "Close",
+    "Volume",
+    "Close_time",
+]
+
+# Failures after which the stream reconnects
+connection_errors = (
+    OSError,
+    asyncio.TimeoutError,
+    aiohttp.ClientError,
+    websockets.exceptions.WebSocketException,
+    BrokerError,
+)
+
+
+class KlinesStream:
+    """Closed klines of a ticker and time frame, emitted as soon as the
+    broker finalizes them, from its websocket stream; so a live
+    operation does not poll the REST API (paying latency and request
+    weight) nor guesses when the next kline closes.
+
+    The stream reconnects (with the cooldown of the broker requests) on
+    failures and, after each (re)connection or whenever it notices a
+    missing kline, backfills through the REST API the klines closed in
+    the meantime; so no closed kline is skipped nor emitted twice.
+
+    Each kline is a dict with the 'kline_columns' keys e.g.
+    {"Open_time": 1593609120, "Open": 9000.0, ..., "Close_time":
+    1593609179}, whether it came from the websocket or the backfill, as
+    a row of the klines dataframes, ready for the streaming
+    indicators/classifiers ('update' method).
+
+    Args:
+        broker (Broker): With the async REST methods, for the backfill.
+        ticker_symbol (str): e.g. "BTCUSDT"
+        time_frame (str): <amount><scale_unit> e.g. '1m', '2h'
+        last_open_time (int, optional): Open time of the last kline the
+        consumer already has; the stream starts after it (backfilling
+        from there). If None, it starts with the next closed kline.
+    """
+
+    __slots__ = [
+        "broker",
+        "ticker_symbol",
+        "time_frame",
+        "last_open_time",
+        "_step",
+    ]
+
+    def __init__(
+        self,
+        broker,
+        ticker_symbol: str,
+        time_frame: str,
+        last_open_time: Optional[int] = None,
+    ):
+        self.broker = broker
+        self.ticker_symbol = ticker_symbol
+        self.time_frame = time_frame
+        self.last_open_time = last_open_time
+        self._step = time_frame_to_seconds(time_frame)
+
+    def url(self) -> str:
+        """Websocket endpoint of the stream"""
+
+        raise NotImplementedError
+
+    def closed_kline(self, message: str) -> Optional[dict]:
+        """The kline finalized by a stream message, if any."""
+
+        raise NotImplementedError
+
+    def _records(self, klines) -> List[dict]:
+        """Klines dataframe rows as the stream klines"""
+
+        klines = klines.assign(Close_time=klines.Open_time + self._step - 1)
+        columns = json_columns(klines[kline_columns])
+        return [
+            dict(zip(kline_columns, values))
+            for values in zip(*columns.values())
+        ]
+
+    async def _backfill(
+        self, before: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """The closed klines after the last emitted one (and opened
+        before 'before', if given), via REST, page by page until none is
+        missing."""
+
+        since = self.last_open_time + self._step
+        while before is None or since < before:
+            klines = await self.broker.async_get_klines(
+                self.ticker_symbol, self.time_frame, since=since
+            )
+            now = Now().utc_timestamp()
+            closed = klines[
+                (klines.Open_time >= since)
+                & (klines.Open_time + self._step <= now)
+            ]
+            if before is not None:
+                closed = closed[closed.Open_time < before]
+            if not len(closed):
+                return
+
+            for kline in self._records(closed):
+                yield kline
+            since = int(closed.Open_time.iloc[-1]) + self._step
+
+    def _is_new(self, kline: dict) -> bool:
+        return (
+            self.last_open_time is None
+            or kline["Open_time"] > self.last_open_time
+        )
+
+    async def _emit(self, kline: dict) -> AsyncIterator[dict]:
+        """The kline, preceded by the ones missing before it"""
+
+        if self.last_open_time is not None and (
+            kline["Open_time"] > self.last_open_time + self._step
+        ):
+            async for missing in self._backfill(before=kline["Open_time"]):
+                self.last_open_time = missing["Open_time"]
+                yield missing
+
+        self.last_open_time = kline["Open_time"]
+        yield kline
+
+    async def klines(self) -> AsyncIterator[dict]:
+        """Endless async iterator over the closed klines, in order."""
+
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(self.url()) as connection:
+                    # Subscribed before backfilling, so the klines closed
+                    # during the backfill are also received.
+                    if self.last_open_time is not None:
+                        async for kline in self._backfill():
+                            self.last_open_time = kline["Open_time"]
+                            yield kline
+                    attempt = 0
+
+                    async for message in connection:
+                        kline = self.closed_kline(message)
+                        if kline is not None and self._is_new(kline):
+                            async for _kline in self._emit(kline):
+                                yield _kline
+
+                raise BrokerError("The stream was closed by the broker")
+
+            except connection_errors as error:
+                attempt += 1
+                logger.warning("Stream failure, reconnecting: %s", error)
+                await asyncio.sleep(cooldown_time(attempt, "1m"))
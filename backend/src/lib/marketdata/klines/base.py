@@ -4,20 +4,30 @@
 # pylint: disable=too-few-public-methods
 # pylint: disable=too-many-return-statements
 
+import asyncio
+from typing import Iterator
+
 import pandas as pd
 from pydantic import BaseModel
 
 from ....utils.databases.time_series_storage.models import StorageKlines
 from ....utils.exceptions import TimeFormatError
 from ....utils.schemas.generics import Ticker
+from ....utils.tools.formatting import (
+    KlinesWindow,
+    klines_schema,
+    overlapping_windows,
+)
 from ....utils.tools.time_handlers import int_timestamp, time_frame_to_seconds
-from .operators.classifiers import didi_v1 as didi
+from .operators.classifiers import didi_v1 as didi, didi_v1_sweep
 from .operators.indicators import (
     bollinger_bands,
+    cache,
     didi_index,
     price,
     simple_moving_average as sma,
 )
+from .resampling import shift_open_times
 
 DF = pd.core.frame.DataFrame
 pd.options.mode.chained_assignment = None
@@ -27,22 +37,32 @@ class GetterSettings(BaseModel):
     return_as_human_readable = True
     ignore_unclosed_kline = True
     infinite_request_attempts = True
+    download_workers = 1  # Greater than 1 means concurrent requests
+    page_samples = 10000  # Klines per page of 'iter_klines'
 
 
 class GetInputSanitizer(BaseModel):
-    sec_time_frame: int
+    sec_time_frame: int = 0  # Of the fixed length time frames
+    time_frame: str = str()  # Needed by the calendar (monthly) ones
     min_timestamp: int
     max_timestamp: int
 
-    def _timestamp_delta(self, number_samples: int) -> int:
-        return int(self.sec_time_frame * (number_samples - 1))
+    def shift(self, timestamp: int, number_samples: int) -> int:
+        """The open time 'number_samples' klines after (or before, if
+        negative) 'timestamp'."""
+
+        if self.time_frame.endswith("M"):
+            return int(
+                shift_open_times(timestamp, self.time_frame, number_samples)
+            )
+        return timestamp + self.sec_time_frame * number_samples
 
     def _until(self, since: int, number_samples: int) -> int:
-        until = since + self._timestamp_delta(number_samples)
+        until = self.shift(since, number_samples - 1)
         return min(until, self.max_timestamp)
 
     def _since(self, until: int, number_samples: int) -> int:
-        since = until - self._timestamp_delta(number_samples)
+        since = self.shift(until, 1 - number_samples)
         return max(since, self.min_timestamp)
 
     def sanitize(self, **kwargs) -> tuple:
@@ -91,7 +111,7 @@ class Getter:
     ]
 
     def __init__(self, broker: str, ticker: Ticker, time_frame: str = str()):
-        self.broker_name: broker
+        self.broker_name = broker
         self.ticker = ticker
         self.time_frame = time_frame
         self.settings = GetterSettings()
@@ -100,7 +120,12 @@ class Getter:
             time_frame=self.time_frame,
         )
         self.sanitizer = GetInputSanitizer(
-            sec_time_frame=time_frame_to_seconds(time_frame),
+            sec_time_frame=(
+                0
+                if time_frame.endswith("M")
+                else time_frame_to_seconds(time_frame)
+            ),
+            time_frame=time_frame,
             min_timestamp=self.oldest_open_time(),
             max_timestamp=self.newest_open_time(),
         )
@@ -116,6 +141,24 @@ class Getter:
     def _get_core(self, since: int, until: int) -> DF:
         raise NotImplementedError
 
+    def _pages(self, since: int, until: int) -> Iterator[DF]:
+        """The klines of the time range, in consecutive pages of up to
+        'settings.page_samples' klines."""
+
+        page_since = since
+        while page_since <= until:
+            next_page_since = self.sanitizer.shift(
+                page_since, self.settings.page_samples
+            )
+            yield self._get_core(page_since, min(next_page_since - 1, until))
+            page_since = next_page_since
+
+    def _finish(self, klines: DF, until: int) -> DF:
+        klines = klines_schema.apply(klines[klines.Open_time <= until])
+        if self.settings.return_as_human_readable:
+            self._to_human_readable(klines)
+        return klines
+
     def get(self, **kwargs) -> DF:
         """Solves the request, if that contains at least 2 of these 3
         arguments: "since", "until", "number_samples".
@@ -124,17 +167,87 @@ class Getter:
             pd.core.frame.DataFrame: Requested klines range."""
 
         since, until = self.sanitizer.sanitize(**kwargs)
-        _klines = self._get_core(since, until)
+        return self._finish(self._get_core(since, until), until)
 
-        klines = _klines[_klines.Open_time <= until]
-        if self.settings.return_as_human_readable:
-            try:
-                klines.parse_datetime.to_human_readable(
-                    columns=["Open_time", "Close_time"]
-                )
-            except (KeyError, TimeFormatError):
-                pass
-        return klines
+    async def async_get(self, **kwargs) -> DF:
+        """Async counterpart of 'get'; by default the (blocking) queries
+        run on a worker thread, so the event loop is not blocked."""
+
+        return await asyncio.to_thread(self.get, **kwargs)
+
+    def iter_klines(self, since=None, until=None) -> Iterator[DF]:
+        """Iterates over the klines of the time range, page by page, so
+        long ranges are processed without ever materializing them.
+
+        Args:
+            since (DateTimeType, optional): Defaults to the oldest one.
+            until (DateTimeType, optional): Defaults to the newest one.
+
+        Yields:
+            pd.core.frame.DataFrame: The next non-empty page of klines,
+            formatted as the 'get' ones.
+        """
+
+        since, until = self.sanitizer.sanitize(since=since, until=until)
+        for page in self._pages(since, until):
+            page = self._finish(page, until)
+            if len(page):
+                yield page
+
+    def iter_windows(
+        self, window_samples: int, overlap: int = 0, since=None, until=None
+    ) -> Iterator[KlinesWindow]:
+        """Iterates over the klines of the time range, in windows of
+        'window_samples' klines, so rolling indicators and backtests can
+        process arbitrarily long histories with bounded memory.
+
+        Args:
+            window_samples (int): New klines per window.
+            overlap (int, optional): Klines (e.g. the longest rolling
+            window of the indicators) repeated at the start of each
+            window from the previous one; the first window takes them
+            from before 'since', when available. Defaults to 0.
+            since (DateTimeType, optional): Defaults to the oldest one.
+            until (DateTimeType, optional): Defaults to the newest one.
+
+        Yields:
+            KlinesWindow: The klines (formatted as the 'get' ones) and
+            how many of them are overlap.
+        """
+
+        since, until = self.sanitizer.sanitize(since=since, until=until)
+        warm_up_since = max(
+            self.sanitizer.shift(since, -overlap),
+            self.sanitizer.min_timestamp,
+        )
+        pages = (
+            page[page.Open_time <= until]
+            for page in self._pages(warm_up_since, until)
+        )
+        for window in overlapping_windows(
+            pages, window_samples, overlap, since
+        ):
+            klines = self._finish(window.klines, until)
+            yield KlinesWindow(klines, window.overlap)
+
+    @staticmethod
+    def _to_human_readable(klines: DF) -> None:
+        columns = [
+            column
+            for column in ("Open_time", "Close_time")
+            if column in klines
+        ]
+        if klines_schema.human_readable_dtype != "object":
+            for column in columns:
+                if pd.api.types.is_numeric_dtype(klines[column]):
+                    klines[column] = pd.to_datetime(
+                        klines[column].to_numpy(dtype="int64"), unit="s"
+                    ).astype(klines_schema.human_readable_dtype)
+            return
+        try:
+            klines.parse_datetime.to_human_readable(columns=columns)
+        except TimeFormatError:
+            pass
 
     def oldest(self, number_samples: int = 1) -> DF:
         """Oldest <number_samples> klines avaliable.
@@ -174,6 +287,7 @@ class Indicator:
     """Market indicators; obtained exclusively from klines (OHLCV)"""
 
     __slots__ = [
+        "cache",
         "price",
         "simple_moving_average",
         "didi_index",
@@ -181,6 +295,7 @@ class Indicator:
     ]
 
     def __init__(self, klines: DF):
+        self.cache = cache.ComputedColumnsCache(klines)
         self.price = price.PriceFromKline(klines)
         self.simple_moving_average = sma.SimpleMovingAverage(klines)
         self.didi_index = didi_index.DidiIndex(klines)
@@ -193,7 +308,9 @@ class Classifier:
 
     __slots__ = [
         "didi",
+        "didi_sweep",
     ]
 
     def __init__(self, klines: DF):
         self.didi = didi.DidiClassifier(klines)
+        self.didi_sweep = didi_v1_sweep.DidiClassifierSweep(klines)
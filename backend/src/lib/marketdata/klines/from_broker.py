@@ -1,5 +1,4 @@
 # pylint: disable=too-few-public-methods
-# pylint: disable=fixme
 
 """This module should acts as a queue for requesting klines from the
 brokers, in order to do not exceed the their APIs limits, delivering
@@ -8,13 +7,23 @@ market indicators Finally, it also deals with saving klines in the
 'time_series_storage'.
 """
 
+import asyncio
+import logging
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 
-import pandas as pd
-
-from ....utils.exceptions import BrokerError, StorageError
+from ....utils.databases.time_series_storage.time_ranges import time_ranges
+from ....utils.databases.time_series_storage.writer import (
+    BackgroundWriteError,
+)
+from ....utils.exceptions import BrokerError
 from ....utils.schemas.generics import Ticker
-from ....utils.tools.formatting import remove_last_kline_if_unclosed
+from ....utils.tools.formatting import (
+    KlinesBuilder,
+    remove_last_kline_if_unclosed,
+)
 from ....utils.tools.time_handlers import (
     Now,
     cooldown_time,
@@ -23,13 +32,19 @@ from ....utils.tools.time_handlers import (
 from ...brokers_wrappers import BrokerFabric
 from .base import DF, Getter
 
+logger = logging.getLogger(__name__)
+
 
 class GetterFromBroker(Getter):
     """Aims to serve as a queue for requesting klines (OHLC) through
     brokers endpoints, spliting the requests, in order to respect broker
-    established limits. If a request limit is close to being reached,
-    will pause the queue, until cooldown time pass. Returns sanitized
-    klines, formatted as pandas DataFrame."""
+    established limits. Every request takes its weight from the broker
+    request weight bucket (shared by all the getters of the process),
+    so, if the limit is close to being reached, the queue is paused just
+    until the bucket refills. If 'settings.download_workers' is greater
+    than 1, the time windows are requested concurrently, by a bounded
+    pool of threads. Returns sanitized klines, formatted as pandas
+    DataFrame."""
 
     __slots__ = [
         "_broker",
@@ -67,10 +82,17 @@ class GetterFromBroker(Getter):
     def time_frame(self, time_frame_to_set: str):
         self._time_frame = self._validate_tf(time_frame_to_set)
 
-    def oldest_open_time(self) -> int:
+    def _oldest_open_time_from_broker(self) -> int:
         kline = self._broker.oldest_kline(self.ticker.symbol, self.time_frame)
         return kline.Open_time.item()
 
+    def oldest_open_time(self) -> int:
+        return time_ranges.open_time(
+            key=("broker", self.storage.table, self.time_frame),
+            field="oldest_open_time",
+            compute=self._oldest_open_time_from_broker,
+        )
+
     def newest_open_time(self) -> int:
         return Now().utc_timestamp()
 
@@ -79,35 +101,146 @@ class GetterFromBroker(Getter):
         seconds_time_frame = time_frame_to_seconds(self.time_frame)
         return records_per_request * seconds_time_frame
 
-    def _get_core(self, since: int, until: int) -> DF:
-        klines = pd.DataFrame()
-        for timestamp in range(since, until + 1, self._request_step):
-            attempt = 0
-            while True:
-                try:
-                    if self._broker.max_requests_limit_hit():
-                        time.sleep(10)
-
-                    attempt += 1
-                    _klines = self._broker.get_klines(
-                        ticker_symbol=self.ticker.symbol,
-                        time_frame=self._time_frame,
-                        since=timestamp,
+    def _request_window(self, since: int) -> DF:
+        """The klines since 'since', stored round by round if asked to.
+
+        Raises:
+            BrokerError: If the request fails and the attempts are not
+            infinite.
+        """
+
+        attempt = 0
+        while True:
+            try:
+                attempt += 1
+                _klines = self._broker.get_klines(
+                    ticker_symbol=self.ticker.symbol,
+                    time_frame=self._time_frame,
+                    since=since,
+                )
+                if self.store_klines_round_by_round and len(_klines):
+                    # Only closed klines, written by a background thread,
+                    # so the next request does not wait for the storage
+                    self.storage.append_in_background(
+                        remove_last_kline_if_unclosed(
+                            _klines, self.time_frame
+                        )
                     )
-                    klines = klines.append(_klines, ignore_index=True)
-                    if self.store_klines_round_by_round:
-                        self.storage.append(_klines)
-                    break
-
-                except (BrokerError, StorageError) as error:
-                    if not self.settings.infinite_request_attempts:
-                        raise Exception from error
-
-                    # TODO: Log instead print
-                    print("Fail, due the error: ", error)
+                return _klines
+
+            except BrokerError as error:
+                if not self.settings.infinite_request_attempts:
+                    raise
+
+                logger.warning("Fail, due the error: %s", error)
+                time.sleep(cooldown_time(attempt))
+
+    async def _async_request_window(self, since: int) -> DF:
+        """Async counterpart of '_request_window'; the klines are not
+        stored round by round.
+
+        Raises:
+            BrokerError: If the request fails and the attempts are not
+            infinite.
+        """
+
+        attempt = 0
+        while True:
+            try:
+                attempt += 1
+                return await self._broker.async_get_klines(
+                    ticker_symbol=self.ticker.symbol,
+                    time_frame=self._time_frame,
+                    since=since,
+                )
+
+            except BrokerError as error:
+                if not self.settings.infinite_request_attempts:
+                    raise
+
+                logger.warning("Fail, due the error: %s", error)
+                await asyncio.sleep(cooldown_time(attempt))
+
+    def _requested_windows(self, windows: range) -> Iterator[DF]:
+        """The klines of each window, in order; with concurrent requests,
+        only 'download_workers' windows are requested ahead of the
+        consumer."""
+
+        workers = min(self.settings.download_workers, len(windows))
+        if workers <= 1:
+            for window in windows:
+                yield self._request_window(window)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for window in windows:
+                pending.append(executor.submit(self._request_window, window))
+                if len(pending) >= workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _last_page(self, klines: DF) -> DF:
+        if self.settings.ignore_unclosed_kline and len(klines):
+            return remove_last_kline_if_unclosed(klines, self.time_frame)
+        return klines
 
-                    time.sleep(cooldown_time(attempt))
+    def _close_storage(self) -> None:
+        """Waits for the klines stored round by round (stopping the
+        writer thread); the failed writes are enqueued again, as many
+        times as the request attempts."""
+
+        attempt = 0
+        while True:
+            try:
+                attempt += 1
+                self.storage.close()
+                return
+
+            except BackgroundWriteError as error:
+                if not self.settings.infinite_request_attempts:
+                    raise
+
+                logger.warning("Fail to store the klines: %s", error)
+                time.sleep(cooldown_time(attempt))
+                for klines in error.dataframes:
+                    self.storage.append_in_background(klines)
+
+    def _pages(self, since: int, until: int) -> Iterator[DF]:
+        """One page per request window"""
+
+        windows = range(since, until + 1, self._request_step)
+        for index, klines in enumerate(self._requested_windows(windows)):
+            if index == len(windows) - 1:
+                if self.store_klines_round_by_round:
+                    self._close_storage()
+                klines = self._last_page(klines)
+            yield klines
 
-        if self.settings.ignore_unclosed_kline:
-            klines = remove_last_kline_if_unclosed(klines, self.time_frame)
-        return klines
+    def _get_core(self, since: int, until: int) -> DF:
+        builder = KlinesBuilder()
+        for klines in self._pages(since, until):
+            builder.add(klines)
+        return builder.build()
+
+    async def async_get(self, **kwargs) -> DF:
+        """Async counterpart of 'get': the windows are requested through
+        the async client of the broker, up to 'settings.download_workers'
+        at once, so no thread is blocked waiting for the broker."""
+
+        since, until = self.sanitizer.sanitize(**kwargs)
+        windows = range(since, until + 1, self._request_step)
+        semaphore = asyncio.Semaphore(max(1, self.settings.download_workers))
+
+        async def request(window: int) -> DF:
+            async with semaphore:
+                return await self._async_request_window(window)
+
+        pages = await asyncio.gather(*(request(window) for window in windows))
+        builder = KlinesBuilder()
+        for index, klines in enumerate(pages):
+            builder.add(
+                self._last_page(klines) if index == len(pages) - 1 else klines
+            )
+        return self._finish(builder.build(), until)
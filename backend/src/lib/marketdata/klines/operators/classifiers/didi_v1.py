@@ -2,13 +2,18 @@
 # pylint: disable=no-name-in-module
 # pylint: disable=too-few-public-methods
 
-import pandas as pd
+import numpy as np
 from pydantic import BaseModel
 
 from ....klines.operators.indicators.bollinger_bands import (
+    BollingerBandsStream,
     Setup as BollingerBandsSetup,
 )
-from ....klines.operators.indicators.didi_index import Setup as DidiIndexSetup
+from ....klines.operators.indicators.didi_index import (
+    DidiIndexStream,
+    Setup as DidiIndexSetup,
+)
+from ....klines.operators.indicators.rolling import IndicatorStream, nan
 
 
 class Setup(BaseModel):
@@ -73,81 +78,85 @@ class DidiClassifier:
             setup=self.setup.bollinger_bands
         )
 
-    def _didi_analysis(self, result: pd.core.frame.DataFrame, index: int):
-        previous_slow = float(result.iloc[0].Didi_slow.item())
-        slow = float(result.iloc[1].Didi_slow.item())
-        slow_inversion = (slow / previous_slow) < 0
-
-        previous_fast = float(result.iloc[0].Didi_fast.item())
-        fast = float(result.iloc[1].Didi_fast.item())
-        fast_inversion = (fast / previous_fast) < 0
-
-        if slow_inversion:
-            self._ma_inversion_score.index_of_slow = index
-        if fast_inversion:
-            self._ma_inversion_score.index_of_fast = index
-
-        didi_trend = 1 if slow < 0 < fast else -1 if fast < 0 < slow else 0
-
-        self._klines.loc[
-            index, "Didi_score"
-        ] = self._ma_inversion_score.calculate()
-
-        self._klines.loc[index, "Didi_trend"] = didi_trend
-
-    def _bollinger_analysis(self, result: pd.core.frame.DataFrame, index: int):
-        self._klines.loc[index, "Bollinger"] = 0
-
-        previous_bb_upper = result.iloc[0].BB_upper
-        current_bb_upper = result.iloc[1].BB_upper
-
-        previous_bb_bottom = result.iloc[0].BB_bottom
-        current_bb_bottom = result.iloc[1].BB_bottom
-
-        # total_opened_bands
-        if (current_bb_upper > previous_bb_upper) and (
-            current_bb_bottom < previous_bb_bottom
-        ):
-            self._klines.loc[index, "Bollinger"] = 1
-            return
-
-        # only_upper_bb_opened
-        if (current_bb_upper > previous_bb_upper) and (
-            current_bb_bottom >= previous_bb_bottom
-        ):
-            self._klines.loc[
-                index, "Bollinger"
-            ] = self.setup.weight_if_only_upper_bb_opened
-            return
-
-        # only_bottom_bb_opened
-        if (current_bb_upper <= previous_bb_upper) and (
-            current_bb_bottom < previous_bb_bottom
-        ):
-            self._klines.loc[
-                index, "Bollinger"
-            ] = self.setup.weight_if_only_bottom_bb_opened
-            return
+    @staticmethod
+    def _inversions(series: np.ndarray) -> np.ndarray:
+        """True where the series (along its last axis) changes its sign,
+        from the previous sample."""
 
-    def _evaluate_indicators_results(self):
-        self._ma_inversion_score.reset_indexes()
+        inversions = np.zeros(series.shape, dtype=bool)
+        inversions[..., 1:] = (series[..., 1:] * series[..., :-1]) < 0
+        return inversions
 
-        for i in range(2, len(self._klines) + 1):
-            desired_index = i - 1
-            two_rows_rolling_window = self._klines[i - 2 : i]
+    @staticmethod
+    def _index_of_last(inversions: np.ndarray) -> np.ndarray:
+        """For each sample, the index of the last inversion until there
+        (inclusive), or 0 if there was none."""
 
-            self._didi_analysis(
-                result=two_rows_rolling_window, index=desired_index
-            )
-            self._bollinger_analysis(
-                result=two_rows_rolling_window, index=desired_index
-            )
+        positions = np.arange(inversions.shape[-1])
+        indexes = np.where(inversions, positions, 0)
+        return np.maximum.accumulate(indexes, axis=-1)
 
-            result = self._klines.iloc[desired_index]
+    def _didi_analysis(self) -> tuple:
+        slow = self._klines.Didi_slow.to_numpy(dtype="float64")
+        fast = self._klines.Didi_fast.to_numpy(dtype="float64")
 
-            self._klines.loc[desired_index, "Score"] = (
-                result.Didi_trend * result.Bollinger * result.Didi_score
-            )
+        delta_inversion = np.abs(
+            self._index_of_last(self._inversions(fast))
+            - self._index_of_last(self._inversions(slow))
+        )
+        window_len = self._ma_inversion_score.number_of_observation_periods
+        didi_score = np.where(
+            delta_inversion > window_len,
+            0.0,
+            (window_len - delta_inversion) / window_len,
+        )
+        didi_trend = np.select(
+            [(slow < 0) & (fast > 0), (fast < 0) & (slow > 0)],
+            [1.0, -1.0],
+            0.0,
+        )
+        return didi_score, didi_trend
+
+    def _bollinger_analysis(self) -> np.ndarray:
+        upper = self._klines.BB_upper.to_numpy(dtype="float64")
+        bottom = self._klines.BB_bottom.to_numpy(dtype="float64")
+
+        bollinger = np.zeros(len(upper))
+        upper_opened = upper[1:] > upper[:-1]
+        upper_closed = upper[1:] <= upper[:-1]
+        bottom_opened = bottom[1:] < bottom[:-1]
+        bottom_closed = bottom[1:] >= bottom[:-1]
+
+        bollinger[1:] = np.select(
+            [
+                upper_opened & bottom_opened,  # total_opened_bands
+                upper_opened & bottom_closed,  # only_upper_bb_opened
+                upper_closed & bottom_opened,  # only_bottom_bb_opened
+            ],
+            [
+                1.0,
+                self.setup.weight_if_only_upper_bb_opened,
+                self.setup.weight_if_only_bottom_bb_opened,
+            ],
+            0.0,
+        )
+        return bollinger
+
+    def _evaluate_indicators_results(self):
+        didi_score, didi_trend = self._didi_analysis()
+        bollinger = self._bollinger_analysis()
+        score = didi_trend * bollinger * didi_score
+
+        # As each sample is compared to the previous one, there is no
+        # result for the first sample.
+        for column, values in [
+            ("Didi_score", didi_score),
+            ("Didi_trend", didi_trend),
+            ("Bollinger", bollinger),
+            ("Score", score),
+        ]:
+            values[:1] = np.nan
+            self._klines.loc[:, column] = values
 
     def apply(self, setup: Setup = Setup()):
         self.setup = setup
@@ -160,3 +169,87 @@ class DidiClassifier:
 
         self._apply_indicators_pipeline()
         self._evaluate_indicators_results()
+
+
+class DidiClassifierStream(IndicatorStream):
+    """Incremental counterpart of 'DidiClassifier', for long-running
+    monitors: keeps the rolling state of the Didi index and Bollinger
+    bands, the previous results and the indexes of the last moving
+    averages inversions, so each new closed kline is classified in O(1),
+    with the same columns (and values) of 'DidiClassifier.apply'.
+    """
+
+    __slots__ = [
+        "setup",
+        "_didi_index",
+        "_bollinger_bands",
+        "_ma_inversion_score",
+        "_previous",
+        "_index",
+    ]
+
+    def __init__(self, setup: Setup = Setup()):
+        super().__init__()
+        self.setup = setup
+        self._didi_index = DidiIndexStream(setup.didi_index)
+        self._bollinger_bands = BollingerBandsStream(setup.bollinger_bands)
+        self._ma_inversion_score = MovingAverageInversionScore(
+            number_of_observation_periods=20
+        )
+        self._previous = None
+        self._index = -1
+
+    def _bollinger(self, current: dict) -> float:
+        upper, previous_upper = current["BB_upper"], self._previous["BB_upper"]
+        bottom = current["BB_bottom"]
+        previous_bottom = self._previous["BB_bottom"]
+
+        if upper > previous_upper and bottom < previous_bottom:
+            return 1.0
+        if upper > previous_upper and bottom >= previous_bottom:
+            return self.setup.weight_if_only_upper_bb_opened
+        if upper <= previous_upper and bottom < previous_bottom:
+            return self.setup.weight_if_only_bottom_bb_opened
+        return 0.0
+
+    def _didi(self, current: dict) -> tuple:
+        slow, fast = current["Didi_slow"], current["Didi_fast"]
+
+        if slow * self._previous["Didi_slow"] < 0:
+            self._ma_inversion_score.index_of_slow = self._index
+        if fast * self._previous["Didi_fast"] < 0:
+            self._ma_inversion_score.index_of_fast = self._index
+
+        didi_trend = (
+            1.0 if slow < 0 < fast else -1.0 if fast < 0 < slow else 0.0
+        )
+        return self._ma_inversion_score.calculate(), didi_trend
+
+    def _update(self, kline: dict) -> dict:
+        self._index += 1
+        current = dict(
+            self._didi_index.update(kline),
+            **self._bollinger_bands.update(kline),
+        )
+
+        if self._previous is None:
+            result = dict(
+                current,
+                Didi_score=nan,
+                Didi_trend=nan,
+                Bollinger=nan,
+                Score=nan,
+            )
+        else:
+            didi_score, didi_trend = self._didi(current)
+            bollinger = self._bollinger(current)
+            result = dict(
+                current,
+                Didi_score=didi_score,
+                Didi_trend=didi_trend,
+                Bollinger=bollinger,
+                Score=didi_trend * bollinger * didi_score,
+            )
+
+        self._previous = current
+        return result
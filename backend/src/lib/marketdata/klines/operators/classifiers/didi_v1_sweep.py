@@ -0,0 +1,266 @@
+"""Batch evaluation of a grid of DidiClassifier setups over the same
+klines. The rolling computations (one moving average or deviation per
+distinct window) are shared by all the setups, and the scores of every
+combination are computed at once, over 2-D NumPy arrays."""
+
+# pylint: disable=no-name-in-module
+# pylint: disable=protected-access
+# pylint: disable=too-few-public-methods
+
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from ....klines.operators.indicators.bollinger_bands import (
+    Setup as BollingerBandsSetup,
+)
+from ....klines.operators.indicators.didi_index import Setup as DidiIndexSetup
+from .didi_v1 import DidiClassifier, Setup
+
+Arrays = Dict[int, np.ndarray]
+
+
+class SweepGrid(BaseModel):
+    """The values of each DidiClassifier setup parameter to be swept;
+    the setups are all the combinations of them."""
+
+    price_metrics: str = "ohlc4"
+    didi_number_samples: List[Tuple[int, int, int]] = [(3, 8, 20)]
+    bollinger_number_samples: List[int] = [20]
+    bollinger_number_STDs: List[float] = [2.0]
+    weights_if_only_upper_bb_opened: List[float] = [0.7]
+    weights_if_only_bottom_bb_opened: List[float] = [0.4]
+
+    def weights(self) -> list:
+        """(upper, bottom) opened band weights combinations"""
+
+        return list(
+            itertools.product(
+                self.weights_if_only_upper_bb_opened,
+                self.weights_if_only_bottom_bb_opened,
+            )
+        )
+
+    def setups(self) -> List[Setup]:
+        """All the setups of the grid, in the order of the rows of the
+        score matrix."""
+
+        return [
+            Setup(
+                didi_index=DidiIndexSetup(
+                    price_metrics=self.price_metrics,
+                    number_samples=didi_number_samples,
+                ),
+                bollinger_bands=BollingerBandsSetup(
+                    price_metrics=self.price_metrics,
+                    number_samples=bollinger_number_samples,
+                    number_STDs=bollinger_number_stds,
+                ),
+                weight_if_only_upper_bb_opened=weights[0],
+                weight_if_only_bottom_bb_opened=weights[1],
+            )
+            for (
+                didi_number_samples,
+                bollinger_number_samples,
+                bollinger_number_stds,
+                weights,
+            ) in itertools.product(
+                self.didi_number_samples,
+                self.bollinger_number_samples,
+                self.bollinger_number_STDs,
+                self.weights(),
+            )
+        ]
+
+
+class SweepResult:
+    """Scores of a sweep: 'scores[i]' is the 'Score' column that
+    'DidiClassifier.apply(setups[i])' would produce."""
+
+    __slots__ = ["setups", "scores"]
+
+    def __init__(self, setups: List[Setup], scores: np.ndarray):
+        self.setups = setups
+        self.scores = scores
+
+    def best(self, metric=None) -> Tuple[Setup, float]:
+        """The setup with the highest 'metric' (a function of a score
+        row; defaults to the mean absolute score)."""
+
+        metric = metric or (lambda score: np.nanmean(np.abs(score)))
+        values = [metric(score) for score in self.scores]
+        index = int(np.nanargmax(values))
+        return self.setups[index], values[index]
+
+
+def _didi_results(
+    means: Arrays, didi_number_samples: Sequence[tuple], observations: int
+) -> np.ndarray:
+    """(Didi_score * Didi_trend) for each didi setup; 2-D array."""
+
+    fast = np.stack(
+        [means[fast] / means[mid] - 1 for fast, mid, _ in didi_number_samples]
+    )
+    slow = np.stack(
+        [means[slow] / means[mid] - 1 for _, mid, slow in didi_number_samples]
+    )
+
+    delta_inversion = np.abs(
+        DidiClassifier._index_of_last(DidiClassifier._inversions(fast))
+        - DidiClassifier._index_of_last(DidiClassifier._inversions(slow))
+    )
+    didi_score = np.where(
+        delta_inversion > observations,
+        0.0,
+        (observations - delta_inversion) / observations,
+    )
+    didi_trend = np.select(
+        [(slow < 0) & (fast > 0), (fast < 0) & (slow > 0)], [1.0, -1.0], 0.0
+    )
+    return didi_score * didi_trend
+
+
+def _bollinger_codes(
+    means: Arrays, stds: Arrays, number_samples: list, number_stds: list
+) -> np.ndarray:
+    """For each bollinger setup and sample: 0 if no band opened, 1 if
+    both, 2 if only the upper and 3 if only the bottom one."""
+
+    codes = list()
+    for window, k_parameter in itertools.product(number_samples, number_stds):
+        upper = means[window] + k_parameter * stds[window]
+        bottom = means[window] - k_parameter * stds[window]
+        upper_opened = upper[1:] > upper[:-1]
+        upper_closed = upper[1:] <= upper[:-1]
+        bottom_opened = bottom[1:] < bottom[:-1]
+        bottom_closed = bottom[1:] >= bottom[:-1]
+
+        code = np.zeros(len(upper), dtype="int8")
+        code[1:] = np.select(
+            [
+                upper_opened & bottom_opened,
+                upper_opened & bottom_closed,
+                upper_closed & bottom_opened,
+            ],
+            [1, 2, 3],
+            0,
+        )
+        codes.append(code)
+    return np.stack(codes)
+
+
+def _sweep_chunk(
+    means: Arrays,
+    stds: Arrays,
+    grid: SweepGrid,
+    observations: int,
+    dtype: str,
+) -> np.ndarray:
+    didi = _didi_results(means, grid.didi_number_samples, observations)
+    codes = _bollinger_codes(
+        means, stds, grid.bollinger_number_samples, grid.bollinger_number_STDs
+    )
+    weights = np.array(
+        [[0.0, 1.0, upper, bottom] for upper, bottom in grid.weights()]
+    )
+    # (bollinger setups, weights, samples)
+    bollinger = np.moveaxis(weights[:, codes], 0, 1)
+
+    scores = didi.astype(dtype)[:, None, None, :] * bollinger.astype(dtype)
+    scores = scores.reshape(-1, scores.shape[-1])
+    scores[:, :1] = np.nan  # As in 'DidiClassifier.apply'
+    return scores
+
+
+class DidiClassifierSweep:
+    """Evaluates all the setups of a 'SweepGrid' over one klines
+    dataframe, returning a compact score matrix (setups x samples)
+    instead of one classified dataframe per setup.
+
+    The matrix holds len(setups) * len(klines) values of 'dtype', so,
+    for large grids over long histories, sweep it in parts (e.g. one
+    'didi_number_samples' at a time).
+    """
+
+    __slots__ = ["_klines", "_len_rolling_window"]
+
+    def __init__(self, klines):
+        self._klines = klines
+        self._len_rolling_window = DidiClassifier(klines)._len_rolling_window
+
+    def _minimum_number_samples(self, grid: SweepGrid) -> int:
+        n_didi = max(max(samples) for samples in grid.didi_number_samples)
+        n_minimum = max(max(grid.bollinger_number_samples), n_didi)
+        return n_minimum + self._len_rolling_window
+
+    def _rolling(self, grid: SweepGrid) -> Tuple[Arrays, Arrays]:
+        price = self._klines.indicator.price
+        self._klines.indicator.cache.validate()
+
+        windows = set(grid.bollinger_number_samples)
+        for number_samples in grid.didi_number_samples:
+            windows.update(number_samples)
+
+        means = {
+            window: price.rolling_mean(grid.price_metrics, window).to_numpy()
+            for window in windows
+        }
+        stds = {
+            window: price.rolling_std(grid.price_metrics, window).to_numpy()
+            for window in grid.bollinger_number_samples
+        }
+        return means, stds
+
+    def run(
+        self, grid: SweepGrid, processes: int = 1, dtype: str = "float32"
+    ) -> SweepResult:
+        """Evaluates the grid.
+
+        Args:
+            grid (SweepGrid): The setups to be evaluated.
+            processes (int, optional): If greater than 1, the didi setups
+            are split among a pool of processes. Defaults to 1.
+            dtype (str, optional): Of the score matrix. Defaults to
+            "float32".
+
+        Raises:
+            IndexError: If there are not enough klines for some setup.
+        """
+
+        setups = grid.setups()  # Also validates the grid values
+        n_samples_min = self._minimum_number_samples(grid)
+        if len(self._klines) < n_samples_min:
+            raise IndexError(
+                "Klines must have at least {} rows.".format(n_samples_min)
+            )
+
+        means, stds = self._rolling(grid)
+        didi_number_samples = grid.didi_number_samples
+        chunk_len = math.ceil(len(didi_number_samples) / max(processes, 1))
+        chunks = [
+            grid.copy(
+                update=dict(
+                    didi_number_samples=didi_number_samples[i : i + chunk_len]
+                )
+            )
+            for i in range(0, len(didi_number_samples), chunk_len)
+        ]
+        arguments = (
+            [means] * len(chunks),
+            [stds] * len(chunks),
+            chunks,
+            [self._len_rolling_window] * len(chunks),
+            [dtype] * len(chunks),
+        )
+
+        if len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                scores = list(executor.map(_sweep_chunk, *arguments))
+        else:
+            scores = list(map(_sweep_chunk, *arguments))
+
+        return SweepResult(setups=setups, scores=np.concatenate(scores))
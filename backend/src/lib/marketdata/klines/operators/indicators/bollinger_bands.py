@@ -5,6 +5,9 @@
 
 from pydantic import BaseModel
 
+from .price import price_from_kline
+from .rolling import IndicatorStream, RollingWindow
+
 class Setup(BaseModel):
     """Setup of Bollinger bands volatility indicator"""
 
@@ -20,15 +23,13 @@ class BollingerBands:
         self._klines = klines
 
     def apply(self, setup:Setup=Setup()):
-        self._klines.indicator.price.apply(price_metrics=setup.price_metrics)
+        price = self._klines.indicator.price
+        price.apply(price_metrics=setup.price_metrics)
         n_parameter = setup.number_samples
         k_parameter = setup.number_STDs
 
-        price_column = getattr(
-            self._klines, "Price_{}".format(setup.price_metrics)
-        )
-        sma = price_column.rolling(window=n_parameter).mean()
-        deviation = price_column.rolling(window=n_parameter).std()
+        sma = price.rolling_mean(setup.price_metrics, n_parameter)
+        deviation = price.rolling_std(setup.price_metrics, n_parameter)
 
         upper_band = sma + k_parameter * deviation
         bottom_band = sma - k_parameter * deviation
@@ -36,3 +37,25 @@ class BollingerBands:
         self._klines.loc[:, "Bollinger_SMA"] = sma
         self._klines.loc[:, "BB_upper"] = upper_band
         self._klines.loc[:, "BB_bottom"] = bottom_band
+
+
+class BollingerBandsStream(IndicatorStream):
+    """Incremental counterpart of 'BollingerBands'"""
+
+    __slots__ = ["setup", "_window"]
+
+    def __init__(self, setup: Setup = Setup()):
+        super().__init__()
+        self.setup = setup
+        self._window = RollingWindow(setup.number_samples)
+
+    def _update(self, kline: dict) -> dict:
+        self._window.append(price_from_kline(kline, self.setup.price_metrics))
+        sma = self._window.mean()
+        deviation = self._window.std()
+
+        return {
+            "Bollinger_SMA": sma,
+            "BB_upper": sma + self.setup.number_STDs * deviation,
+            "BB_bottom": sma - self.setup.number_STDs * deviation,
+        }
@@ -0,0 +1,87 @@
+"""Cache of the columns derived from a klines dataframe"""
+
+# pylint: disable=too-few-public-methods
+
+import hashlib
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+ohlcv_columns = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _as_buffer(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype == object:
+        return pd.util.hash_array(values)
+    return np.ascontiguousarray(values)
+
+
+class ComputedColumnsCache:
+    """Keeps the intermediate series (price, rolling means, rolling
+    deviations...) computed over a klines dataframe, keyed by the
+    operation and its setup, so the indicators applied over the same
+    klines reuse them instead of computing them again.
+
+    The cache belongs to one dataframe (it lives on the 'indicator'
+    accessor, which pandas instantiates once per dataframe) and is
+    cleared whenever the OHLCV columns (or the index) of that dataframe
+    change; 'validate' must be called before a batch of 'get' calls.
+    """
+
+    __slots__ = [
+        "_klines",
+        "_fingerprint",
+        "_series",
+        "hits",
+        "misses",
+    ]
+
+    def __init__(self, klines: pd.core.frame.DataFrame):
+        self._klines = klines
+        self._fingerprint = None
+        self._series = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def _current_fingerprint(self) -> bytes:
+        digest = hashlib.sha1(_as_buffer(self._klines.index))
+        for column in ohlcv_columns:
+            if column in self._klines.columns:
+                digest.update(column.encode("utf-8"))
+                digest.update(_as_buffer(self._klines[column]))
+        return digest.digest()
+
+    def validate(self) -> None:
+        """Clears the cache if the OHLCV columns changed since the last
+        validation."""
+
+        fingerprint = self._current_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._series.clear()
+            self._fingerprint = fingerprint
+
+    def clear(self) -> None:
+        """Drops all the cached series."""
+
+        self._series.clear()
+        self._fingerprint = None
+
+    def get(
+        self, key: Hashable, compute: Callable[[], pd.core.series.Series]
+    ) -> pd.core.series.Series:
+        """The cached series for 'key', computed (and kept) on a miss.
+
+        Args:
+            key (Hashable): (operation, *setup) e.g. ("sma", "ohlc4", 20)
+            compute (Callable): Computes the series, if not cached.
+        """
+
+        try:
+            series = self._series[key]
+            self.hits += 1
+        except KeyError:
+            series = self._series[key] = compute()
+            self.misses += 1
+        return series
@@ -8,6 +8,8 @@ from typing import Sequence  # List, Optional,
 from pydantic import BaseModel, validator
 
 from ......utils.schemas.generics import possible_price_metrics
+from .price import price_from_kline
+from .rolling import IndicatorStream, RollingWindow
 
 
 class Setup(BaseModel):
@@ -95,17 +97,36 @@ class DidiIndex:
         :type setup: Setup, optional
         """
 
-        self._klines.indicator.price.apply(price_metrics=setup.price_metrics)
-        price_column = getattr(
-            self._klines, "Price_{}".format(setup.price_metrics)
-        )
-        sma_series = list()
-
-        for number in setup.number_samples:
-            sma_series.append(price_column.rolling(window=number).mean())
+        price = self._klines.indicator.price
+        price.apply(price_metrics=setup.price_metrics)
+        sma_series = [
+            price.rolling_mean(setup.price_metrics, number)
+            for number in setup.number_samples
+        ]
 
         self._klines.loc[:, "Didi_fast"] = sma_series[0] / sma_series[1] - 1
-        self._klines.loc[:, "Didi_middle"] = self._klines.apply(
-            lambda row: 0.0, axis=1
-        )
+        self._klines.loc[:, "Didi_middle"] = 0.0
         self._klines.loc[:, "Didi_slow"] = sma_series[2] / sma_series[1] - 1
+
+
+class DidiIndexStream(IndicatorStream):
+    """Incremental counterpart of 'DidiIndex'"""
+
+    __slots__ = ["setup", "_windows"]
+
+    def __init__(self, setup: Setup = Setup()):
+        super().__init__()
+        self.setup = setup
+        self._windows = [RollingWindow(size) for size in setup.number_samples]
+
+    def _update(self, kline: dict) -> dict:
+        price = price_from_kline(kline, self.setup.price_metrics)
+        for window in self._windows:
+            window.append(price)
+        fast, middle, slow = (window.mean() for window in self._windows)
+
+        return {
+            "Didi_fast": fast / middle - 1,
+            "Didi_middle": 0.0,
+            "Didi_slow": slow / middle - 1,
+        }
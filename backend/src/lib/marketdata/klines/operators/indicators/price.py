@@ -13,6 +13,8 @@
 "ohlc4" = ("Open" + "High" + "Low" + "Close")/4
 """
 
+import pandas as pd
+
 columns = {
     "o": ["Open"],
     "h": ["High"],
@@ -25,14 +27,78 @@ columns = {
 }
 
 
+def price_from_kline(kline: dict, price_metrics: str = "ohlc4") -> float:
+    """The price of a single kline (a dict or a pandas Series).
+
+    :raises AttributeError: Unlisted 'price_metrics'
+    """
+
+    if price_metrics not in columns:
+        raise AttributeError(
+            "price_metrics should be in {}".format(list(columns.keys()))
+        )
+    values = [float(kline[column]) for column in columns[price_metrics]]
+    return sum(values) / len(values)
+
+
 class PriceFromKline:
-    """Price of an asset, from it's kline."""
+    """Price of an asset, from it's kline. The price series, and the
+    rolling statistics over them, are kept on the klines computed
+    columns cache ('klines.indicator.cache'), so the indicators which
+    share a price metrics (or a rolling window) compute it just once."""
 
     __slots__ = ["_klines"]
 
     def __init__(self, klines):
         self._klines = klines
 
+    @property
+    def _cache(self):
+        return self._klines.indicator.cache
+
+    def series(self, price_metrics="ohlc4") -> pd.core.series.Series:
+        """The price series, calculated as an average of the values of
+        the indicated columns.
+
+        :raises AttributeError: Unlisted 'price_metrics'
+        """
+
+        price_keys = list(columns.keys())
+        except_msg = "price_metrics should be in {}".format(price_keys)
+
+        if price_metrics not in price_keys:
+            raise AttributeError(except_msg)
+
+        return self._cache.get(
+            key=("price", price_metrics),
+            compute=lambda: self._klines[columns[price_metrics]].mean(axis=1),
+        )
+
+    def rolling_mean(
+        self, price_metrics: str, window: int
+    ) -> pd.core.series.Series:
+        """Moving average of the price, over 'window' samples."""
+
+        return self._cache.get(
+            key=("rolling_mean", price_metrics, window),
+            compute=lambda: self.series(price_metrics)
+            .rolling(window=window)
+            .mean(),
+        )
+
+    def rolling_std(
+        self, price_metrics: str, window: int
+    ) -> pd.core.series.Series:
+        """Moving standard deviation of the price, over 'window'
+        samples."""
+
+        return self._cache.get(
+            key=("rolling_std", price_metrics, window),
+            compute=lambda: self.series(price_metrics)
+            .rolling(window=window)
+            .std(),
+        )
+
     def apply(self, price_metrics="ohlc4") -> None:
         """Calculation of the price, per se, from an average of the
         values ​​of the indicated columns
@@ -43,13 +109,6 @@ class PriceFromKline:
         :raises AttributeError: Unlisted 'price_metrics'
         """
 
-        price_keys = list(columns.keys())
-        except_msg = "price_metrics should be in {}".format(price_keys)
-
-        if price_metrics in price_keys:
-            price_column = "Price_{}".format(price_metrics)
-            columns_ = self._klines[columns[price_metrics]]
-            self._klines.loc[:, price_column] = columns_.mean(axis=1)
-            return
-
-        raise AttributeError(except_msg)
+        self._cache.validate()
+        price_column = "Price_{}".format(price_metrics)
+        self._klines.loc[:, price_column] = self.series(price_metrics)
@@ -0,0 +1,133 @@
+"""Rolling state, for the incremental (streaming) indicators"""
+
+# pylint: disable=too-few-public-methods
+
+import math
+from collections import deque
+
+nan = float("nan")
+
+
+class RollingWindow:
+    """Mean and standard deviation of the last 'size' appended values,
+    updated in O(1) per value (running mean and sliding Welford's sum of
+    squared deviations). As the pandas 'rolling' counterpart, both are
+    NaN until the window is full, or while it holds a NaN value.
+    """
+
+    __slots__ = [
+        "size",
+        "_values",
+        "_nans",
+        "_count",
+        "_mean",
+        "_m2",
+    ]
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values = deque()
+        self._nans = 0
+        self._count = 0  # finite values in the window
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _add(self, value: float) -> None:
+        if math.isnan(value):
+            self._nans += 1
+            return
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            self._nans -= 1
+            return
+        self._count -= 1
+        if not self._count:
+            self._mean = self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self._count
+        self._m2 -= delta * (value - self._mean)
+
+    def append(self, value: float) -> None:
+        """Slides the window, appending a new value."""
+
+        value = float(value)
+        self._values.append(value)
+        self._add(value)
+        if len(self._values) > self.size:
+            self._remove(self._values.popleft())
+
+    @property
+    def is_full(self) -> bool:
+        """The window holds 'size' finite values."""
+
+        return self._count == self.size and not self._nans
+
+    def mean(self) -> float:
+        """Mean of the values in the window."""
+
+        return self._mean if self.is_full else nan
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas) of the values
+        in the window."""
+
+        if not self.is_full or self.size < 2:
+            return nan
+        return math.sqrt(max(self._m2, 0.0) / (self.size - 1))
+
+
+class IndicatorStream:
+    """Base of the stateful (streaming) counterparts of the indicators,
+    for long-running monitors: instead of applying the indicator over
+    the whole klines dataframe on each new candle, 'warm_up' once with
+    the history and then 'update' with each new closed kline; each
+    update is O(1) and returns the indicator columns for that kline.
+
+    Klines whose 'Open_time' is not newer than the last one are ignored
+    (the last result is returned), so polling the same closed candle
+    twice is harmless.
+    """
+
+    __slots__ = ["last_open_time", "last_result"]
+
+    def __init__(self):
+        self.last_open_time = None
+        self.last_result = dict()
+
+    def _update(self, kline: dict) -> dict:
+        raise NotImplementedError
+
+    def update(self, kline: dict) -> dict:
+        """Updates the state with a new kline.
+
+        Args:
+            kline (dict): A kline (OHLCV and, optionally, 'Open_time')
+            e.g. a dataframe row, as a dict or a pandas Series.
+
+        Returns:
+            dict: The indicator columns (name: value) for the kline.
+        """
+
+        open_time = kline.get("Open_time")
+        if open_time is not None:
+            if self.last_open_time is not None and (
+                open_time <= self.last_open_time
+            ):
+                return self.last_result
+            self.last_open_time = open_time
+
+        self.last_result = self._update(kline)
+        return self.last_result
+
+    def warm_up(self, klines) -> dict:
+        """Feeds the state with the klines of a dataframe, in order."""
+
+        for kline in klines.to_dict("records"):
+            self.update(kline)
+        return self.last_result
@@ -5,6 +5,9 @@
 
 from pydantic import BaseModel
 
+from .price import price_from_kline
+from .rolling import IndicatorStream, RollingWindow
+
 class Setup(BaseModel):
     """Setup of simple moving average indicator"""
 
@@ -33,12 +36,26 @@ class SimpleMovingAverage:
         :type setup: Setup, optional
         """
 
-        self._klines.indicator.price.apply(price_metrics=setup.price_metrics)
+        price = self._klines.indicator.price
+        price.apply(price_metrics=setup.price_metrics)
         indicator_column = "SMA_{}".format(setup.number_samples)
 
-        price_column = getattr(
-            self._klines, "Price_{}".format(setup.price_metrics)
+        self._klines.loc[:, indicator_column] = price.rolling_mean(
+            setup.price_metrics, setup.number_samples
         )
-        self._klines.loc[:, indicator_column] = price_column.rolling(
-            window=setup.number_samples
-        ).mean()
+
+
+class SimpleMovingAverageStream(IndicatorStream):
+    """Incremental counterpart of 'SimpleMovingAverage'"""
+
+    __slots__ = ["setup", "_window"]
+
+    def __init__(self, setup: Setup = Setup()):
+        super().__init__()
+        self.setup = setup
+        self._window = RollingWindow(setup.number_samples)
+
+    def _update(self, kline: dict) -> dict:
+        self._window.append(price_from_kline(kline, self.setup.price_metrics))
+        indicator_column = "SMA_{}".format(self.setup.number_samples)
+        return {indicator_column: self._window.mean()}
@@ -0,0 +1,148 @@
+"""Derivation of the klines of any time frame from a base (e.g. 1m)
+klines series, in process, so a single stream has to be downloaded and
+stored, and every other time frame is served from it.
+
+The aggregation is vectorized: the base klines (sorted by 'Open_time')
+are labeled with the open time of the bucket they belong to and each
+column is reduced, bucket by bucket, with a NumPy 'reduceat'. Buckets
+are aligned as the brokers (Binance) align them: to the epoch, except
+weeks, which start on mondays, and months, which start on the first
+day of the month.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from ....utils.tools.time_handlers import time_frame_to_seconds
+
+DF = pd.core.frame.DataFrame
+
+# 1970-01-01 (the epoch) was a thursday; 1970-01-05, a monday
+WEEK_OFFSET = 4 * 86400
+
+aggregations: Dict[str, str] = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+    "Close_time": "last",
+    "Quote_asset_volume": "sum",
+    "Number_of_trades": "sum",
+    "Taker_buy_base_asset_volume": "sum",
+    "Taker_buy_quote_asset_volume": "sum",
+}
+
+
+def _months(open_times: np.ndarray) -> np.ndarray:
+    """Months since the epoch"""
+
+    datetimes = open_times.astype("datetime64[s]")
+    return datetimes.astype("datetime64[M]").astype("int64")
+
+
+def _from_months(months: np.ndarray) -> np.ndarray:
+    datetimes = months.astype("datetime64[M]").astype("datetime64[s]")
+    return datetimes.astype("int64")
+
+
+def bucket_open_times(open_times: np.ndarray, time_frame: str) -> np.ndarray:
+    """Open time of the 'time_frame' kline that holds each open time.
+
+    Args:
+        open_times (np.ndarray): Integer timestamps (seconds).
+        time_frame (str): <amount><scale_unit> e.g. '15m', '1w', '1M'.
+    """
+
+    open_times = np.asarray(open_times, dtype="int64")
+    if time_frame[-1] == "M":
+        amount = int(time_frame[:-1])
+        return _from_months(_months(open_times) // amount * amount)
+
+    step = time_frame_to_seconds(time_frame)
+    offset = WEEK_OFFSET if time_frame[-1] == "w" else 0
+    return (open_times - offset) // step * step + offset
+
+
+def shift_open_times(
+    open_times: np.ndarray, time_frame: str, number_samples: int
+) -> np.ndarray:
+    """Open time of the 'time_frame' kline 'number_samples' klines after
+    (or before, if negative) each given one; calendar months are shifted
+    as such, not by a fixed number of seconds."""
+
+    open_times = np.asarray(open_times, dtype="int64")
+    if time_frame[-1] == "M":
+        amount = int(time_frame[:-1])
+        return _from_months(_months(open_times) + number_samples * amount)
+    return open_times + number_samples * time_frame_to_seconds(time_frame)
+
+
+def next_bucket_open_times(
+    bucket_open_time: np.ndarray, time_frame: str
+) -> np.ndarray:
+    """Open time of the 'time_frame' kline after each given one."""
+
+    return shift_open_times(bucket_open_time, time_frame, 1)
+
+
+def _reduce(values: np.ndarray, how: str, starts, ends) -> np.ndarray:
+    if how == "first":
+        return values[starts]
+    if how == "last":
+        return values[ends]
+    if how == "max":
+        return np.fmax.reduceat(values, starts)  # NaN ignored
+    if how == "min":
+        return np.fmin.reduceat(values, starts)
+    return np.add.reduceat(np.nan_to_num(values), starts)
+
+
+def resample(
+    klines: DF,
+    time_frame: str,
+    base_time_frame: str = "1m",
+    drop_unclosed: bool = True,
+) -> DF:
+    """Aggregates base klines into 'time_frame' klines.
+
+    Args:
+        klines (DF): Base klines, sorted by 'Open_time' (timestamps).
+        time_frame (str): Target time frame e.g. '4h', '1w', '1M'.
+        base_time_frame (str, optional): Of the input klines. Defaults
+        to "1m".
+        drop_unclosed (bool, optional): If True, the last kline is
+        dropped when the base klines do not fill it. Defaults to True.
+
+    Returns:
+        DF: The 'Open_time' column and, for each aggregable input
+        column (see 'aggregations'), its aggregated values.
+    """
+
+    columns = [column for column in aggregations if column in klines]
+    if not len(klines):
+        return pd.DataFrame(columns=["Open_time"] + columns)
+
+    open_times = klines.Open_time.to_numpy(dtype="int64")
+    buckets = bucket_open_times(open_times, time_frame)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:] - 1, len(buckets) - 1]
+
+    resampled = pd.DataFrame({"Open_time": buckets[starts]})
+    for column in columns:
+        values = klines[column].to_numpy()
+        if values.dtype.kind == "f":  # Compact (float32) ones, summed
+            values = values.astype("float64")  # with full precision
+        resampled[column] = _reduce(
+            values, aggregations[column], starts, ends
+        )
+
+    if drop_unclosed:
+        last_base_open_time = next_bucket_open_times(
+            buckets[-1], time_frame
+        ) - time_frame_to_seconds(base_time_frame)
+        if open_times[-1] < last_base_open_time:
+            resampled = resampled[:-1]
+    return resampled
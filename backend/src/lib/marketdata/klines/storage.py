@@ -1,31 +1,138 @@
 # pylint: disable=too-few-public-methods
+# pylint: disable=no-name-in-module
 
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from ....utils.databases.time_series_storage.models import StorageKlines
 from ....utils.exceptions import KlinesError, StorageError
 from ....utils.schemas.generics import Ticker, DateTimeType
-from ....utils.tools.time_handlers import ParseDateTime, int_timestamp
+from ....utils.tools.time_handlers import (
+    Now,
+    ParseDateTime,
+    int_timestamp,
+    time_frame_to_seconds,
+)
 from .base import DF, Getter
 from .from_broker import GetterFromBroker
+from .resampling import bucket_open_times, next_bucket_open_times, resample
+
+DAY = 86400  # Seconds
 
 
 class GetterFromStorage(Getter):
-    """Entrypoint for requests to the stored klines"""
+    """Entrypoint for requests to the stored klines.
 
-    def __init__(self, broker_name: str, ticker: Ticker, time_frame: str):
+    If a 'base_time_frame' (e.g. "1m") is given, the klines are derived
+    in process from the stored base klines (module 'resampling'),
+    instead of aggregated by the storage; so every time frame, including
+    "1w" and "1M", is served from a single stored stream.
+    """
+
+    def __init__(
+        self,
+        broker_name: str,
+        ticker: Ticker,
+        time_frame: str,
+        base_time_frame: str = str(),
+    ):
+        self.base_time_frame = base_time_frame
+        self.base_storage = (
+            StorageKlines(
+                table="{}_{}".format(
+                    broker_name.lower(), ticker.symbol.lower()
+                ),
+                time_frame=base_time_frame,
+            )
+            if base_time_frame and base_time_frame != time_frame
+            else None
+        )
         super().__init__(broker_name, ticker, time_frame)
 
     def oldest_open_time(self) -> int:
-        return self.storage.oldest_open_time()
+        if self.base_storage is None:
+            return self.storage.oldest_open_time()
+        oldest = self.base_storage.oldest_open_time()
+        return int(bucket_open_times([oldest], self.time_frame)[0])
 
     def newest_open_time(self) -> int:
-        return self.storage.newest_open_time()
+        if self.base_storage is None:
+            return self.storage.newest_open_time()
+        newest = self.base_storage.newest_open_time()
+        return int(bucket_open_times([newest], self.time_frame)[0])
+
+    def _get_resampled(self, since: int, until: int) -> DF:
+        first = bucket_open_times([since], self.time_frame)[0]
+        last = next_bucket_open_times(
+            bucket_open_times([until], self.time_frame), self.time_frame
+        )[0] - time_frame_to_seconds(self.base_time_frame)
+
+        base_klines = self.base_storage.get_by_time_range(
+            int(first), int(last)
+        )
+        klines = resample(
+            base_klines, self.time_frame, base_time_frame=self.base_time_frame
+        )
+        return klines[klines.Open_time >= since]
+
+    def _pages(self, since: int, until: int) -> Iterator[DF]:
+        if self.base_storage is not None:
+            yield from super()._pages(since, until)
+            return
+        try:
+            yield from self.storage.iter_by_time_range(
+                since, until, page_samples=self.settings.page_samples
+            )
+        except StorageError as err:
+            raise Exception.with_traceback(err) from StorageError
 
     def _get_core(self, since: int, until: int) -> DF:
         try:
+            if self.base_storage is not None:
+                return self._get_resampled(since, until)
             return self.storage.get_by_time_range(since, until)
         except StorageError as err:
             raise Exception.with_traceback(err) from StorageError
 
 
+class KlinesCoverage(BaseModel):
+    """Which klines of a time range are stored; 'gaps' are the (first,
+    last) open times of each run of missing klines."""
+
+    broker_name: str
+    ticker_symbol: str
+    time_frame: str
+    since: int
+    until: int
+    expected: int
+    stored: int
+    gaps: List[Tuple[int, int]]
+
+    @property
+    def ratio(self) -> float:
+        """Stored / expected klines"""
+
+        return self.stored / self.expected if self.expected else 1.0
+
+
+def missing_runs(
+    open_times: np.ndarray, present: np.ndarray, step: int
+) -> List[Tuple[int, int]]:
+    """(first, last) open times of each run of consecutive missing
+    ('present' False) open times, on a grid of 'step' seconds."""
+
+    missing = open_times[~present]
+    if not len(missing):
+        return list()
+
+    breaks = np.flatnonzero(np.diff(missing) != step)
+    firsts = np.concatenate([missing[:1], missing[breaks + 1]])
+    lasts = np.concatenate([missing[breaks], missing[-1:]])
+    return [(int(first), int(last)) for first, last in zip(firsts, lasts)]
+
+
 class ScrapingFromBrokerToStorage:
     """Entrypoint to append klines to StorageKlines"""
 
@@ -51,3 +158,113 @@ class ScrapingFromBrokerToStorage:
         """
 
         return self.klines_getter.get(since=since, until=until)
+
+    def _grid(self, since: int, until: int) -> np.ndarray:
+        step = time_frame_to_seconds(self.klines_getter.time_frame)
+        return np.arange(-(-since // step) * step, until + 1, step)
+
+    def _incomplete_days(self, grid: np.ndarray) -> List[Tuple[int, int]]:
+        """(since, until) of the runs of days not fully stored; counting
+        per day first, avoids listing every kline of a long history."""
+
+        storage = self.klines_getter.storage
+        counts = storage.count_by_time_range(grid[0], grid[-1], bucket="1d")
+
+        days, expected = np.unique(grid // DAY * DAY, return_counts=True)
+        stored = dict(zip(counts.Open_time, counts.Count))
+        complete = np.array(
+            [stored.get(day, 0) >= n for day, n in zip(days, expected)]
+        )
+        return [
+            (max(first, int(grid[0])), min(last + DAY - 1, int(grid[-1])))
+            for first, last in missing_runs(days, complete, DAY)
+        ]
+
+    def coverage(
+        self,
+        since: Optional[DateTimeType] = None,
+        until: Optional[DateTimeType] = None,
+    ) -> KlinesCoverage:
+        """Compares the stored klines with the ones the broker serves
+        on the time range, which defaults to the whole broker history
+        until the newest closed kline.
+
+        Args:
+            since (DateTimeType, optional): Start desired datetime
+            until (DateTimeType, optional): End desired datetime
+        """
+
+        getter = self.klines_getter
+        step = time_frame_to_seconds(getter.time_frame)
+        since = int_timestamp(since) if since else getter.oldest_open_time()
+        last_closed = Now().utc_timestamp() // step * step - step
+        until = (
+            min(int_timestamp(until), last_closed) if until else last_closed
+        )
+        grid = self._grid(since, until)
+
+        gaps = list()
+        if len(grid):
+            ranges = (
+                self._incomplete_days(grid)
+                if step < DAY
+                else [(int(grid[0]), int(grid[-1]))]
+            )
+            for first, last in ranges:
+                counts = getter.storage.count_by_time_range(
+                    first, last, bucket=getter.time_frame
+                )
+                sub_grid = self._grid(first, last)
+                present = np.isin(sub_grid, counts.Open_time.to_numpy())
+                gaps += missing_runs(sub_grid, present, step)
+
+        missing = sum((last - first) // step + 1 for first, last in gaps)
+        return KlinesCoverage(
+            broker_name=getter.broker_name,
+            ticker_symbol=getter.ticker.symbol,
+            time_frame=getter.time_frame,
+            since=since,
+            until=until,
+            expected=len(grid),
+            stored=len(grid) - missing,
+            gaps=gaps,
+        )
+
+    def sync(
+        self,
+        since: Optional[DateTimeType] = None,
+        until: Optional[DateTimeType] = None,
+    ) -> KlinesCoverage:
+        """Incremental alternative to 'append_time_range': downloads
+        (and stores) only the klines missing on the storage, i.e. the
+        gaps of the stored history and the tail since its newest kline.
+
+        Returns:
+            KlinesCoverage: The coverage before the sync; its gaps are
+            the downloaded time ranges.
+        """
+
+        coverage = self.coverage(since, until)
+        for first, last in coverage.gaps:
+            self.klines_getter.get(since=first, until=last)
+        return coverage
+
+
+def coverage_map(
+    broker_name: str,
+    tickers: List[Ticker],
+    time_frames: List[str],
+    since: Optional[DateTimeType] = None,
+    until: Optional[DateTimeType] = None,
+) -> Dict[str, Dict[str, KlinesCoverage]]:
+    """Coverage of the stored klines by ticker symbol and time frame."""
+
+    return {
+        ticker.symbol: {
+            time_frame: ScrapingFromBrokerToStorage(
+                broker_name, ticker, time_frame
+            ).coverage(since, until)
+            for time_frame in time_frames
+        }
+        for ticker in tickers
+    }
@@ -0,0 +1,212 @@
+"""Vectorized backtesting of the score-threshold strategies.
+
+The trading preferences ('Trading', config.preferences) make the target
+position a pure function of the classifier 'Score' column: long (with
+'leverage') when the score reaches 'score_that_triggers_long_side',
+short (or flat, if naked sells are not allowed) when it reaches
+'score_that_triggers_short_side', and unchanged otherwise. So the
+positions, trades, fees and equity curve of a whole scored klines frame
+are computed at once, with NumPy array operations, instead of replaying
+it candle by candle.
+
+The orders are filled as the event-driven 'BackTestingBroker' fills
+market orders: at the price (of 'price_metrics') of the candle whose
+close triggered them, paying 'fee_rate' over the traded amount; each
+position is opened with the whole equity (times the leverage).
+"""
+
+# pylint: disable=no-name-in-module
+# pylint: disable=too-few-public-methods
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from ...config.preferences import BackTesting, Trading
+from ...utils.schemas.generics import Order, Signals
+from ...utils.tools.time_handlers import time_frame_to_seconds
+from ..brokers_wrappers.backtesting import BackTestingBroker
+from ..marketdata.klines.operators.indicators.price import columns
+
+DF = pd.core.frame.DataFrame
+
+signals = Signals()
+
+
+class BacktestSummary(BaseModel):
+    """Figures of an equity curve"""
+
+    initial_equity: float
+    final_equity: float
+    total_return: float  # Decimal, e.g. 0.1 is +10%
+    number_of_trades: int
+    fees: float
+    max_drawdown: float  # Decimal, e.g. 0.2 is -20% from the peak
+
+
+def target_positions(score: np.ndarray, trading: Trading) -> np.ndarray:
+    """The position held after each candle: +leverage (long), 0 (flat)
+    or -leverage (short). NaN scores (e.g. warming up indicators) keep
+    the current position."""
+
+    score = np.asarray(score, dtype="float64")
+    short_side = -trading.leverage if trading.allow_naked_sells else 0.0
+
+    signal = np.full(len(score), np.nan)
+    signal[score >= trading.score_that_triggers_long_side] = trading.leverage
+    signal[score <= trading.score_that_triggers_short_side] = short_side
+
+    # Forward fill of the signals: the index of the last one, so far
+    index = np.where(np.isnan(signal), -1, np.arange(len(score)))
+    index = np.maximum.accumulate(index)
+    return np.where(index >= 0, signal[np.maximum(index, 0)], 0.0)
+
+
+def backtest(
+    scored_klines: DF,
+    trading: Optional[Trading] = None,
+    fee_rate: float = 0.001,
+    price_metrics: str = BackTesting().price_metrics,
+    initial_equity: float = 1000.0,
+) -> DF:
+    """Backtests the score-threshold strategy over scored klines.
+
+    Args:
+        scored_klines (DF): Klines (sorted by 'Open_time') with the OHLC
+        columns and the classifier 'Score' column.
+        trading (Trading, optional): Thresholds, naked sells and
+        leverage. Defaults to the 'Trading' preferences.
+        fee_rate (float, optional): Decimal, over the traded amount.
+        price_metrics (str, optional): Of the fill and valuation price.
+        initial_equity (float, optional): In quote asset.
+
+    Returns:
+        DF: For each kline, 'Open_time', 'Price', the 'Position' held
+        after it, whether it triggered a 'Trade', the 'Fee' paid and
+        the (marked to market) 'Equity'.
+    """
+
+    trading = trading or Trading()
+    price = np.mean(
+        [
+            scored_klines[column].to_numpy(dtype="float64")
+            for column in columns[price_metrics]
+        ],
+        axis=0,
+    )
+    position = target_positions(scored_klines.Score.to_numpy(), trading)
+    previous = np.r_[0.0, position[:-1]]
+    trade = position != previous
+    steps = np.arange(len(price))
+
+    # Candle where the position of each candle was opened
+    entry = np.maximum.accumulate(np.where(trade, steps, 0))
+    previous_entry = np.r_[0, entry[:-1]]
+
+    # Equity multipliers of each trade: closing the previous position
+    # (its P&L and fee), then paying the fee of opening the new one
+    ratio = price / price[previous_entry]
+    closing = 1 + previous * (ratio - 1) - fee_rate * np.abs(previous) * ratio
+    opening = 1 / (1 + fee_rate * np.abs(position))
+    multiplier = np.where(trade, closing * opening, 1.0)
+
+    # Equity right after opening the position held on each candle
+    opened_equity = initial_equity * np.cumprod(multiplier)
+    previous_opened_equity = np.r_[initial_equity, opened_equity[:-1]]
+
+    closing_fee = previous_opened_equity * fee_rate * np.abs(previous) * ratio
+    opening_fee = previous_opened_equity * closing * (1 - opening)
+    fee = np.where(trade, closing_fee + opening_fee, 0.0)
+    equity = opened_equity * (1 + position * (price / price[entry] - 1))
+
+    return pd.DataFrame(
+        dict(
+            Open_time=scored_klines.Open_time.to_numpy(),
+            Price=price,
+            Position=position,
+            Trade=trade,
+            Fee=fee,
+            Equity=equity,
+        )
+    )
+
+
+def summarize(result: DF, initial_equity: float = 1000.0) -> BacktestSummary:
+    """The figures of a 'backtest' result."""
+
+    equity = result.Equity.to_numpy()
+    peak = np.maximum.accumulate(np.r_[initial_equity, equity])[1:]
+    final_equity = float(equity[-1]) if len(equity) else initial_equity
+
+    return BacktestSummary(
+        initial_equity=initial_equity,
+        final_equity=final_equity,
+        total_return=final_equity / initial_equity - 1,
+        number_of_trades=int(result.Trade.sum()),
+        fees=float(result.Fee.sum()),
+        max_drawdown=float(np.max(1 - equity / peak, initial=0.0)),
+    )
+
+
+def event_driven_backtest(
+    broker: BackTestingBroker,
+    ticker_symbol: str,
+    scored_klines: DF,
+    trading: Optional[Trading] = None,
+) -> DF:
+    """Reference implementation of 'backtest', for validation: replays
+    the klines loaded on the 'broker', candle by candle, sending market
+    orders. As the simulated broker trades spot only, so does it (no
+    naked sells nor leverage).
+
+    Returns:
+        DF: 'Open_time' and 'Equity' (the broker portfolio value, in the
+        quote asset) of each replayed candle.
+
+    Raises:
+        ValueError: If 'trading' allows naked sells or leverage.
+    """
+
+    trading = trading or Trading()
+    if trading.allow_naked_sells or trading.leverage != 1:
+        raise ValueError("The event-driven backtest trades spot only")
+
+    ticker = broker.tickers[ticker_symbol]
+    scores = pd.Series(
+        scored_klines.Score.to_numpy(), index=scored_klines.Open_time
+    )
+    fee_rate = broker.settings.fee_rate_decimal
+    step = time_frame_to_seconds(broker.time_frame)
+
+    records = list()
+    for clock in broker.replay():
+        score = scores.get(clock - step, np.nan)
+        holding = broker.free_quantity_asset(ticker.base) > 0
+
+        if score >= trading.score_that_triggers_long_side and not holding:
+            price = broker.get_price(ticker_symbol)
+            quantity = broker.free_quantity_asset(ticker.quote) / (
+                price * (1 + fee_rate)
+            )
+            broker.execute_order(
+                Order(
+                    ticker_symbol=ticker_symbol,
+                    order_type="market",
+                    signal=signals.buy,
+                    quantity=quantity * (1 - 1e-12),  # Float rounding
+                )
+            )
+        elif score <= trading.score_that_triggers_short_side and holding:
+            broker.execute_order(
+                Order(
+                    ticker_symbol=ticker_symbol,
+                    order_type="market",
+                    signal=signals.sell,
+                    quantity=broker.free_quantity_asset(ticker.base),
+                )
+            )
+        records.append((clock - step, broker.portfolio_value(ticker.quote)))
+
+    return pd.DataFrame(records, columns=["Open_time", "Equity"])
@@ -1,7 +1,14 @@
 from fastapi import FastAPI
 
 from .API.router import api
+from .lib.brokers_wrappers.base import (
+    close_async_http_sessions,
+    close_http_sessions,
+)
 from .utils.databases.sql.models import Base, engine
+from .utils.databases.time_series_storage.engines.influxdb.base import (
+    close_client_pools,
+)
 from .web.routes import router
 
 Base.metadata.create_all(bind=engine)
@@ -15,6 +22,22 @@ app.mount("", router.web_app)
 #    Config().create_if_do_not_exist()
 
 
+@app.on_event("startup")
+def reset_connection_pools():
+    """Each worker process starts with its own (lazily created) pools,
+    never with connections inherited from a forking parent."""
+
+    close_client_pools()
+    close_http_sessions()
+
+
+@app.on_event("shutdown")
+async def close_connection_pools():
+    close_client_pools()
+    close_http_sessions()
+    await close_async_http_sessions()
+
+
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
@@ -0,0 +1,275 @@
+"""Parallel backtesting of a matrix of tickers, classifier setups and
+periods, using all the cores.
+
+The klines of each ticker and time frame are loaded once, on the main
+process, into the shared klines store; the tasks (one per combination)
+are dispatched to a pool of processes which attach to the store, so the
+klines are neither pickled nor copied. Each worker classifies the
+period of its task (with the warm up klines before it), backtests it
+with the vectorized score-threshold backtest, and returns the equity
+curve; as the tasks complete, the curves are streamed into
+'StorageResults'.
+"""
+
+# pylint: disable=no-name-in-module
+# pylint: disable=protected-access
+# pylint: disable=too-few-public-methods
+
+import functools
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from ...config.preferences import BackTesting, Trading
+from ...lib.marketdata.klines.operators.classifiers.didi_v1 import (
+    DidiClassifier,
+    Setup,
+)
+from ...lib.marketdata.klines.storage import GetterFromStorage
+from ...lib.trading.vectorized_backtest import (
+    BacktestSummary,
+    backtest,
+    summarize,
+)
+from ...utils.databases.time_series_storage.models import StorageResults
+from ...utils.databases.time_series_storage.shared_klines import (
+    SharedKlines,
+    SharedKlinesStore,
+    shared_klines_store,
+)
+from ...utils.schemas.generics import DateTimeType, Ticker
+from ...utils.tools.time_handlers import int_timestamp, time_frame_to_seconds
+
+DF = pd.core.frame.DataFrame
+
+
+class BacktestTask(BaseModel):
+    """A combination of the matrix"""
+
+    ticker: Ticker
+    setup: Setup
+    setup_index: int
+    since: DateTimeType
+    until: DateTimeType
+    period_index: int
+
+    @property
+    def table(self) -> str:
+        """Results table e.g. 'backtest_btcusdt_6h_s0_p1'"""
+
+        return "backtest_{}_{}_s{}_p{}".format(
+            self.ticker.symbol.lower(),
+            self.setup.time_frame,
+            self.setup_index,
+            self.period_index,
+        )
+
+
+class BacktestMatrix(BaseModel):
+    """Tickers x classifier setups x periods; the periods default to
+    the one of the backtesting preferences."""
+
+    tickers: List[Ticker]
+    setups: List[Setup] = [Setup()]
+    periods: List[Tuple[DateTimeType, DateTimeType]] = [
+        (BackTesting().start_datetime, BackTesting().end_datetime)
+    ]
+
+    def tasks(self) -> List[BacktestTask]:
+        """All the combinations"""
+
+        return [
+            BacktestTask(
+                ticker=ticker,
+                setup=setup,
+                setup_index=setup_index,
+                since=since,
+                until=until,
+                period_index=period_index,
+            )
+            for ticker, (setup_index, setup), (period_index, (since, until))
+            in itertools.product(
+                self.tickers, enumerate(self.setups), enumerate(self.periods)
+            )
+        ]
+
+
+class BacktestRunnerSettings(BaseModel):
+    workers: int = os.cpu_count() or 1
+    fee_rate: float = 0.001
+    price_metrics: str = BackTesting().price_metrics
+    initial_equity: float = 1000.0
+
+
+def warm_up_samples(setup: Setup) -> int:
+    """Klines needed before the first classified one"""
+
+    classifier = DidiClassifier(None)
+    classifier.setup = setup
+    return classifier._minimum_number_samples()
+
+
+def _run_task(
+    broker_name: str,
+    task: BacktestTask,
+    trading: Trading,
+    settings: BacktestRunnerSettings,
+    store_directory: str,
+) -> DF:
+    """Backtests a task, on a worker process; returns its equity curve"""
+
+    since, until = int_timestamp(task.since), int_timestamp(task.until)
+    warm_up = warm_up_samples(task.setup)
+    store = SharedKlinesStore(store_directory)
+    with store.open(
+        broker_name,
+        task.ticker.symbol,
+        task.setup.time_frame,
+        since=since - warm_up * time_frame_to_seconds(task.setup.time_frame),
+        until=until,
+    ) as shared:
+        open_times = shared.array("Open_time")
+        first = np.searchsorted(open_times, since, side="left")
+        last = np.searchsorted(open_times, until, side="right")
+
+        # A view of the shared klines; the classifier columns are local
+        first = max(0, first - warm_up)
+        klines = shared.frame().iloc[first:last]
+        klines.classifier.didi.apply(task.setup)
+        klines = klines[klines.Open_time >= since]
+
+        result = backtest(
+            klines,
+            trading=trading,
+            fee_rate=settings.fee_rate,
+            price_metrics=settings.price_metrics,
+            initial_equity=settings.initial_equity,
+        )
+    result.Open_time = result.Open_time.astype("int64")
+    return result
+
+
+class BacktestRunner:
+    """Runs the tasks of a backtest matrix on a pool of processes.
+
+    Args:
+        broker_name (str): Whose stored klines are backtested.
+        matrix (BacktestMatrix): Tickers, setups and periods.
+        trading (Trading, optional): Defaults to the preferences.
+        storage_factory (Callable, optional): Builds the results storage
+        of a table. Defaults to 'StorageResults'.
+    """
+
+    __slots__ = [
+        "broker_name",
+        "matrix",
+        "trading",
+        "settings",
+        "storage_factory",
+        "store",
+    ]
+
+    def __init__(
+        self,
+        broker_name: str,
+        matrix: BacktestMatrix,
+        trading: Optional[Trading] = None,
+        storage_factory: Callable = StorageResults,
+    ):
+        self.broker_name = broker_name
+        self.matrix = matrix
+        self.trading = trading or Trading()
+        self.settings = BacktestRunnerSettings()
+        self.storage_factory = storage_factory
+        self.store = shared_klines_store
+
+    def load_klines(
+        self, ticker: Ticker, time_frame: str, since: int, until: int
+    ) -> DF:
+        """The stored klines of [since, until] (timestamps)."""
+
+        getter = GetterFromStorage(self.broker_name, ticker, time_frame)
+        getter.settings.return_as_human_readable = False
+        return getter.get(since=since, until=until)
+
+    def _share_klines(self, tasks: List[BacktestTask]) -> List[SharedKlines]:
+        """Puts on the shared store, if not there yet (or not covering
+        it), the klines of each ticker and time frame: the union of the
+        periods of its tasks (and their warm up)."""
+
+        handles = list()
+        for key, group in itertools.groupby(
+            sorted(
+                tasks,
+                key=lambda task: (task.ticker.symbol, task.setup.time_frame),
+            ),
+            key=lambda task: (task.ticker.symbol, task.setup.time_frame),
+        ):
+            group = list(group)
+            warm_up = max(warm_up_samples(task.setup) for task in group)
+            since = min(int_timestamp(task.since) for task in group)
+            since -= warm_up * time_frame_to_seconds(key[1])
+            until = max(int_timestamp(task.until) for task in group)
+
+            handles.append(
+                self.store.open(
+                    self.broker_name,
+                    *key,
+                    since=since,
+                    until=until,
+                    load=functools.partial(
+                        self.load_klines, group[0].ticker, key[1]
+                    ),
+                )
+            )
+        return handles
+
+    def run(self) -> List[Tuple[BacktestTask, BacktestSummary]]:
+        """Runs all the tasks, streaming the equity curves into the
+        results storage.
+
+        Returns:
+            The summary of each task, in completion order.
+        """
+
+        tasks = self.matrix.tasks()
+        handles = list()
+        summaries = list()
+        storages = list()
+        try:
+            handles = self._share_klines(tasks)
+            workers = max(1, min(self.settings.workers, len(tasks)))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        _run_task,
+                        self.broker_name,
+                        task,
+                        self.trading,
+                        self.settings,
+                        self.store.directory,
+                    ): task
+                    for task in tasks
+                }
+                for future in as_completed(futures):
+                    task, result = futures[future], future.result()
+                    storage = self.storage_factory(task.table)
+                    storage.append_in_background(result)
+                    storages.append(storage)
+                    summaries.append(
+                        (
+                            task,
+                            summarize(result, self.settings.initial_equity),
+                        )
+                    )
+            for storage in storages:
+                storage.close()
+        finally:
+            for handle in handles:
+                handle.release()
+        return summaries
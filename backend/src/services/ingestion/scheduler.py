@@ -0,0 +1,211 @@
+"""Bulk ingestion of klines, from a broker to the time series storage,
+for many tickers and time frames at once.
+
+All the request windows of all the jobs are planned upfront, ordered by
+priority (the job one, then the most recent windows first) and run by a
+single bounded pool of threads; every request takes its weight from the
+broker request weight bucket, shared by the whole process, so the jobs
+together respect the broker limits. Each window stored is checkpointed
+on the relational database, so a restarted ingestion downloads only the
+windows not yet done.
+"""
+
+# pylint: disable=no-name-in-module
+# pylint: disable=protected-access
+# pylint: disable=too-few-public-methods
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.orm import sessionmaker
+
+from ...lib.marketdata.klines.from_broker import GetterFromBroker
+from ...utils.databases.sql.crud import klines as crud_klines
+from ...utils.databases.sql.models import SessionLocal
+from ...utils.databases.sql.models.klines import IngestionCheckpoint
+from ...utils.schemas.generics import DateTimeType, Ticker
+from ...utils.tools.formatting import remove_last_kline_if_unclosed
+from ...utils.tools.time_handlers import (
+    Now,
+    int_timestamp,
+    time_frame_to_seconds,
+)
+
+
+class IngestionJob(BaseModel):
+    """Klines of a ticker and time frame to be ingested; the time range
+    defaults to the whole broker history, until the last closed kline.
+    Jobs with higher 'priority' are run first."""
+
+    ticker: Ticker
+    time_frame: str
+    since: Optional[DateTimeType] = None
+    until: Optional[DateTimeType] = None
+    priority: int = 0
+
+    @property
+    def name(self) -> str:
+        """e.g. 'BTCUSDT_1h'"""
+
+        return "{}_{}".format(self.ticker.symbol, self.time_frame)
+
+
+class IngestionSettings(BaseModel):
+    workers: int = 4  # Concurrent requests, shared by all the jobs
+
+
+class Window(BaseModel):
+    """A request window of a job"""
+
+    job: int  # Index of the job
+    since: int  # Aligned request start, the checkpoint key
+    first: int  # Open times of the klines to be stored
+    last: int
+    complete: bool  # If False, it is redone (not checkpointed)
+
+
+class IngestionScheduler:
+    """Plans and runs the ingestion of a list of jobs from one broker.
+
+    Args:
+        broker_name (str): e.g. "binance"
+        jobs (List[IngestionJob]): Tickers and time frames to ingest.
+        session_factory (sessionmaker, optional): Of the relational
+        database, where the checkpoints are kept.
+    """
+
+    __slots__ = [
+        "broker_name",
+        "jobs",
+        "settings",
+        "session_factory",
+        "_getters",
+        "_lock",
+    ]
+
+    def __init__(
+        self,
+        broker_name: str,
+        jobs: List[IngestionJob],
+        session_factory: sessionmaker = SessionLocal,
+    ):
+        self.broker_name = broker_name
+        self.jobs = jobs
+        self.settings = IngestionSettings()
+        self.session_factory = session_factory
+        self._getters: Dict[int, GetterFromBroker] = dict()
+        self._lock = threading.Lock()
+
+        with self.session_factory() as db:
+            IngestionCheckpoint.__table__.create(
+                bind=db.get_bind(), checkfirst=True
+            )
+
+    def _getter(self, index: int) -> GetterFromBroker:
+        if index not in self._getters:
+            job = self.jobs[index]
+            self._getters[index] = GetterFromBroker(
+                self.broker_name, job.ticker, job.time_frame
+            )
+        return self._getters[index]
+
+    def _checkpoints(self, job: IngestionJob) -> set:
+        with self.session_factory() as db:
+            return set(
+                crud_klines.get_checkpoints(
+                    db, self.broker_name, job.ticker.symbol, job.time_frame
+                )
+            )
+
+    def _plan_job(self, index: int) -> List[Window]:
+        job, getter = self.jobs[index], self._getter(index)
+        time_frame = time_frame_to_seconds(job.time_frame)
+        step = getter._request_step
+
+        last_closed = Now().utc_timestamp() // time_frame * time_frame
+        last_closed -= time_frame
+        since = (
+            int_timestamp(job.since)
+            if job.since
+            else getter.oldest_open_time()
+        )
+        until = (
+            min(int_timestamp(job.until), last_closed)
+            if job.until
+            else last_closed
+        )
+
+        # Aligned windows, so the checkpoints survive a restart; only
+        # the windows fully inside the time range are checkpointed.
+        done = self._checkpoints(job)
+        return [
+            Window(
+                job=index,
+                since=window_since,
+                first=max(window_since, since),
+                last=min(window_since + step - time_frame, until),
+                complete=since <= window_since
+                and window_since + step - time_frame <= until,
+            )
+            for window_since in range(since // step * step, until + 1, step)
+            if window_since not in done
+        ]
+
+    def plan(self) -> List[Window]:
+        """The windows not yet done of all the jobs, in the order they
+        are going to be requested."""
+
+        windows = list()
+        for index in range(len(self.jobs)):
+            windows += self._plan_job(index)
+
+        def order(window: Window) -> tuple:
+            return -self.jobs[window.job].priority, -window.since
+
+        return sorted(windows, key=order)
+
+    def _ingest(self, window: Window) -> int:
+        """Downloads and stores a window; returns the number of klines
+        stored."""
+
+        job, getter = self.jobs[window.job], self._getter(window.job)
+        klines = getter._request_window(window.since)
+        klines = klines[klines.Open_time.between(window.first, window.last)]
+        if len(klines):
+            klines = remove_last_kline_if_unclosed(klines, job.time_frame)
+            getter.storage.append(klines)
+
+        if window.complete:
+            with self._lock, self.session_factory() as db:
+                crud_klines.create_checkpoint(
+                    db,
+                    self.broker_name,
+                    job.ticker.symbol,
+                    job.time_frame,
+                    window.since,
+                )
+        return len(klines)
+
+    def run(self) -> Dict[str, int]:
+        """Runs the planned windows.
+
+        Returns:
+            Dict[str, int]: Klines stored by job name.
+        """
+
+        windows = self.plan()
+        stored = {job.name: 0 for job in self.jobs}
+        workers = max(1, min(self.settings.workers, len(windows)))
+
+        # The pool takes the windows in the submission (priority) order
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._ingest, window): window
+                for window in windows
+            }
+            for future in as_completed(futures):
+                job = self.jobs[futures[future].job]
+                stored[job.name] += future.result()
+        return stored
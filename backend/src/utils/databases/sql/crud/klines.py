@@ -0,0 +1,91 @@
+# pylint:disable=no-name-in-module
+# pylint:disable=missing-module-docstring
+# pylint:disable=missing-function-docstring
+# pylint:disable=invalid-name
+
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models import klines
+
+
+def get_time_range(
+    db: Session, source: str, klines_table: str, time_frame: str
+) -> Optional[klines.KlinesTimeRange]:
+    return (
+        db.query(klines.KlinesTimeRange)
+        .filter(
+            klines.KlinesTimeRange.source == source,
+            klines.KlinesTimeRange.klines_table == klines_table,
+            klines.KlinesTimeRange.time_frame == time_frame,
+        )
+        .first()
+    )
+
+
+def get_time_ranges(
+    db: Session, source: str, klines_table: str
+) -> List[klines.KlinesTimeRange]:
+    return (
+        db.query(klines.KlinesTimeRange)
+        .filter(
+            klines.KlinesTimeRange.source == source,
+            klines.KlinesTimeRange.klines_table == klines_table,
+        )
+        .all()
+    )
+
+
+def set_time_range(
+    db: Session, source: str, klines_table: str, time_frame: str, **kwargs
+) -> klines.KlinesTimeRange:
+    """Creates or updates the time range with the given open times
+    ('oldest_open_time' and/or 'newest_open_time')."""
+
+    db_time_range = get_time_range(db, source, klines_table, time_frame)
+    if db_time_range is None:
+        db_time_range = klines.KlinesTimeRange(
+            source=source, klines_table=klines_table, time_frame=time_frame
+        )
+        db.add(db_time_range)
+
+    for field, open_time in kwargs.items():
+        setattr(db_time_range, field, open_time)
+    db.commit()
+    db.refresh(db_time_range)
+    return db_time_range
+
+
+def get_checkpoints(
+    db: Session, broker_name: str, ticker_symbol: str, time_frame: str
+) -> List[int]:
+    rows = (
+        db.query(klines.IngestionCheckpoint.window_since)
+        .filter(
+            klines.IngestionCheckpoint.broker_name == broker_name,
+            klines.IngestionCheckpoint.ticker_symbol == ticker_symbol,
+            klines.IngestionCheckpoint.time_frame == time_frame,
+        )
+        .all()
+    )
+    return [row.window_since for row in rows]
+
+
+def create_checkpoint(
+    db: Session,
+    broker_name: str,
+    ticker_symbol: str,
+    time_frame: str,
+    window_since: int,
+) -> klines.IngestionCheckpoint:
+    db_checkpoint = klines.IngestionCheckpoint(
+        broker_name=broker_name,
+        ticker_symbol=ticker_symbol,
+        time_frame=time_frame,
+        window_since=window_since,
+    )
+    db.add(db_checkpoint)
+    db.commit()
+    db.refresh(db_checkpoint)
+    return db_checkpoint
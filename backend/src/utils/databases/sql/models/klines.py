@@ -0,0 +1,41 @@
+# pylint:disable=missing-module-docstring
+# pylint:disable=too-few-public-methods
+
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+
+from . import Base
+
+
+class KlinesTimeRange(Base):
+    """Oldest and newest open times of the klines of a source ("broker"
+    or "storage"), table (e.g. "binance_btcusdt") and time frame."""
+
+    __tablename__ = "klines_time_ranges"
+    __table_args__ = (
+        UniqueConstraint("source", "klines_table", "time_frame"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, index=True)
+    klines_table = Column(String, index=True)
+    time_frame = Column(String)
+    oldest_open_time = Column(Integer)
+    newest_open_time = Column(Integer)
+
+
+class IngestionCheckpoint(Base):
+    """A klines window, starting at 'window_since', already downloaded
+    and stored by the ingestion service."""
+
+    __tablename__ = "ingestion_checkpoints"
+    __table_args__ = (
+        UniqueConstraint(
+            "broker_name", "ticker_symbol", "time_frame", "window_since"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    broker_name = Column(String, index=True)
+    ticker_symbol = Column(String, index=True)
+    time_frame = Column(String)
+    window_since = Column(Integer)
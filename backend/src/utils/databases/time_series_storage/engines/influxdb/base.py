@@ -1,7 +1,116 @@
+"""Base engine and the pool of long-lived database clients"""
+
+# pylint: disable=too-few-public-methods
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Tuple
+
 import pandas as pd
 
 
+class ClientPool:
+    """Thread-safe pool of up to 'size' long-lived database clients,
+    created lazily by 'factory'. A client is lent to a single thread at
+    a time ('with pool.client() as client: ...') and given back to the
+    pool, instead of being created and closed on each operation.
+    """
+
+    __slots__ = [
+        "factory",
+        "size",
+        "_idle",
+        "_created",
+        "_generation",
+        "_condition",
+    ]
+
+    def __init__(self, factory: Callable, size: int = 4):
+        self.factory = factory
+        self.size = size
+        self._idle = list()
+        self._created = 0  # Idle and lent clients
+        self._generation = 0  # Incremented when the pool is closed
+        self._condition = threading.Condition()
+
+    def _acquire(self) -> Tuple[Any, int]:
+        with self._condition:
+            while not self._idle and self._created >= self.size:
+                self._condition.wait()  # For a client to be given back
+            generation = self._generation
+            if self._idle:
+                return self._idle.pop(), generation
+            self._created += 1
+
+        try:
+            return self.factory(), generation
+        except Exception:
+            self._discard(generation)
+            raise
+
+    def _discard(self, generation: int) -> None:
+        with self._condition:
+            if generation == self._generation:
+                self._created -= 1
+                self._condition.notify()
+
+    def _give_back(self, client, generation: int) -> None:
+        with self._condition:
+            if generation == self._generation:
+                self._idle.append(client)
+                self._condition.notify()
+                return
+        client.close()  # Lent before the pool was closed
+
+    @contextmanager
+    def client(self):
+        """Lends a client of the pool."""
+
+        client, generation = self._acquire()
+        try:
+            yield client
+        finally:
+            self._give_back(client, generation)
+
+    def close(self) -> None:
+        """Closes the idle clients; the lent ones are closed when given
+        back, never being lent again."""
+
+        with self._condition:
+            idle, self._idle = self._idle, list()
+            self._created = 0
+            self._generation += 1
+            self._condition.notify_all()
+        for client in idle:
+            client.close()
+
+
+_client_pools: Dict[str, ClientPool] = dict()
+_client_pools_lock = threading.Lock()
+
+
+def client_pool(name: str, factory: Callable, size: int) -> ClientPool:
+    """The process wide client pool named 'name', created on first use."""
+
+    with _client_pools_lock:
+        if name not in _client_pools:
+            _client_pools[name] = ClientPool(factory, size)
+        return _client_pools[name]
+
+
+def close_client_pools() -> None:
+    """Closes the clients of every pool; e.g. on the app shutdown."""
+
+    with _client_pools_lock:
+        for pool in _client_pools.values():
+            pool.close()
+        _client_pools.clear()
+
+
 class Engine:
+    # Errors of a write worth a retry (e.g. by the 'BackgroundWriter')
+    transient_errors = (ConnectionError,)
+
     __slots__ = [
         "database",
         "table",
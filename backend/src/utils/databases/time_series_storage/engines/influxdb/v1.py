@@ -1,12 +1,20 @@
 # pylint: disable=unexpected-keyword-arg
 # pylint: disable=no-value-for-parameter
 
+import threading
+
 import pandas as pd
 
 from influxdb import DataFrameClient
+from influxdb.exceptions import InfluxDBServerError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
 
 from ......config.databases import InfluxDbSettings
-from .base import Engine
+from .base import ClientPool, Engine, client_pool
+
+_created_databases = set()
+_created_databases_lock = threading.Lock()
 
 
 class InfluxDbV1(Engine):
@@ -14,6 +22,13 @@ class InfluxDbV1(Engine):
     https://influxdb-python.readthedocs.io/en/latest/api-documentation.html
     """
 
+    transient_errors = (
+        ConnectionError,
+        RequestsConnectionError,
+        Timeout,
+        InfluxDBServerError,
+    )
+
     __slots__ = [
         "settings",
     ]
@@ -22,6 +37,19 @@ class InfluxDbV1(Engine):
         super().__init__(database, table)
         self.settings = InfluxDbSettings().V1
 
+    def _pool(self) -> ClientPool:
+        return client_pool(
+            name="influxdb_v1",
+            factory=lambda: DataFrameClient(**self.settings.credentials),
+            size=self.settings.pool_size,
+        )
+
+    def _create_database_once(self, client: DataFrameClient) -> None:
+        with _created_databases_lock:
+            if self.database not in _created_databases:
+                client.create_database(self.database)
+                _created_databases.add(self.database)
+
     def append(self, dataframe: pd.core.frame.DataFrame) -> None:
         """Saves a timeseries pandas dataframe on influxdb.
 
@@ -37,30 +65,28 @@ class InfluxDbV1(Engine):
         client.alter_retention_policy(name="short_duration",
         replication=1, duration='10d')
         """
-        client = DataFrameClient(**self.settings.credentials)
-        client.create_database(self.database)
-
-        client.write_points(
-            dataframe=dataframe,
-            measurement=self.table,
-            tags=None,
-            tag_columns=None,
-            field_columns=list(dataframe.columns),
-            time_precision=None,
-            database=self.database,
-            batch_size=None,
-            protocol="line",
-            numeric_precision=None,
-        )
-        client.close()
+        with self._pool().client() as client:
+            self._create_database_once(client)
+
+            client.write_points(
+                dataframe=dataframe,
+                measurement=self.table,
+                tags=None,
+                tag_columns=None,
+                field_columns=list(dataframe.columns),
+                time_precision=None,
+                database=self.database,
+                batch_size=self.settings.write_batch_size,
+                protocol="line",
+                numeric_precision=None,
+            )
 
     def dataframe_query(self, query) -> pd.core.frame.DataFrame:
         """Given a sanitized query (InfluxQL language), returns the
         requested measurement formated as a pandas dataframe."""
 
-        client = DataFrameClient(**self.settings.credentials)
-        query_result = client.query(query)
-        client.close()
+        with self._pool().client() as client:
+            query_result = client.query(query)
 
         _dataframe = list(query_result.values())[0]
         _dataframe.reset_index(inplace=True)
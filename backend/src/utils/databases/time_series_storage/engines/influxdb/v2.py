@@ -1,10 +1,10 @@
 import pandas as pd
 from influxdb_client import InfluxDBClient
 from influxdb_client.client.exceptions import InfluxDBError
-from influxdb_client.client.write_api import ASYNCHRONOUS
+from influxdb_client.client.write_api import SYNCHRONOUS
 
 from ......config.databases import InfluxDbSettings
-from .base import Engine
+from .base import ClientPool, Engine, client_pool
 
 
 class InfluxDbV2(Engine):
@@ -15,6 +15,8 @@ class InfluxDbV2(Engine):
     https://github.com/influxdata/influxdb-client-python
     """
 
+    transient_errors = (ConnectionError, InfluxDBError)
+
     __slots__ = [
         "settings",
         "drop_influxdb_columns",
@@ -25,6 +27,13 @@ class InfluxDbV2(Engine):
         self.settings = InfluxDbSettings().V2
         self.drop_influxdb_columns = True
 
+    def _pool(self) -> ClientPool:
+        return client_pool(
+            name="influxdb_v2",
+            factory=lambda: InfluxDBClient(**self.settings.credentials),
+            size=self.settings.pool_size,
+        )
+
     def append(self, dataframe: pd.core.frame.DataFrame) -> None:
         """Saves a timeseries pandas dataframe on influxdb.
 
@@ -35,18 +44,17 @@ class InfluxDbV2(Engine):
         dataframe.Timestamp = pd.to_datetime(dataframe.Timestamp, unit="s")
         dataframe.set_index("Timestamp", inplace=True)
 
-        client = InfluxDBClient(**self.settings.credentials)
-        write_client = client.write_api(
-            # write_options=WriteOptions(**self.settings.write_opts),
-            write_options=ASYNCHRONOUS,
-        )
-        write_client.write(
-            bucket=self.database,
-            org=client.org,
-            record=dataframe,
-            data_frame_measurement_name=self.table,
-        )
-        client.close()
+        # Synchronous, so the write errors reach the caller (e.g. the
+        # retries of the 'BackgroundWriter'), which already runs it off
+        # the critical path
+        with self._pool().client() as client:
+            with client.write_api(write_options=SYNCHRONOUS) as write_api:
+                write_api.write(
+                    bucket=self.database,
+                    org=client.org,
+                    record=dataframe,
+                    data_frame_measurement_name=self.table,
+                )
 
     def _drop_influxdb_columns(
         self,
@@ -77,11 +85,10 @@ class InfluxDbV2(Engine):
             table.records.row.values -> row
         """
 
-        client = InfluxDBClient(**self.settings.credentials)
-        query_api = client.query_api()
-
         try:
-            dataframe = query_api.query_data_frame(query)
+            with self._pool().client() as client:
+                dataframe = client.query_api().query_data_frame(query)
+
             if not dataframe.empty:
                 dataframe = dataframe.rename(columns={"_time": "Timestamp"})
                 dataframe.Timestamp = (
@@ -90,7 +97,6 @@ class InfluxDbV2(Engine):
                 if self.drop_influxdb_columns:
                     dataframe = self._drop_influxdb_columns(dataframe)
 
-            client.close()
             return dataframe
         except InfluxDBError as error:
             raise Exception.with_traceback(error) from InfluxDBError
@@ -0,0 +1,275 @@
+"""Local, on-disk columnar cache of the klines queried from the time
+series storage.
+
+The klines of one table and time frame are partitioned by month (of the
+'Open_time'); each partition is a single 2-D float64 '.npy' file (one
+column per OHLCV field), memory-mapped when read, plus a '.json' file
+with the time ranges it covers. Only the ranges fetched from the storage
+are covered, so a request reads the covered part from the disk and
+queries the storage only for the missing ranges, persisting them.
+
+Layout: <directory>/<table>/<time_frame>/<YYYY-MM>.{npy,json}
+"""
+
+# pylint: disable=too-few-public-methods
+
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ...tools.time_handlers import time_frame_to_seconds
+
+DF = pd.core.frame.DataFrame
+Interval = Tuple[int, int]
+
+_write_lock = threading.Lock()
+
+
+def merge_intervals(intervals: List[Interval], step: int) -> List[list]:
+    """Sorted union of closed [start, end] intervals over a grid of
+    'step' seconds; contiguous intervals are merged."""
+
+    merged = list()
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + step:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_intervals(
+    since: int, until: int, covered: List[list], step: int
+) -> List[Interval]:
+    """The parts of [since, until] out of the 'covered' (merged)
+    intervals; all the bounds are on the grid of 'step' seconds."""
+
+    missing = list()
+    cursor = since
+    for start, end in covered:
+        if end < cursor:
+            continue
+        if start > until:
+            break
+        if start > cursor:
+            missing.append((cursor, start - step))
+        cursor = end + step
+    if cursor <= until:
+        missing.append((cursor, until))
+    return missing
+
+
+def _atomic_write(path: str, write: Callable) -> None:
+    """Writes on a temporary file, renamed to 'path' once complete, so
+    readers (also of other processes) never see a partial file."""
+
+    handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(handle, "wb") as file:
+            write(file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+class KlinesCache:
+    """Cache of the klines of one table and time frame.
+
+    Args:
+        directory (str): Root directory of the cache.
+        table (str): Storage table e.g. "binance_btcusdt".
+        time_frame (str): <amount><scale_unit> e.g. '1m', '2h'.
+    """
+
+    columns = ["Open_time", "Open", "High", "Low", "Close", "Volume"]
+
+    __slots__ = ["root", "directory", "step"]
+
+    def __init__(self, directory: str, table: str, time_frame: str):
+        self.root = directory
+        self.directory = os.path.join(directory, table, time_frame)
+        self.step = time_frame_to_seconds(time_frame)
+
+    def _ceil(self, timestamp: int) -> int:
+        return -(-timestamp // self.step) * self.step
+
+    def _floor(self, timestamp: int) -> int:
+        return timestamp // self.step * self.step
+
+    def _partitions(self, since: int, until: int) -> List[tuple]:
+        """(month, since, until) of each month partition of the range,
+        with the bounds on the grid; months without a grid point are
+        skipped."""
+
+        first = np.datetime64(since, "s").astype("datetime64[M]")
+        last = np.datetime64(until, "s").astype("datetime64[M]")
+
+        partitions = list()
+        for month in np.arange(first, last + 1):
+            start = month.astype("datetime64[s]").astype("int64").item()
+            end = (month + 1).astype("datetime64[s]").astype("int64").item()
+            start = self._ceil(max(since, start))
+            end = self._floor(min(until, end - 1))
+            if start <= end:
+                partitions.append((str(month), start, end))
+        return partitions
+
+    def _path(self, month: str, extension: str) -> str:
+        return os.path.join(self.directory, "{}.{}".format(month, extension))
+
+    def _coverage(self, month: str) -> List[list]:
+        try:
+            with open(self._path(month, "json"), encoding="utf-8") as file:
+                return json.load(file)["coverage"]
+        except FileNotFoundError:
+            return list()
+
+    def _data(self, month: str) -> np.ndarray:
+        try:
+            return np.load(self._path(month, "npy"), mmap_mode="r")
+        except FileNotFoundError:
+            return np.empty((0, len(self.columns)))
+
+    def _slice(self, month: str, since: int, until: int) -> DF:
+        data = self._data(month)
+        first = np.searchsorted(data[:, 0], since, side="left")
+        last = np.searchsorted(data[:, 0], until, side="right")
+
+        klines = pd.DataFrame(
+            np.array(data[first:last]), columns=self.columns
+        )
+        klines.Open_time = klines.Open_time.astype("int64")
+        return klines
+
+    def _store(self, month: str, rows: np.ndarray, covered: list) -> None:
+        """Merges the rows and the covered intervals into the month
+        partition."""
+
+        rows = np.concatenate([rows, self._data(month)])
+        _, unique = np.unique(rows[:, 0], return_index=True)  # Sorted
+        coverage = merge_intervals(
+            [tuple(interval) for interval in self._coverage(month)]
+            + covered,
+            self.step,
+        )
+        self._write(month, rows[unique], coverage)
+
+    def _write(self, month: str, rows: np.ndarray, coverage: list) -> None:
+        if not coverage and not len(rows):
+            for extension in ("npy", "json"):
+                if os.path.exists(self._path(month, extension)):
+                    os.remove(self._path(month, extension))
+            return
+
+        rows = np.ascontiguousarray(rows)
+        metadata = json.dumps(dict(coverage=coverage)).encode("utf-8")
+
+        # Data first: the coverage never claims rows not yet written
+        _atomic_write(self._path(month, "npy"), lambda f: np.save(f, rows))
+        _atomic_write(self._path(month, "json"), lambda f: f.write(metadata))
+
+    def _persist(self, fetched: List[tuple], sealed_until: int) -> None:
+        """Persists the fetched klines up to 'sealed_until' (the newer
+        ones may still change on the storage)."""
+
+        os.makedirs(self.directory, exist_ok=True)
+        with _write_lock:
+            for (since, until), klines in fetched:
+                until = min(until, sealed_until)
+                if since > until:
+                    continue
+                rows = klines[self.columns].to_numpy(dtype="float64")
+                for month, start, end in self._partitions(since, until):
+                    in_month = (rows[:, 0] >= start) & (rows[:, 0] <= end)
+                    self._store(month, rows[in_month], [(start, end)])
+
+    def get(
+        self,
+        since: int,
+        until: int,
+        fetch: Callable[[int, int], DF],
+        sealed_until: Callable[[], int],
+    ) -> DF:
+        """The klines whose 'Open_time' is in [since, until].
+
+        Args:
+            since (int): Timestamp, rounded up to the time frame grid.
+            until (int): Timestamp, rounded down to the time frame grid.
+            fetch (Callable): Queries a range from the storage.
+            sealed_until (Callable): Newest open time whose kline is not
+            going to change anymore; called only if something is
+            missing.
+
+        Returns:
+            pd.core.frame.DataFrame: The cached and fetched klines.
+        """
+
+        since, until = self._ceil(since), self._floor(until)
+        partitions = self._partitions(since, until)
+        coverage = merge_intervals(
+            [
+                (max(start, since), min(end, until))
+                for month, *_ in partitions
+                for start, end in self._coverage(month)
+            ],
+            self.step,
+        )
+
+        pages = [
+            self._slice(month, start, end) for month, start, end in partitions
+        ]
+        missing = missing_intervals(since, until, coverage, self.step)
+        if missing:
+            fetched = [(interval, fetch(*interval)) for interval in missing]
+            pages += [klines for _, klines in fetched]
+            self._persist(fetched, self._floor(sealed_until()))
+
+        if not pages:
+            return pd.DataFrame(columns=self.columns)
+
+        klines = pd.concat(pages, ignore_index=True)
+        return klines.sort_values("Open_time", ignore_index=True)
+
+    def invalidate(self, since: int, until: int) -> None:
+        """Drops the cached klines (and coverage) of [since, until], e.g.
+        after the storage was backfilled on that range."""
+
+        since, until = self._ceil(since), self._floor(until)
+        step = self.step
+        with _write_lock:
+            for month, start, end in self._partitions(since, until):
+                coverage = list()
+                for covered_start, covered_end in self._coverage(month):
+                    if covered_start < start:
+                        coverage.append(
+                            [covered_start, min(covered_end, start - step)]
+                        )
+                    if covered_end > end:
+                        coverage.append(
+                            [max(covered_start, end + step), covered_end]
+                        )
+                data = self._data(month)
+                keep = (data[:, 0] < start) | (data[:, 0] > end)
+                self._write(month, data[keep], coverage)
+
+
+def invalidate_table(directory: str, table: str, since: int, until: int):
+    """Invalidates [since, until] on the cache of every time frame of
+    the table, e.g. after new klines were written on that range."""
+
+    try:
+        time_frames = os.listdir(os.path.join(directory, table))
+    except FileNotFoundError:
+        return
+    for time_frame in time_frames:
+        step = time_frame_to_seconds(time_frame)
+        # The buckets holding the bounds are also affected
+        KlinesCache(directory, table, time_frame).invalidate(
+            since // step * step, until
+        )
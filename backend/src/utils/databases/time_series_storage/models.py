@@ -1,36 +1,141 @@
+from typing import Iterator
+
 import pandas as pd
 
+from ....config.databases import KlinesCacheSettings
+from ...tools.formatting import (
+    KlinesWindow,
+    klines_schema,
+    overlapping_windows,
+)
 from ...tools.time_handlers import time_frame_to_seconds
 from .engines.influxdb.v1 import InfluxDbV1 as InfluxDb
+from .klines_cache import KlinesCache, invalidate_table
+from .time_ranges import time_ranges
+from .writer import BackgroundWriter
+
 
+class Storage:
+    """Write path shared by the storage models: 'append' writes right
+    away; 'append_in_background' hands the dataframe to a background
+    writer (batched, retried, with backpressure), 'flush' waits for it
+    and 'close' also stops its thread, so a producer loop is not blocked
+    by the storage."""
 
-class StorageKlines:
     __slots__ = [
         "table",
         "database",
-        "time_frame",
         "engine",
+        "writer",
     ]
 
-    def __init__(self, table: str, time_frame: str):
-        self.database = "klines"
+    def __init__(self, database: str, table: str):
+        self.database = database
         self.table = table
-        self.time_frame = time_frame
         self.engine = InfluxDb(self.database, table)
+        self.writer = None
 
-    def append(self, klines: pd.core.frame.DataFrame):
-        _klines = klines.copy()
+    @staticmethod
+    def _to_points(
+        dataframe: pd.core.frame.DataFrame, time_column: str
+    ) -> pd.core.frame.DataFrame:
+        """A new dataframe, indexed by the datetime of 'time_column'
+        (timestamp or human readable); the input is not changed."""
 
-        try:
-            _klines.parse_datetime.to_timestamp(
-                target_columns=["Open_time"]
+        times = pd.DataFrame({time_column: dataframe[time_column]})
+        times.parse_datetime.to_timestamp(columns=[time_column])
+
+        points = dataframe.drop(columns=[time_column])
+        points.index = pd.to_datetime(times[time_column].to_numpy(), unit="s")
+        points.index.name = time_column
+        return points
+
+    def _points(
+        self, dataframe: pd.core.frame.DataFrame
+    ) -> pd.core.frame.DataFrame:
+        raise NotImplementedError
+
+    def _write(self, dataframe: pd.core.frame.DataFrame) -> None:
+        self.engine.append(self._points(dataframe))
+
+    def append(self, dataframe: pd.core.frame.DataFrame):
+        """Writes the dataframe on the storage."""
+
+        self._write(dataframe)
+
+    def _background_writer(self) -> BackgroundWriter:
+        if self.writer is None:
+            settings = self.engine.settings
+            self.writer = BackgroundWriter(
+                write=self._write,
+                transient_errors=self.engine.transient_errors,
+                batch_size=settings.write_batch_size,
+                max_pending=settings.max_pending_writes,
             )
-        except TypeError:  # Datetime values already in timestamp type
-            pass
+        return self.writer
+
+    def append_in_background(self, dataframe: pd.core.frame.DataFrame):
+        """Enqueues the dataframe to be written by a background thread.
+        Blocks only while the queue of pending writes is full. The
+        dataframe must not be changed afterwards."""
+
+        self._background_writer().put(dataframe)
+
+    def flush(self) -> None:
+        """Waits for the background writes.
+
+        Raises:
+            StorageError: If some background write failed.
+        """
 
-        _klines.Open_time = pd.to_datetime(_klines.Open_time, unit="s")
-        _klines.set_index("Open_time", inplace=True)
-        self.engine.append(_klines)
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self) -> None:
+        """Waits for the background writes and stops the writer thread.
+
+        Raises:
+            StorageError: If some background write failed.
+        """
+
+        if self.writer is not None:
+            self.writer.close()
+
+
+class StorageKlines(Storage):
+    __slots__ = [
+        "time_frame",
+        "cache",
+    ]
+
+    def __init__(self, table: str, time_frame: str):
+        super().__init__(database="klines", table=table)
+        self.time_frame = time_frame
+        cache_settings = KlinesCacheSettings()
+        # The cache partitions need a fixed length time frame; the
+        # monthly klines are resampled from a cached base time frame
+        self.cache = (
+            KlinesCache(cache_settings.directory, table, time_frame)
+            if cache_settings.enabled
+            and time_frame
+            and not time_frame.endswith("M")
+            else None
+        )
+
+    def _points(self, klines: pd.core.frame.DataFrame):
+        return self._to_points(klines, time_column="Open_time")
+
+    def _write(self, klines: pd.core.frame.DataFrame) -> None:
+        points = self._points(klines)
+        self.engine.append(points)
+        if not len(points):
+            return
+
+        open_times = points.index.view("int64") // 10 ** 9
+        since, until = int(open_times.min()), int(open_times.max())
+        time_ranges.extend("storage", self.table, since, until)
+        if self.cache is not None:
+            invalidate_table(self.cache.root, self.table, since, until)
 
     def _timestamp_delta(self, n: int) -> int:
         seconds_time_frame = time_frame_to_seconds(self.time_frame)
@@ -48,7 +153,64 @@ class StorageKlines:
 
         return since if since > oldest_open_time else oldest_open_time
 
+    def _sealed_until(self) -> int:
+        """Open time of the newest kline that can not change anymore
+        (the newest stored one may be still open)."""
+
+        newest_open_time = self.engine.newest().Timestamp.item()
+        return newest_open_time - time_frame_to_seconds(self.time_frame)
+
     def get_by_time_range(self, since, until) -> pd.core.frame.DataFrame:
+        """Klines of the time range, read from the local cache when
+        enabled ('KlinesCacheSettings'); only the ranges missing there
+        are queried from the storage (and then cached). The dtypes are
+        the compact ones of 'klines_schema'."""
+
+        if self.cache is None:
+            klines = self._query_time_range(since, until)
+        else:
+            klines = self.cache.get(
+                since,
+                until,
+                fetch=self._query_time_range,
+                sealed_until=self._sealed_until,
+            )
+        return klines_schema.apply(klines)
+
+    def iter_by_time_range(
+        self, since: int, until: int, page_samples: int = 10000
+    ) -> Iterator[pd.core.frame.DataFrame]:
+        """The klines of the time range (as 'get_by_time_range'), in
+        consecutive pages of up to 'page_samples' klines."""
+
+        span = page_samples * time_frame_to_seconds(self.time_frame)
+        for page_since in range(since, until + 1, span):
+            yield self.get_by_time_range(
+                page_since, min(page_since + span - 1, until)
+            )
+
+    def iter_windows(
+        self,
+        since: int,
+        until: int,
+        window_samples: int,
+        overlap: int = 0,
+        page_samples: int = 10000,
+    ) -> Iterator[KlinesWindow]:
+        """The klines of the time range in windows of 'window_samples'
+        klines, each one preceded by the 'overlap' klines before it (see
+        'overlapping_windows'), queried in pages of 'page_samples'
+        klines; only a page and a window are held in memory."""
+
+        warm_up_since = since - overlap * time_frame_to_seconds(
+            self.time_frame
+        )
+        pages = self.iter_by_time_range(
+            warm_up_since, until, page_samples=page_samples
+        )
+        return overlapping_windows(pages, window_samples, overlap, since)
+
+    def _query_time_range(self, since, until) -> pd.core.frame.DataFrame:
         const = 10 ** 9  # Coversion sec <--> nanosec
         klines_query = """
         SELECT first("Open") AS "Open", max("High") AS "High", min("Low") AS 
@@ -66,6 +228,34 @@ class StorageKlines:
         klines = _klines.rename(columns={"Timestamp": "Open_time"})
         return klines
 
+    def count_by_time_range(
+        self, since: int, until: int, bucket: str
+    ) -> pd.core.frame.DataFrame:
+        """How many klines are actually stored (no fill) on each 'bucket'
+        (e.g. "1d") of the time range; empty buckets are not returned.
+
+        Returns:
+            pd.core.frame.DataFrame: Columns 'Open_time' (of the bucket)
+            and 'Count'.
+        """
+
+        const = 10 ** 9  # Coversion sec <--> nanosec
+        count_query = """
+        SELECT count("Close") AS "Count" FROM "{}"."autogen"."{}" WHERE
+        time >= {} AND time <= {} GROUP BY time({}) FILL(none)
+        """.format(
+            self.database,
+            self.table,
+            str(const * since),
+            str(const * until),
+            bucket,
+        )
+        try:
+            counts = self.engine.dataframe_query(count_query)
+        except IndexError:  # No klines at all on the time range
+            return pd.DataFrame(columns=["Open_time", "Count"])
+        return counts.rename(columns={"Timestamp": "Open_time"})
+
     def oldest(self, n=1) -> pd.core.frame.DataFrame:
         _since = self.engine.oldest().Timestamp.item()
         klines = self.get_by_time_range(
@@ -75,59 +265,45 @@ class StorageKlines:
         return klines[:_len]
 
     def newest(self, n=1) -> pd.core.frame.DataFrame:
-        klines = pd.DataFrame()
         _until = self.engine.newest().Timestamp.item()
-        _klines = self.get_by_time_range(
+        klines = self.get_by_time_range(
             since=self._since(_until, n), until=_until
         )
-        _len = min(n, len(_klines))
-        klines = klines.append(_klines[-_len:], ignore_index=True)
-        return klines
+        _len = min(n, len(klines))
+        return klines[-_len:].reset_index(drop=True)
 
     def oldest_open_time(self) -> int:
-        return self.oldest().Open_time.item()
+        return time_ranges.open_time(
+            key=("storage", self.table, self.time_frame),
+            field="oldest_open_time",
+            compute=lambda: self.oldest().Open_time.item(),
+        )
 
     def newest_open_time(self) -> int:
-        return self.newest().Open_time.item()
+        return time_ranges.open_time(
+            key=("storage", self.table, self.time_frame),
+            field="newest_open_time",
+            compute=lambda: self.newest().Open_time.item(),
+        )
 
 
-class StorageResults:
-    __slots__ = [
-        "table",
-        "database",
-        "engine",
-    ]
+class StorageResults(Storage):
+    __slots__ = list()
 
     def __init__(self, table: str):
-        self.database = "results"
-        self.table = table
-        self.engine = InfluxDb(self.database, table)
+        super().__init__(database="results", table=table)
 
-    def append(self, dataframe: pd.core.frame.DataFrame):
-        try:
-            result = dataframe.rename(columns={"Open_time": "Timestamp"})
-        except KeyError:  # Datetime column already named "Timestamp"
-            result = dataframe
-
-        try:
-            result.parse_datetime.to_timestamp(
-                target_columns=["Timestamp"]
-            )
-        except TypeError:  # Datetime values already in timestamp type
-            pass
-
-        result.Timestamp = pd.to_datetime(result.Timestamp, unit="s")
-        result.set_index("Timestamp", inplace=True)
-        self.engine.append(result)
+    def _points(self, dataframe: pd.core.frame.DataFrame):
+        # A no-op if the datetime column is already named "Timestamp"
+        result = dataframe.rename(columns={"Open_time": "Timestamp"})
+        return self._to_points(result, time_column="Timestamp")
 
     @staticmethod
     def _as_human_readable(
         result: pd.core.frame.DataFrame,
     ) -> pd.core.frame.DataFrame:
 
-        result.parse_datetime.to_human_readable(
-            target_columns=["Timestamp"]
-        )
+        result.parse_datetime.to_human_readable(columns=["Timestamp"])
         return result
 
     def get(self, **kwargs) -> pd.core.frame.DataFrame:
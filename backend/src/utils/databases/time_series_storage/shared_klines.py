@@ -0,0 +1,266 @@
+"""Process-shared store of klines series, so the consumers of a series
+(web routes, backtests, classifiers...) running on many processes hold
+it once in RAM, instead of each one building its own dataframe.
+
+Each series, keyed by broker, ticker and time frame, is a single 2-D
+float64 '.npy' file (one row per 'columns' item, so each column is
+contiguous), memory-mapped read-only by every consumer; the pages are
+shared by the processes through the OS page cache (by default the
+directory is on '/dev/shm', a RAM filesystem). A registry file, under
+an exclusive file lock, records the [since, until] range each series
+was loaded for and counts its handles by process; the series is
+deleted when the last one is released (or its process is gone).
+
+A consumer asking for a range the series does not cover reloads it over
+the union of both ranges; the handles already given keep mapping the
+previous file, which is unlinked but lives until they are released.
+"""
+
+# pylint: disable=too-few-public-methods
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ....config.databases import SharedKlinesSettings
+from .klines_cache import _atomic_write
+
+DF = pd.core.frame.DataFrame
+
+columns = ["Open_time", "Open", "High", "Low", "Close", "Volume"]
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _covers(entry: dict, since: Optional[int], until: Optional[int]) -> bool:
+    """Whether the range of a registry entry covers [since, until]; a
+    missing bound is unbounded on the entry and not required on the
+    request."""
+
+    lower, upper = entry["since"], entry["until"]
+    return (since is None or lower is None or lower <= since) and (
+        until is None or upper is None or upper >= until
+    )
+
+
+def _union(
+    entry: dict, since: Optional[int], until: Optional[int]
+) -> Tuple[Optional[int], Optional[int]]:
+    """The range of a registry entry extended to [since, until]"""
+
+    if since is not None and entry["since"] is not None:
+        since = min(since, entry["since"])
+    else:
+        since = entry["since"]
+    if until is not None and entry["until"] is not None:
+        until = max(until, entry["until"])
+    else:
+        until = entry["until"]
+    return since, until
+
+
+class SharedKlines:
+    """A handle of a shared series; the arrays are read-only views.
+    Release it (or use it as a context manager) when done."""
+
+    __slots__ = ["store", "name", "data", "_released"]
+
+    def __init__(self, store: "SharedKlinesStore", name: str, data):
+        self.store = store
+        self.name = name
+        self.data = data  # (columns, samples) memory map
+        self._released = False
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    def __enter__(self) -> "SharedKlines":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.release()
+
+    def array(self, column: str) -> np.ndarray:
+        """Read-only view of a column e.g. "Close"."""
+
+        return self.data[columns.index(column)]
+
+    def frame(self) -> DF:
+        """The klines as a dataframe whose columns are views of the
+        shared series (nothing is copied), ready for the 'indicator' and
+        'classifier' accessors; the new columns they add are local to
+        the dataframe. 'Open_time' is a float64 (exact) timestamp."""
+
+        return pd.DataFrame(self.data.T, columns=columns, copy=False)
+
+    def release(self) -> None:
+        """Gives the handle back to the store; idempotent."""
+
+        if not self._released:
+            self._released = True
+            self.data = None
+            self.store.release(self.name)
+
+
+class SharedKlinesStore:
+    """Registry of the shared klines series.
+
+    Args:
+        directory (str, optional): Of the series and the registry.
+        Defaults to the 'SharedKlinesSettings' one.
+    """
+
+    __slots__ = ["directory"]
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or SharedKlinesSettings().directory
+
+    @staticmethod
+    def name(broker_name: str, ticker_symbol: str, time_frame: str) -> str:
+        """Key of a series e.g. 'binance_btcusdt_1m'"""
+
+        return "{}_{}_{}".format(
+            broker_name.lower(), ticker_symbol.lower(), time_frame
+        )
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name)
+
+    @contextmanager
+    def _registry(self) -> Iterator[Dict[str, dict]]:
+        """The registry, locked (also against the other processes) and
+        saved back on exit; the handles of dead processes are pruned."""
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("registry.lock"), "w", encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self._path("registry.json"), encoding="utf-8") as f:
+                    registry = json.load(f)
+            except FileNotFoundError:
+                registry = dict()
+
+            for name in list(registry):
+                holders = registry[name]["holders"]
+                for pid in [pid for pid in holders if not _is_alive(int(pid))]:
+                    del holders[pid]
+                if not holders:
+                    self._drop(registry, name)
+
+            yield registry
+
+            metadata = json.dumps(registry).encode("utf-8")
+            _atomic_write(
+                self._path("registry.json"), lambda f: f.write(metadata)
+            )
+
+    def _drop(self, registry: Dict[str, dict], name: str) -> None:
+        try:
+            os.remove(self._path(registry.pop(name)["file"]))
+        except FileNotFoundError:
+            pass
+
+    def _attach(self, registry: Dict[str, dict], name: str) -> SharedKlines:
+        holders = registry[name]["holders"]
+        pid = str(os.getpid())
+        holders[pid] = holders.get(pid, 0) + 1
+
+        data = np.load(self._path(registry[name]["file"]), mmap_mode="r")
+        return SharedKlines(self, name, data)
+
+    def open(
+        self,
+        broker_name: str,
+        ticker_symbol: str,
+        time_frame: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        load: Optional[Callable[[Optional[int], Optional[int]], DF]] = None,
+    ) -> SharedKlines:
+        """A handle of the series covering [since, until] (timestamps;
+        'None' requires no bound). The series is created with 'load'
+        (e.g. a storage query, called with the since and until of the
+        range) if it is not on the store yet, or reloaded over the union
+        of the ranges if it does not cover the requested one.
+
+        Raises:
+            KeyError: If the series is not on the store, or does not
+            cover the range, and no 'load' is given.
+        """
+
+        name = self.name(broker_name, ticker_symbol, time_frame)
+        with self._registry() as registry:
+            entry = registry.get(name)
+            if entry is not None and _covers(entry, since, until):
+                return self._attach(registry, name)
+            if entry is not None:
+                since, until = _union(entry, since, until)
+        if load is None:
+            raise KeyError(
+                "{} is not on the shared store, covering the range".format(
+                    name
+                )
+            )
+
+        # Loaded out of the lock, so the other series are not blocked
+        klines = load(since, until).sort_values("Open_time")
+        data = np.ascontiguousarray(
+            klines[columns].to_numpy(dtype="float64").T
+        )
+        file_name = "{}-{}-{}.npy".format(name, os.getpid(), time.time_ns())
+        _atomic_write(self._path(file_name), lambda f: np.save(f, data))
+
+        with self._registry() as registry:
+            entry = registry.get(name)
+            if entry is not None and _covers(entry, since, until):
+                # Loaded meanwhile, by another consumer
+                os.remove(self._path(file_name))
+            elif entry is not None:
+                os.remove(self._path(entry["file"]))  # Mapped ones live on
+                entry.update(file=file_name, since=since, until=until)
+            else:
+                registry[name] = dict(
+                    file=file_name, since=since, until=until, holders=dict()
+                )
+            return self._attach(registry, name)
+
+    def release(self, name: str) -> None:
+        """Drops a handle of the series (of this process); the series is
+        deleted with its last handle."""
+
+        with self._registry() as registry:
+            if name not in registry:
+                return
+            holders = registry[name]["holders"]
+            pid = str(os.getpid())
+            holders[pid] = holders.get(pid, 0) - 1
+            if holders[pid] <= 0:
+                del holders[pid]
+            if not holders:
+                self._drop(registry, name)
+
+    def references(self) -> Dict[str, int]:
+        """Number of handles of each series on the store"""
+
+        with self._registry() as registry:
+            return {
+                name: sum(entry["holders"].values())
+                for name, entry in registry.items()
+            }
+
+
+shared_klines_store = SharedKlinesStore()
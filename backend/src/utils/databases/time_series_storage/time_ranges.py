@@ -0,0 +1,113 @@
+"""Oldest and newest open times of the klines, persisted in the
+relational database, so a klines getter does not query them from the
+broker or from the time series storage every time it is constructed.
+"""
+
+# pylint: disable=too-few-public-methods
+
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from ....lib.marketdata.klines.resampling import (
+    bucket_open_times,
+    next_bucket_open_times,
+)
+from ..sql.crud import klines as crud_klines
+from ..sql.models import SessionLocal
+from ..sql.models.klines import KlinesTimeRange
+
+
+class KlinesTimeRanges:
+    """Cache of the open time ranges, by source ("broker" or "storage"),
+    klines table and time frame. If the relational database is not
+    available, the open times are just computed, as if not cached.
+
+    Args:
+        session_factory (sessionmaker): Of the relational database.
+    """
+
+    __slots__ = ["session_factory", "_table_is_ready", "_lock"]
+
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+        self._table_is_ready = False
+        self._lock = threading.Lock()
+
+    def _session(self):
+        session = self.session_factory()
+        with self._lock:
+            if not self._table_is_ready:
+                KlinesTimeRange.__table__.create(
+                    bind=session.get_bind(), checkfirst=True
+                )
+                self._table_is_ready = True
+        return session
+
+    def _cached(self, key: tuple, field: str) -> Optional[int]:
+        try:
+            with self._session() as db:
+                time_range = crud_klines.get_time_range(db, *key)
+                return getattr(time_range, field, None)
+        except SQLAlchemyError:
+            return None
+
+    def open_time(
+        self, key: tuple, field: str, compute: Callable[[], int]
+    ) -> int:
+        """The cached open time, computed (and cached) on a miss.
+
+        Args:
+            key (tuple): (source, klines_table, time_frame)
+            field (str): "oldest_open_time" or "newest_open_time"
+            compute (Callable): Queries the open time, if not cached.
+        """
+
+        open_time = self._cached(key, field)
+        if open_time is None:
+            open_time = compute()
+            try:
+                with self._session() as db:
+                    crud_klines.set_time_range(db, *key, **{field: open_time})
+            except SQLAlchemyError:
+                pass
+        return open_time
+
+    def extend(
+        self, source: str, klines_table: str, since: int, until: int
+    ) -> None:
+        """Widens the cached ranges of every time frame of the table to
+        hold [since, until] e.g. after klines were appended there."""
+
+        try:
+            with self._session() as db:
+                for time_range in crud_klines.get_time_ranges(
+                    db, source, klines_table
+                ):
+                    # On the broker grid (weeks on mondays, calendar
+                    # months), as the open times of the klines
+                    newest, oldest = bucket_open_times(
+                        [until, since], time_range.time_frame
+                    ).tolist()
+                    if oldest < since:
+                        oldest = int(
+                            next_bucket_open_times(
+                                [oldest], time_range.time_frame
+                            )[0]
+                        )
+                    if time_range.oldest_open_time is not None:
+                        time_range.oldest_open_time = min(
+                            time_range.oldest_open_time, oldest
+                        )
+                    if time_range.newest_open_time is not None:
+                        time_range.newest_open_time = max(
+                            time_range.newest_open_time, newest
+                        )
+                db.commit()
+        except SQLAlchemyError:
+            pass
+
+
+time_ranges = KlinesTimeRanges()
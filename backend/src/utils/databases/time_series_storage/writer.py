@@ -0,0 +1,213 @@
+"""Background, batched writes to the time series storage"""
+
+# pylint: disable=too-few-public-methods
+
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from ...exceptions import StorageError
+from ...tools.time_handlers import cooldown_time
+
+
+class BackgroundWriteError(StorageError):
+    """Some background write failed; 'dataframes' holds the rows which
+    were not written, so they can be enqueued again."""
+
+    def __init__(
+        self, message: str, dataframes: List[pd.core.frame.DataFrame]
+    ):
+        super().__init__(message)
+        self.dataframes = dataframes
+
+
+class WriteMetrics:
+    """Write throughput counters of a 'BackgroundWriter'"""
+
+    __slots__ = [
+        "points",
+        "batches",
+        "retries",
+        "failures",
+        "busy_seconds",
+        "_lock",
+    ]
+
+    def __init__(self):
+        self.points = 0
+        self.batches = 0
+        self.retries = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, **increments) -> None:
+        """Thread-safe increment of the counters."""
+
+        with self._lock:
+            for counter, increment in increments.items():
+                setattr(self, counter, getattr(self, counter) + increment)
+
+    @property
+    def points_per_second(self) -> float:
+        """Points written per second spent writing."""
+
+        if not self.busy_seconds:
+            return 0.0
+        return self.points / self.busy_seconds
+
+    def as_dict(self) -> dict:
+        """Snapshot of the counters."""
+
+        with self._lock:
+            return dict(
+                points=self.points,
+                batches=self.batches,
+                retries=self.retries,
+                failures=self.failures,
+                busy_seconds=self.busy_seconds,
+                points_per_second=self.points_per_second,
+            )
+
+
+class BackgroundWriter:
+    """Writes dataframes on a background thread, so the producer (e.g.
+    the klines download loop) does not wait for the storage.
+
+    Each dataframe is split in batches of up to 'batch_size' rows; a
+    batch that fails with a transient error is retried (with the same
+    cooldown of the broker requests) up to 'max_attempts' times. The
+    queue holds up to 'max_pending' dataframes; when it is full, 'put'
+    blocks (backpressure), so a slow storage can not make the memory
+    grow unbounded. The dataframes must not be changed after 'put'.
+
+    The thread is started by the first 'put' and stopped by 'close'
+    (a later 'put' starts it again).
+
+    Args:
+        write (Callable): Writes one dataframe (batch) to the storage.
+        transient_errors (tuple): Exceptions worth a retry.
+    """
+
+    __slots__ = [
+        "write",
+        "transient_errors",
+        "batch_size",
+        "max_attempts",
+        "metrics",
+        "_queue",
+        "_thread",
+        "_error",
+        "_failed",
+        "_lock",
+    ]
+
+    def __init__(
+        self,
+        write: Callable[[pd.core.frame.DataFrame], None],
+        transient_errors: tuple = (ConnectionError,),
+        batch_size: int = 5000,
+        max_pending: int = 16,
+        max_attempts: int = 5,
+    ):
+        self.write = write
+        self.transient_errors = transient_errors
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.metrics = WriteMetrics()
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._error: Optional[Exception] = None
+        self._failed: List[pd.core.frame.DataFrame] = list()
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="storage-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _write_batch(self, batch: pd.core.frame.DataFrame) -> None:
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.monotonic()
+            try:
+                self.write(batch)
+                self.metrics.record(
+                    points=len(batch),
+                    batches=1,
+                    busy_seconds=time.monotonic() - start,
+                )
+                return
+
+            except self.transient_errors:
+                self.metrics.record(busy_seconds=time.monotonic() - start)
+                if attempt >= self.max_attempts:
+                    raise
+                self.metrics.record(retries=1)
+                time.sleep(cooldown_time(attempt, max_cooldown_time="1m"))
+
+    def _run(self) -> None:
+        while True:
+            dataframe = self._queue.get()
+            if dataframe is None:  # Closed
+                self._queue.task_done()
+                return
+
+            start = 0
+            try:
+                for start in range(0, len(dataframe), self.batch_size):
+                    self._write_batch(
+                        dataframe.iloc[start : start + self.batch_size]
+                    )
+            except Exception as error:  # pylint: disable=broad-except
+                self.metrics.record(failures=1)
+                with self._lock:
+                    self._error = error
+                    self._failed.append(dataframe.iloc[start:])
+            finally:
+                self._queue.task_done()
+
+    def put(self, dataframe: pd.core.frame.DataFrame) -> None:
+        """Enqueues a dataframe to be written; blocks while the queue
+        is full."""
+
+        self._start()
+        self._queue.put(dataframe)
+
+    def flush(self) -> None:
+        """Waits until every enqueued dataframe is written.
+
+        Raises:
+            BackgroundWriteError: If some dataframe could not be written;
+            the error is reported once.
+        """
+
+        self._queue.join()
+        with self._lock:
+            error, self._error = self._error, None
+            failed, self._failed = self._failed, list()
+        if error is not None:
+            raise BackgroundWriteError(
+                "Background write failed", failed
+            ) from error
+
+    def close(self) -> None:
+        """Writes the enqueued dataframes and stops the thread.
+
+        Raises:
+            BackgroundWriteError: As 'flush'.
+        """
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        self.flush()
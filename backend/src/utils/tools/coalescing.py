@@ -0,0 +1,53 @@
+"""Coalescing of concurrent identical requests"""
+
+# pylint: disable=too-few-public-methods
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class RequestCoalescer:
+    """Concurrent requests with the same key share a single execution:
+    the first one starts it and the ones arriving while it is in flight
+    just await its result (or exception), so a burst of identical
+    requests costs one upstream query. Nothing is cached; once the
+    execution finishes, the next request starts a new one.
+
+    The execution is shielded: a requester which is cancelled (e.g. its
+    client disconnected) does not cancel it for the others.
+    """
+
+    __slots__ = ["_in_flight"]
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = dict()
+
+    def in_flight(self) -> int:
+        """Number of executions in flight"""
+
+        return len(self._in_flight)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    async def run(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """The result of 'factory()' (a coroutine function), executed
+        only if no execution with the same key is in flight.
+
+        Args:
+            key (Hashable): Identifies the request e.g. a tuple of its
+            parameters.
+            factory (Callable[[], Awaitable]): Starts the execution.
+        """
+
+        future = self._in_flight.get(key)
+        if future is None or future.done():
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(
+                lambda done: self._forget(key, done)
+            )
+        return await asyncio.shield(future)
@@ -3,11 +3,15 @@
 # pylint: disable=no-name-in-module
 # pylint: disable=too-few-public-methods
 
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
 import pandas as pd
 from print_dict import format_dict
 from pydantic import BaseModel
 from tabulate import tabulate
 
+from ..exceptions import TimeFormatError
 from .time_handlers import pendulum, time_frame_to_seconds
 
 DF = pd.core.frame.DataFrame
@@ -37,66 +41,292 @@ class ConvertString:
         return (self.string.replace("_", " ").title()).replace(" ", "")
 
 
+class KlinesSchema(BaseModel):
+    """Compact dtypes of the klines dataframes, applied by 'FormatKlines',
+    'StorageKlines.get_by_time_range' and the klines 'Getter', to shrink
+    the footprint of large histories. A float column becomes 'price' /
+    'volume' dtype only if the values, with 'significant_digits', are
+    preserved; otherwise, it is kept float64. If 'human_readable_dtype'
+    is "datetime64[ns]", the human readable datetimes are pandas
+    datetimes (8 bytes) instead of Python strings."""
+
+    enabled: bool = True
+    timestamp: str = "int32"  # Seconds; int32 holds dates until 2038
+    price: str = "float32"
+    volume: str = "float32"
+    count: str = "int32"
+    significant_digits: int = 7  # Preserved by float32
+    human_readable_dtype: str = "object"
+    timestamp_columns: list = ["Open_time", "Close_time"]
+    price_columns: list = ["Open", "High", "Low", "Close"]
+    volume_columns: list = [
+        "Volume",
+        "Quote_asset_volume",
+        "Taker_buy_base_asset_volume",
+        "Taker_buy_quote_asset_volume",
+    ]
+    count_columns: list = ["Number_of_trades"]
+    categorical_columns: list = ["Ticker", "Symbol"]
+
+    def _preserves(self, values: np.ndarray, dtype: str) -> bool:
+        """If 'values' (with up to 'significant_digits') are recovered
+        from their 'dtype' representation."""
+
+        values = values[np.isfinite(values) & (values != 0)]
+        exponent = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** (self.significant_digits - 1 - exponent)
+        compact = values.astype(dtype).astype("float64")
+        recovered = np.round(compact * scale) / scale
+        return bool(np.allclose(recovered, values, rtol=1e-12, atol=0))
+
+    def _float(self, series: pd.core.series.Series, dtype: str):
+        values = series.to_numpy(dtype="float64")
+        if self._preserves(values, dtype):
+            return values.astype(dtype)
+        return values
+
+    def _timestamp(self, series: pd.core.series.Series):
+        values = series.to_numpy(dtype="int64")
+        limits = np.iinfo(self.timestamp)
+        if len(values) and (
+            values.min() < limits.min or values.max() > limits.max
+        ):
+            return values
+        return values.astype(self.timestamp)
+
+    def apply(self, klines: DF) -> DF:
+        """Converts, in place, the known columns of the klines (the
+        numeric ones; the human readable timestamps are kept)."""
+
+        if not self.enabled:
+            return klines
+
+        for column in klines.columns:
+            series = klines[column]
+            if column in self.categorical_columns:
+                klines[column] = series.astype("category")
+            elif not pd.api.types.is_numeric_dtype(series):
+                continue
+            elif column in self.timestamp_columns:
+                klines[column] = self._timestamp(series)
+            elif column in self.price_columns:
+                klines[column] = self._float(series, self.price)
+            elif column in self.volume_columns:
+                klines[column] = self._float(series, self.volume)
+            elif column in self.count_columns:
+                klines[column] = series.to_numpy().astype(self.count)
+        return klines
+
+
+klines_schema = KlinesSchema()
+
+
+class KlinesMemoryUsage(BaseModel):
+    """Footprint of a klines dataframe, in bytes"""
+
+    total: int
+    per_kline: float
+    by_column: Dict[str, int]
+
+
+def memory_usage(klines: DF) -> KlinesMemoryUsage:
+    """Memory held by the klines (deep: Python strings included)"""
+
+    usage = klines.memory_usage(deep=True, index=True)
+    return KlinesMemoryUsage(
+        total=int(usage.sum()),
+        per_kline=float(usage.sum()) / max(len(klines), 1),
+        by_column={str(column): int(size) for column, size in usage.items()},
+    )
+
+
 class FormatKlines:
-    """Quis anim est incididunt anim non ullamco mollit pariatur """
+    """Builds a klines dataframe straight from the raw (json decoded)
+    broker response, a list of klines, each one a list of values in the
+    order declared by 'settings.kline_information'. The conversion is
+    made column by column, with NumPy; the datetime columns become
+    integer timestamps (seconds) and all the others, floats."""
 
     __slots__ = [
         "datetime_format",
         "datetime_unit",
         "columns",
-        "formatted_klines",
+        "raw_klines",
     ]
 
+    datetime_columns = ["Open_time", "Close_time"]
+
     def __init__(self, klines_in: list, settings: BaseModel):
         self.datetime_format = settings.datetime_format
         self.datetime_unit = settings.datetime_unit
         self.columns = settings.kline_information
-        self.formatted_klines = [
-            self.format_each(kline) for kline in klines_in
-        ]
+        self.raw_klines = np.array(klines_in, dtype=object).reshape(
+            -1, len(self.columns)
+        )
 
     def format_datetime(
-        self, datetime_in, reset_the_seconds_to_zero=False
-    ) -> int:
-        """Quis anim est incididunt anim non ullamco mollit pariatur """
-
-        if self.datetime_format == "timestamp":
-            if self.datetime_unit == "seconds":
-                datetime_out = int(float(datetime_in))
+        self, datetime_in: np.ndarray, reset_the_seconds_to_zero=False
+    ) -> np.ndarray:
+        """Converts a column of broker timestamps to integer seconds
+        timestamps, optionally truncated to the start of the minute."""
 
-            elif self.datetime_unit == "milliseconds":
-                datetime_out = int(float(datetime_in) / 1000)
+        if self.datetime_format != "timestamp":
+            raise TimeFormatError(
+                "Unsupported datetime format: {}".format(self.datetime_format)
+            )
 
-            if reset_the_seconds_to_zero:
-                _date_time = pendulum.from_timestamp(int(datetime_out))
+        datetime_out = datetime_in.astype("float64")
+        if self.datetime_unit == "milliseconds":
+            datetime_out = datetime_out / 1000
 
-                if _date_time.second != 0:
-                    datetime_out = (
-                        _date_time.subtract(seconds=_date_time.second)
-                    ).int_timestamp
+        datetime_out = datetime_out.astype("int64")
+        if reset_the_seconds_to_zero:
+            datetime_out -= datetime_out % 60
 
         return datetime_out
 
-    def format_each(self, kline: list) -> list:
-        """Quis anim est incididunt anim non ullamco mollit pariatur """
+    def to_dataframe(self, columns: Optional[List[str]] = None) -> DF:
+        """Klines formatted as a pandas dataframe, with the 'klines_schema'
+        dtypes.
 
-        return [
-            self.format_datetime(_item, reset_the_seconds_to_zero=True)
-            if kline.index(_item) == self.columns.index("Open_time")
-            else self.format_datetime(_item)
-            if kline.index(_item) == self.columns.index("Close_time")
-            else float(_item)
-            for _item in kline
-        ]
+        Args:
+            columns (List[str], optional): Subset of the columns to be
+            formatted; the others are skipped. Defaults to all.
+        """
 
-    def to_dataframe(self) -> DF:
-        """Quis anim est incididunt anim non ullamco mollit pariatur """
+        data = dict()
+        columns = columns or self.columns
+        for column in columns:
+            values = self.raw_klines[:, self.columns.index(column)]
 
-        klines = pd.DataFrame(
-            self.formatted_klines, columns=self.columns
-        ).astype({"Open_time": "int32", "Close_time": "int32"})
+            if column in self.datetime_columns:
+                data[column] = self.format_datetime(
+                    values, reset_the_seconds_to_zero=column == "Open_time"
+                )
+            else:
+                data[column] = values.astype("float64")
 
-        return klines
+        return klines_schema.apply(pd.DataFrame(data, columns=columns))
+
+
+class KlinesBuilder:
+    """Collects klines pages (e.g. the responses of consecutive broker
+    requests) column by column, as NumPy arrays, and concatenates them
+    once, on 'build'; so a long backfill does not copy the accumulated
+    klines on every page, as repeated 'DataFrame.append' calls do."""
+
+    __slots__ = ["columns", "_chunks", "_length"]
+
+    def __init__(self):
+        self.columns: List[str] = list()
+        self._chunks: Dict[str, List[np.ndarray]] = dict()
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def add(self, page: DF) -> None:
+        """Appends a page; the columns are the ones of the first page."""
+
+        if not self.columns:
+            self.columns = list(page.columns)
+            self._chunks = {column: list() for column in self.columns}
+        if not len(page):
+            return
+        for column in self.columns:
+            self._chunks[column].append(page[column].to_numpy())
+        self._length += len(page)
+
+    def build(self) -> DF:
+        """The klines of all the pages, in the order they were added."""
+
+        return pd.DataFrame(
+            {
+                column: np.concatenate(chunks) if chunks else list()
+                for column, chunks in self._chunks.items()
+            },
+            columns=self.columns,
+        )
+
+
+class KlinesWindow(NamedTuple):
+    """A window of 'overlapping_windows'"""
+
+    klines: DF
+    overlap: int  # Leading klines repeated from before the window
+
+    @property
+    def new(self) -> DF:
+        """The klines of the window without the overlap ones"""
+
+        return self.klines[self.overlap :]
+
+
+def overlapping_windows(
+    pages: Iterable[DF],
+    window_samples: int,
+    overlap: int = 0,
+    since: Optional[int] = None,
+) -> Iterator[KlinesWindow]:
+    """Regroups a stream of klines pages (with timestamps) into windows
+    of 'window_samples' new klines, each one preceded by the 'overlap'
+    klines before it, e.g. to warm up rolling indicators; only a page
+    and a window are held in memory at a time.
+
+    Args:
+        pages (Iterable[DF]): Consecutive klines, sorted by 'Open_time'.
+        window_samples (int): New klines per window; the last window
+        may have less.
+        overlap (int, optional): Klines repeated from the previous
+        window. Defaults to 0.
+        since (int, optional): If given, the leading klines opened before
+        it are only the overlap (warm up) of the first window.
+
+    Raises:
+        ValueError: If 'window_samples' is less than 1 or 'overlap' is
+        negative.
+    """
+
+    if window_samples < 1 or overlap < 0:
+        raise ValueError(
+            "window_samples must be >= 1 and overlap >= 0, not {}, {}".format(
+                window_samples, overlap
+            )
+        )
+    return _overlapping_windows(pages, window_samples, overlap, since)
+
+
+def _overlapping_windows(
+    pages: Iterable[DF],
+    window_samples: int,
+    overlap: int,
+    since: Optional[int],
+) -> Iterator[KlinesWindow]:
+    pending, carried = None, None
+    for page in pages:
+        pending = (
+            page
+            if pending is None
+            else pd.concat([pending, page], ignore_index=True)
+        )
+        if carried is None:
+            if since is None:
+                carried = 0
+            elif (pending.Open_time >= since).any():
+                carried = int((pending.Open_time < since).sum())
+                pending = pending[max(0, carried - overlap) :]
+                carried = min(carried, overlap)
+            else:
+                continue
+
+        while len(pending) - carried >= window_samples:
+            end = carried + window_samples
+            yield KlinesWindow(pending[:end].reset_index(drop=True), carried)
+            start = max(0, end - overlap)
+            pending, carried = pending[start:], end - start
+
+    if pending is not None and carried is not None and len(pending) > carried:
+        yield KlinesWindow(pending.reset_index(drop=True), carried)
 
 
 def remove_last_kline_if_unclosed(klines: DF, time_frame: str) -> DF:
@@ -116,3 +346,21 @@ def remove_last_kline_if_unclosed(klines: DF, time_frame: str) -> DF:
     if unclosed:
         return klines[:-1]
     return klines
+
+
+def json_columns(klines: DF) -> Dict[str, list]:
+    """The klines as JSON ready columns (e.g. for an API response): the
+    float32 values (see 'KlinesSchema') are sent as their shortest
+    decimal representation (9000.1, not 9000.099609375) and the NaN ones
+    (e.g. warming up indicators) as null.
+    """
+
+    columns = dict()
+    for column in klines.columns:
+        values = klines[column].to_numpy()
+        if values.dtype == np.float32:
+            values = values.astype(str).astype("float64")
+        if values.dtype.kind == "f":
+            values = np.where(np.isnan(values), None, values.astype(object))
+        columns[column] = values.tolist()
+    return columns
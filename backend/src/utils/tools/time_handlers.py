@@ -1,8 +1,10 @@
 """Usefull tools for time and datetime issues."""
 
 import math
+import re
 from typing import List
 
+import numpy as np
 import pandas as pd
 import pendulum
 from pendulum.exceptions import PendulumException
@@ -15,6 +17,28 @@ settings = SystemSettings().date_time
 
 pd.options.mode.chained_assignment = None
 
+# Tokens of the pendulum formats and their strftime/strptime directives
+_format_directives = {
+    "YYYY": "%Y",
+    "YY": "%y",
+    "MM": "%m",
+    "DD": "%d",
+    "HH": "%H",
+    "mm": "%M",
+    "ss": "%S",
+}
+
+
+def strptime_format(pendulum_format: str) -> str:
+    """The strftime/strptime counterpart of a pendulum format, e.g.
+    "YYYY-MM-DD HH:mm:ss" -> "%Y-%m-%d %H:%M:%S"."""
+
+    return re.sub(
+        "|".join(_format_directives),
+        lambda match: _format_directives[match.group(0)],
+        pendulum_format,
+    )
+
 
 class ParseDateTime:
     """Make both way conversion timestamp/human readable datetime."""
@@ -37,7 +61,7 @@ class ParseDateTime:
         except (PendulumException, ValueError, TypeError) as error:
             msg = "Input datetime must be a str type and formatted like {}."
 
-            raise Exception(
+            raise TimeFormatError(
                 msg.format(settings.human_readable_format)
             ) from error
 
@@ -47,13 +71,13 @@ class ParseDateTime:
             settings.human_readable_format
         )
         try:
-            return pendulum.from_timestamp(
-                self.date_time_in
-            ).to_datetime_string()
+            return pendulum.from_timestamp(self.date_time_in).format(
+                settings.human_readable_format
+            )
 
         except (PendulumException, ValueError, TypeError) as error:
             msg = "Input must be a timestamp, integer or string type."
-            raise Exception(msg) from error
+            raise TimeFormatError(msg) from error
 
 
 class Now:
@@ -80,18 +104,61 @@ class Now:
 @pd.api.extensions.register_dataframe_accessor("parse_datetime")
 class DataFrameDateTimeconversion:
     """Apply timestamp/human readable datetime conversion over
-    dataframe columns items."""
+    dataframe columns items. The conversion is vectorized (NumPy
+    datetime64), with the same output of 'ParseDateTime', and columns
+    already in the target representation are kept as they are."""
 
     __slots__ = ["_dataframe"]
 
     def __init__(self, dataframe: pd.core.frame.DataFrame):
         self._dataframe = dataframe
 
-    def _convert(self, column: str, conversion: str) -> None:
-        self._dataframe.loc[:, column] = self._dataframe.apply(
-            lambda func: getattr(ParseDateTime(func[column]), conversion)(),
-            axis=1,
+    @staticmethod
+    def _is_timestamp(series: pd.core.series.Series) -> bool:
+        return pd.api.types.is_numeric_dtype(series)
+
+    @staticmethod
+    def _human_readable_from(series: pd.core.series.Series) -> np.ndarray:
+        if not len(series):
+            return series.to_numpy(object)
+
+        datetimes = series.to_numpy(dtype="int64").astype("datetime64[s]")
+        fmt = strptime_format(settings.human_readable_format)
+        if fmt != "%Y-%m-%d %H:%M:%S":
+            return pd.Series(datetimes).dt.strftime(fmt).to_numpy(object)
+
+        # ISO 8601 'YYYY-MM-DDTHH:mm:ss' -> 'YYYY-MM-DD HH:mm:ss'
+        strings = np.datetime_as_string(datetimes, unit="s")
+        strings.view("<U1").reshape(len(strings), -1)[:, 10] = " "
+        return strings.astype(object)
+
+    @staticmethod
+    def _timestamp_from(series: pd.core.series.Series) -> np.ndarray:
+        datetimes = pd.to_datetime(
+            series, format=strptime_format(settings.human_readable_format)
         )
+        if settings.system_timezone != "UTC":
+            datetimes = datetimes.dt.tz_localize(settings.system_timezone)
+        return datetimes.view("int64").to_numpy() // 10 ** 9
+
+    def _convert(self, column: str, conversion: str) -> None:
+        series = self._dataframe[column]
+        try:
+            if conversion == "to_timestamp" and not self._is_timestamp(
+                series
+            ):
+                self._dataframe[column] = self._timestamp_from(series)
+
+            elif conversion == "to_human_readable" and self._is_timestamp(
+                series
+            ):
+                self._dataframe[column] = self._human_readable_from(series)
+
+        except (ValueError, TypeError) as error:
+            msg = "Column '{}' must hold timestamps or {} strings."
+            raise TimeFormatError(
+                msg.format(column, settings.human_readable_format)
+            ) from error
 
     def to_timestamp(self, columns: List[str]):
         """If human readable str, returns associated int timestamp."""
@@ -107,23 +174,34 @@ class DataFrameDateTimeconversion:
 
 
 def int_timestamp(datetime: DateTimeType) -> int:
-    """Try to return an integer timestamp given a datetime."""
+    """Try to return an integer timestamp given a datetime.
+
+    Raises:
+        TimeFormatError: If it is neither a timestamp nor a human
+        readable datetime.
+    """
 
     try:  # Already int or str timestamp (SECONDS), or ...
         return int(datetime)
-    except ValueError:
-        try:  # ... maybe a human readable datetime, or ...
-            return ParseDateTime(datetime).to_timestamp()
-        except ValueError as err:  # ... an invalid input.
-            raise TimeFormatError.with_traceback(err)
+    except (ValueError, TypeError):  # ... maybe a human readable datetime
+        return ParseDateTime(datetime).to_timestamp()
 
 
 def time_frame_to_seconds(time_frame: str) -> int:
-    """Returns the equivalent amount of seconds of a given timeframe."""
+    """Returns the equivalent amount of seconds of a given timeframe.
+
+    Raises:
+        ValueError: If the time frame is not a fixed length one, e.g.
+        the calendar months ("1M"), handled by the 'resampling' module.
+    """
 
     conversor = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
-    scale_unit = time_frame[-1]  # "m", "h", "d" or "w"
-    time_amount = int(time_frame.split(scale_unit)[0])
+    scale_unit = time_frame[-1:]  # "m", "h", "d" or "w"
+    if scale_unit not in conversor:
+        raise ValueError(
+            "'{}' is not a fixed length time frame".format(time_frame)
+        )
+    time_amount = int(time_frame[:-1])
     return time_amount * conversor[scale_unit]
 
 
@@ -0,0 +1,231 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import asyncio
+from json import dumps, loads
+from typing import NamedTuple
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from src.API.api_v1.endpoints import klines
+from src.API.router import api
+from src.lib.marketdata.klines.base import GetterSettings
+from src.utils.tools.formatting import klines_schema
+
+URL = "/api/v1/klines/binance/btcusdt/1h"
+
+
+def fake_klines(number_samples: int = 200) -> pd.DataFrame:
+    close = 100 + 10 * np.sin(np.arange(number_samples) / 10)
+    return klines_schema.apply(
+        pd.DataFrame(
+            {
+                "Open_time": 1577836800 + 3600 * np.arange(number_samples),
+                "Open": close - 0.5,
+                "High": close + 1.0,
+                "Low": close - 1.0,
+                "Close": close,
+                "Volume": np.full(number_samples, 10.0),
+            }
+        )
+    )
+
+
+class FakeGetter:
+    queries = list()
+
+    def __init__(self, broker_name, ticker, time_frame):
+        self.settings = GetterSettings()
+        self.key = (broker_name, ticker.symbol, time_frame)
+
+    async def async_get(self, **kwargs) -> pd.DataFrame:
+        FakeGetter.queries.append((*self.key, kwargs))
+        await asyncio.sleep(0.05)  # The upstream query
+        return fake_klines()
+
+
+@pytest.fixture(name="queries")
+def fixture_queries(monkeypatch):
+    FakeGetter.queries = list()
+    monkeypatch.setitem(klines.getters, "storage", FakeGetter)
+    return FakeGetter.queries
+
+
+class Response(NamedTuple):
+    status_code: int
+    body: bytes
+
+    def json(self):
+        return loads(self.body)
+
+
+async def asgi_request(app, method, url, params=None, json=None) -> Response:
+    """Calls the ASGI app directly, on the running event loop, so the
+    concurrent requests share it (as on a server worker)."""
+
+    body = b"" if json is None else dumps(json).encode()
+    scope = dict(
+        type="http",
+        asgi=dict(version="3.0"),
+        http_version="1.1",
+        method=method,
+        scheme="http",
+        path=url,
+        raw_path=url.encode(),
+        query_string=urlencode(params or dict()).encode(),
+        root_path="",
+        headers=[
+            (b"host", b"test"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        client=("127.0.0.1", 123),
+        server=("test", 80),
+    )
+    requested, responded = False, asyncio.Event()
+    status_code, chunks = None, list()
+
+    async def receive() -> dict:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return dict(type="http.request", body=body, more_body=False)
+        await responded.wait()
+        return dict(type="http.disconnect")
+
+    async def send(message: dict) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                responded.set()
+
+    await app(scope, receive, send)
+    return Response(status_code, b"".join(chunks))
+
+
+def run_requests(*requests) -> list:
+    app = FastAPI()
+    app.include_router(api, prefix="/api/v1")
+
+    async def send():
+        return await asyncio.gather(
+            *(
+                asgi_request(app, method, url, **kwargs)
+                for method, url, kwargs in requests
+            )
+        )
+
+    return asyncio.run(send())
+
+
+def test_concurrent_identical_requests_share_one_query(queries):
+    params = dict(params=dict(since="1577836800", number_samples=200))
+    responses = run_requests(*[("GET", URL, params)] * 5)
+
+    assert len(queries) == 1
+    assert queries[0][:3] == ("binance", "BTCUSDT", "1h")
+    assert all(response.status_code == 200 for response in responses)
+    assert all(
+        response.json() == responses[0].json() for response in responses
+    )
+    assert responses[0].json()["Open_time"][:2] == [1577836800, 1577840400]
+    assert klines.coalescer.in_flight() == 0
+
+    run_requests(("GET", URL, params))
+    assert len(queries) == 2  # Coalesced, not cached
+
+
+def test_indicator_shares_the_klines_query(queries):
+    params = dict(until="1578553200", number_samples=200)
+    responses = run_requests(
+        ("GET", URL, dict(params=params)),
+        (
+            "POST",
+            URL + "/indicators/sma",
+            dict(params=params, json=dict(number_samples=3)),
+        ),
+    )
+
+    assert len(queries) == 1
+    columns = responses[1].json()
+    assert columns["SMA_3"][:2] == [None, None]
+    assert columns["SMA_3"][2] == pytest.approx(
+        np.mean(columns["Price_ohlc4"][:3])
+    )
+    assert "SMA_3" not in responses[0].json()
+
+
+def test_invalid_requests(queries):
+    responses = run_requests(
+        ("POST", URL + "/indicators/unknown", dict()),
+        (
+            "POST",
+            URL + "/indicators/sma",
+            dict(json=dict(number_samples="x")),
+        ),
+        ("GET", URL, dict(params=dict(source="elsewhere"))),
+    )
+
+    assert [response.status_code for response in responses] == [
+        404,
+        422,
+        422,
+    ]
+    assert not queries
+
+
+def test_invalid_path_parameters(queries):
+    responses = run_requests(
+        ("GET", "/api/v1/klines/binance/btcusdt/1x", dict()),
+        ("GET", "/api/v1/klines/binance/btcusdt/1m) ;1m", dict()),
+        ("GET", "/api/v1/klines/binance/btc-usdt/1h", dict()),
+        ("GET", "/api/v1/klines/elsewhere/btcusdt/1h", dict()),
+        (
+            "POST",
+            "/api/v1/backtesting/binance/btcusdt",
+            dict(
+                params=dict(since="1578000000", until="1578553200"),
+                json=dict(setup=dict(time_frame="1x")),
+            ),
+        ),
+        ("GET", URL, dict(params=dict(since="garbage", number_samples=2))),
+        ("GET", URL, dict(params=dict(since="1577836800", until="x"))),
+        (
+            "POST",
+            "/api/v1/backtesting/binance/btcusdt",
+            dict(params=dict(since="garbage", until="1578553200")),
+        ),
+        (
+            "POST",
+            "/api/v1/backtesting/binance/btcusdt",
+            dict(params=dict(since="1578000000", until="garbage")),
+        ),
+    )
+
+    assert [response.status_code for response in responses] == [400] * 9
+    assert not queries
+
+
+def test_backtest(queries):
+    responses = run_requests(
+        (
+            "POST",
+            "/api/v1/backtesting/binance/btcusdt",
+            dict(
+                params=dict(since="1578000000", until="1578553200"),
+                json=dict(setup=dict(time_frame="1h")),
+            ),
+        )
+    )
+
+    assert responses[0].status_code == 200
+    assert responses[0].json()["initial_equity"] == 1000.0
+    assert queries[0][:3] == ("binance", "BTCUSDT", "1h")
@@ -0,0 +1,38 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import re
+
+import pytest
+import requests_mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.utils.databases.time_series_storage.time_ranges import time_ranges
+
+from .fake_binance import fake_binance_klines
+
+
+@pytest.fixture(autouse=True)
+def memory_relational_database(monkeypatch):
+    """Each test gets its own in-memory relational database."""
+
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine
+    )
+    monkeypatch.setattr(time_ranges, "session_factory", session_factory)
+    monkeypatch.setattr(time_ranges, "_table_is_ready", False)
+    yield session_factory
+    engine.dispose()
+
+
+@pytest.fixture(name="binance_mock")
+def fixture_binance_mock():
+    with requests_mock.mock() as m_req:
+        m_req.get(re.compile("klines"), json=fake_binance_klines)
+        yield m_req
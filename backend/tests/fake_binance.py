@@ -0,0 +1,35 @@
+"""Stand-in of the binance klines REST endpoint, shared by the tests"""
+
+# pylint: disable=missing-function-docstring
+
+from urllib.parse import parse_qs, urlparse
+
+FIRST_OPEN_TIME = 1577836800  # '2020-01-01 00:00:00'
+TIME_FRAME_SECONDS = 3600  # 1h
+
+
+def fake_binance_klines(request, context):
+    query = parse_qs(urlparse(request.url).query)
+    since = max(int(query["startTime"][0]) // 1000, FIRST_OPEN_TIME)
+    since += -since % TIME_FRAME_SECONDS
+    limit = int(query.get("limit", [500])[0])
+    context.headers["x-mbx-used-weight-1m"] = "1"
+    return [
+        [
+            1000 * open_time,
+            "1.0",
+            "2.0",
+            "0.5",
+            "1.5",
+            "10.0",
+            1000 * (open_time + TIME_FRAME_SECONDS) - 1,
+            "15.0",
+            3,
+            "5.0",
+            "7.5",
+            "0",
+        ]
+        for open_time in range(
+            since, since + limit * TIME_FRAME_SECONDS, TIME_FRAME_SECONDS
+        )
+    ]
@@ -0,0 +1,113 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+
+from src.lib.brokers_wrappers import BrokerFabric
+from src.utils.exceptions import BrokerError
+from src.utils.schemas.generics import Order, Ticker
+
+TICKER = Ticker(symbol="BTCUSDT", base="BTC", quote="USDT")
+FIRST_OPEN_TIME = 1609459200  # 2021-01-01 00:00:00
+
+
+@pytest.fixture
+def broker():
+    prices = [100.0 + i for i in range(10)]
+    klines = pd.DataFrame(
+        dict(
+            Open_time=[FIRST_OPEN_TIME + 60 * i for i in range(10)],
+            Open=prices,
+            High=[price + 1 for price in prices],
+            Low=[price - 1 for price in prices],
+            Close=prices,
+            Volume=1.0,
+        )
+    )
+    _broker = BrokerFabric("binance").backtesting(assets=[TICKER])
+    _broker.backtesting_settings.price_metrics = "c"
+    _broker.load_klines(TICKER, klines)
+    return _broker
+
+
+def test_replay_serves_only_closed_klines(broker):
+    clocks = list(broker.replay(until=FIRST_OPEN_TIME + 120))
+
+    assert clocks == [FIRST_OPEN_TIME + 60 * i for i in (1, 2, 3)]
+    assert broker.server_time() == FIRST_OPEN_TIME + 180
+    assert broker.get_price("BTCUSDT") == 102.0
+
+    klines = broker.get_klines("BTCUSDT", "1m")
+    assert klines.Open_time.tolist()[-1] == FIRST_OPEN_TIME + 120
+    assert len(broker.get_klines("BTCUSDT", "1m", number_samples=2)) == 2
+
+
+def test_klines_resampled_from_memory(broker):
+    for _ in broker.replay():
+        pass
+
+    klines = broker.get_klines("BTCUSDT", "5m")
+    assert klines.Open.tolist() == [100.0, 105.0]
+    assert klines.High.tolist() == [105.0, 110.0]
+
+
+def test_orders_fill_against_the_wallet(broker):
+    replay = broker.replay()
+    next(replay)
+
+    fee_rate = broker.settings.fee_rate_decimal
+    buy = broker.execute_order(
+        Order(ticker_symbol="BTCUSDT", signal="buy", quantity=2.0)
+    )
+    assert buy.fulfilled and buy.price == 100.0
+    assert broker.wallet["USDT"] == pytest.approx(1000 - 200 * (1 + fee_rate))
+    assert broker.wallet["BTC"] == 2.0
+
+    next(replay)
+    sell = broker.execute_order(
+        Order(ticker_symbol="BTCUSDT", signal="sell", quantity=2.0)
+    )
+    assert sell.fulfilled and sell.fee == pytest.approx(202 * fee_rate)
+    assert broker.wallet["BTC"] == 0.0
+    assert broker.portfolio_value("USDT") == pytest.approx(
+        1000 + 2 - 402 * fee_rate
+    )
+
+
+def test_unfilled_orders(broker):
+    next(broker.replay())
+
+    too_big = broker.execute_order(
+        Order(ticker_symbol="BTCUSDT", signal="buy", quantity=100.0)
+    )
+    limit = broker.execute_order(
+        Order(
+            ticker_symbol="BTCUSDT",
+            signal="buy",
+            order_type="limit",
+            price=90.0,
+            quantity=1.0,
+        )
+    )
+    hold = broker.execute_order(Order(ticker_symbol="BTCUSDT"))
+
+    assert not any(order.fulfilled for order in (too_big, limit, hold))
+    assert too_big.warnings == "Insufficient balance"
+    assert broker.wallet == dict(USDT=1000.0)
+
+
+def test_test_orders_do_not_touch_the_wallet(broker):
+    next(broker.replay())
+
+    order = broker.execute_test_order(
+        Order(ticker_symbol="BTCUSDT", signal="buy", quantity=1.0)
+    )
+    assert order.fulfilled and order.test_order
+    assert broker.wallet == dict(USDT=1000.0) and not broker.orders
+
+
+def test_no_price_before_the_replay(broker):
+    with pytest.raises(BrokerError):
+        broker.get_price("BTCUSDT")
@@ -0,0 +1,68 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import pytest
+import requests
+import requests_mock
+from src.lib.brokers_wrappers.base import (
+    BrokerSettings,
+    RequestWeightBucket,
+    get_response,
+    http_session,
+    request_weight_bucket,
+)
+from src.utils.exceptions import BrokerError
+
+
+class TestRequestWeightBucket:
+    def test_acquire_within_capacity(self):
+        bucket = RequestWeightBucket(weight_per_minute=60)
+        assert bucket.try_acquire(weight=50) == 0.0
+        assert 9 < bucket.available() < 11
+
+    def test_wait_time_when_exhausted(self):
+        bucket = RequestWeightBucket(weight_per_minute=60)
+        bucket.drain()
+        delay = bucket.try_acquire(weight=2)
+        assert 1.9 < delay <= 2.0  # 1 token per second
+
+    def test_unlimited_bucket_never_blocks(self):
+        bucket = RequestWeightBucket(weight_per_minute=None)
+        bucket.drain()
+        assert bucket.try_acquire(weight=10 ** 6) == 0.0
+
+    def test_shared_by_broker_endpoint(self):
+        settings = BrokerSettings(
+            base_endpoint="https://shared.test/", request_weight_per_minute=10
+        )
+        assert request_weight_bucket(settings) is request_weight_bucket(
+            settings.copy()
+        )
+
+
+def test_sync_only_lowers_the_prediction():
+    bucket = RequestWeightBucket(weight_per_minute=60)
+    bucket.sync(used_weight=55)
+    assert bucket.available() < 6
+    bucket.sync(used_weight=0)
+    assert bucket.available() < 6
+
+
+def test_http_session_is_pooled_per_broker():
+    settings = BrokerSettings(base_endpoint="https://pooled.test/")
+    session = http_session(settings)
+    assert session is http_session(settings.copy())
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.get_adapter(settings.base_endpoint)._pool_maxsize == (
+        settings.http_pool_size
+    )
+
+
+def test_timeouts_are_broker_errors():
+    endpoint = "https://timeout.test/api/v3/time"
+    with requests_mock.mock() as m_req:
+        m_req.get(endpoint, exc=requests.exceptions.ReadTimeout)
+        with pytest.raises(BrokerError):
+            get_response(endpoint, timeout=0.1)
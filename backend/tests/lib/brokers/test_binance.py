@@ -2,13 +2,28 @@
 # pylint: disable=missing-function-docstring
 # pylint: disable=missing-class-docstring
 # pylint: disable=too-few-public-methods
+# pylint: disable=protected-access
 
+import asyncio
+
+import pytest
 import requests_mock
-from src.lib.brokers_wrappers.binance import Binance
+from aiohttp import web
+from src.lib.brokers_wrappers import base
+from src.lib.brokers_wrappers.base import close_async_http_sessions
+from src.lib.brokers_wrappers.binance import Binance, Settings
 
 broker = Binance()
 
 
+@pytest.fixture(autouse=True)
+def fresh_request_weight_buckets(monkeypatch):
+    """The tests drain the (process-wide) request weight bucket; each
+    one gets fresh buckets, so no other test depends on their order."""
+
+    monkeypatch.setattr(base, "_request_weight_buckets", dict())
+
+
 def test_server_time():
     endpoint = broker.settings.time_endpoint
     server_time = {"serverTime": "1593609165616"}
@@ -16,3 +31,62 @@ def test_server_time():
         m_req.get(endpoint, json=server_time)
         binance_time = broker.server_time()
         assert binance_time == int(1593609165616 / 1000)
+
+
+def test_used_weight_header_lowers_the_shared_budget():
+    endpoint = broker.settings.time_endpoint
+    headers = {"x-mbx-used-weight-1m": "1100"}
+    with requests_mock.mock() as m_req:
+        m_req.get(endpoint, json={"serverTime": 0}, headers=headers)
+        broker.server_time()
+        assert broker.request_weight.available() < 1
+
+
+def test_max_requests_limit_hit_does_not_ping():
+    with requests_mock.mock() as m_req:
+        broker.request_weight.drain()
+        assert broker.max_requests_limit_hit()
+        assert not m_req.called
+
+
+def test_async_server_time():
+    async def time_handler(_request):
+        return web.json_response({"serverTime": 1593609165616})
+
+    async def run() -> int:
+        app = web.Application()
+        app.router.add_get("/api/v3/time", time_handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        base_endpoint = "http://127.0.0.1:{}/api/v3/".format(port)
+        local_broker = Binance(
+            settings=Settings(
+                base_endpoint=base_endpoint,
+                time_endpoint=base_endpoint + "time",
+            )
+        )
+        try:
+            return await local_broker.async_server_time()
+        finally:
+            await close_async_http_sessions()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == 1593609165
+
+
+def test_async_sessions_of_closed_loops_are_dropped():
+    settings = Settings()
+
+    async def open_session():
+        session = base.async_http_session(settings)
+        await session.close()  # The entry is left behind
+
+    asyncio.run(open_session())
+    asyncio.run(open_session())
+
+    # Only the entry of the last loop is kept, until the next call
+    assert len(base._async_http_sessions) == 1
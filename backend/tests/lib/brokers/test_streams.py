@@ -0,0 +1,127 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=protected-access
+
+import asyncio
+import json
+
+import websockets
+from aiohttp import web
+from src.lib.brokers_wrappers import streams
+from src.lib.brokers_wrappers.base import close_async_http_sessions
+from src.lib.brokers_wrappers.binance import Binance, Settings
+
+T0 = 1577836800  # '2020-01-01 00:00:00'
+STEP = 60  # 1m
+
+
+def raw_kline(open_time: int) -> list:
+    return [
+        1000 * open_time,
+        "1.0",
+        "2.0",
+        "0.5",
+        "1.5",
+        "10.0",
+        1000 * (open_time + STEP) - 1,
+        "15.0",
+        3,
+        "5.0",
+        "7.5",
+        "0",
+    ]
+
+
+def stream_message(open_time: int, closed: bool = True) -> str:
+    return json.dumps(
+        {
+            "e": "kline",
+            "s": "BTCUSDT",
+            "k": {
+                "t": 1000 * open_time,
+                "T": 1000 * (open_time + STEP) - 1,
+                "i": "1m",
+                "o": "1.0",
+                "h": "2.0",
+                "l": "0.5",
+                "c": "1.5",
+                "v": "10.0",
+                "x": closed,
+            },
+        }
+    )
+
+
+class LocalBinance:
+    """Stand-in of the binance REST and websocket APIs: the first stream
+    connection skips a kline and is dropped; the second one goes on."""
+
+    def __init__(self):
+        self.rest_last = T0 + 2 * STEP  # Newest closed kline on REST
+        self.connections = 0
+
+    async def klines(self, request):
+        since = int(request.query["startTime"]) // 1000
+        page = range(since, self.rest_last + 1, STEP)[:1]  # Tiny pages
+        return web.json_response([raw_kline(t) for t in page])
+
+    async def stream(self, websocket, *_path):
+        self.connections += 1
+        if self.connections == 1:
+            await websocket.send(stream_message(T0 + 3 * STEP, closed=False))
+            await websocket.send(stream_message(T0 + 2 * STEP))  # Repeated
+            await websocket.send(stream_message(T0 + 3 * STEP))
+            self.rest_last = T0 + 6 * STEP
+            await websocket.send(stream_message(T0 + 6 * STEP))  # Skips 4, 5
+            self.rest_last = T0 + 7 * STEP
+            await websocket.close()  # Misses the 7th kline
+        else:
+            await websocket.send(stream_message(T0 + 8 * STEP))
+            await asyncio.sleep(10)
+
+
+def test_closed_klines_are_streamed_in_order(monkeypatch):
+    monkeypatch.setattr(streams, "cooldown_time", lambda *_args: 0)
+    local_binance = LocalBinance()
+
+    async def run() -> list:
+        app = web.Application()
+        app.router.add_get("/klines", local_binance.klines)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        rest_port = site._server.sockets[0].getsockname()[1]
+        server = await websockets.serve(local_binance.stream, "127.0.0.1", 0)
+        stream_port = list(server.sockets)[0].getsockname()[1]
+
+        broker = Binance(
+            settings=Settings(
+                base_endpoint="http://127.0.0.1:{}/".format(rest_port),
+                klines_endpoint="http://127.0.0.1:{}/klines".format(rest_port)
+                + "?symbol={}&interval={}",
+                stream_endpoint="ws://127.0.0.1:{}/ws/".format(stream_port),
+            )
+        )
+        stream = broker.klines_stream("BTCUSDT", "1m", last_open_time=T0)
+        klines = list()
+        try:
+            async for kline in stream.klines():
+                klines.append(kline)
+                if len(klines) == 8:
+                    return klines
+        finally:
+            server.close()
+            await close_async_http_sessions()
+            await runner.cleanup()
+
+    klines = asyncio.run(asyncio.wait_for(run(), timeout=20))
+    assert [kline["Open_time"] for kline in klines] == [
+        T0 + n * STEP for n in range(1, 9)
+    ]
+    for kline in klines:  # Same shape, backfilled or streamed
+        assert kline == dict(
+            klines[-1],
+            Open_time=kline["Open_time"],
+            Close_time=kline["Open_time"] + STEP - 1,
+        )
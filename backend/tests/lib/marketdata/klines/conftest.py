@@ -0,0 +1,28 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def random_walk_klines(number_samples: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, number_samples)))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, number_samples)) * close
+    return pd.DataFrame(
+        {
+            "Open_time": 1577836800 + 3600 * np.arange(number_samples),
+            "Open": open_,
+            "High": np.maximum(open_, close) + spread,
+            "Low": np.minimum(open_, close) - spread,
+            "Close": close,
+            "Volume": rng.uniform(1, 10, number_samples),
+        }
+    )
+
+
+@pytest.fixture(name="klines")
+def fixture_klines() -> pd.DataFrame:
+    return random_walk_klines(number_samples=300)
@@ -0,0 +1,65 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.lib.marketdata.klines.base import DF  # Registers the accessors
+from src.lib.marketdata.klines.operators.classifiers import didi_v1
+
+
+def reference_scores(klines: DF, setup: didi_v1.Setup) -> np.ndarray:
+    """Row by row scoring, as the classifier did before vectorization"""
+
+    ma_inversion = didi_v1.MovingAverageInversionScore(
+        number_of_observation_periods=20
+    )
+    scores = [np.nan]
+    for index in range(1, len(klines)):
+        previous, current = klines.iloc[index - 1], klines.iloc[index]
+        if current.Didi_slow * previous.Didi_slow < 0:
+            ma_inversion.index_of_slow = index
+        if current.Didi_fast * previous.Didi_fast < 0:
+            ma_inversion.index_of_fast = index
+
+        slow, fast = current.Didi_slow, current.Didi_fast
+        trend = 1 if slow < 0 < fast else -1 if fast < 0 < slow else 0
+
+        upper_opened = current.BB_upper > previous.BB_upper
+        bottom_opened = current.BB_bottom < previous.BB_bottom
+        bollinger = (
+            1
+            if upper_opened and bottom_opened
+            else setup.weight_if_only_upper_bb_opened
+            if upper_opened and current.BB_bottom >= previous.BB_bottom
+            else setup.weight_if_only_bottom_bb_opened
+            if current.BB_upper <= previous.BB_upper and bottom_opened
+            else 0
+        )
+        scores.append(trend * bollinger * ma_inversion.calculate())
+    return np.array(scores)
+
+
+def test_score_matches_row_by_row_evaluation(klines: DF):
+    setup = didi_v1.Setup()
+    klines.classifier.didi.apply(setup)
+
+    np.testing.assert_allclose(
+        klines.Score.to_numpy(), reference_scores(klines, setup)
+    )
+    assert klines.Score.abs().max() <= 1.0
+
+
+def test_minimum_number_of_samples(klines: DF):
+    with pytest.raises(IndexError):
+        klines[:30].classifier.didi.apply()
+
+
+def test_inversion_indexes():
+    classifier = didi_v1.DidiClassifier(pd.DataFrame())
+    inversions = classifier._inversions(np.array([1.0, -1.0, -2.0, 3.0, 0.0]))
+
+    assert list(inversions) == [False, True, False, True, False]
+    assert list(classifier._index_of_last(inversions)) == [0, 1, 1, 3, 3]
@@ -0,0 +1,43 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import numpy as np
+from src.lib.marketdata.klines.base import DF  # Registers the accessors
+from src.lib.marketdata.klines.operators.indicators import (
+    bollinger_bands,
+    simple_moving_average as sma,
+)
+
+
+def test_indicators_values(klines: DF):
+    klines.indicator.simple_moving_average.apply(sma.Setup(number_samples=7))
+    klines.indicator.bollinger_bands.apply()
+
+    price = klines[["Open", "High", "Low", "Close"]].mean(axis=1)
+    mean = price.rolling(window=20).mean()
+    deviation = price.rolling(window=20).std()
+
+    np.testing.assert_allclose(klines.Price_ohlc4, price)
+    np.testing.assert_allclose(klines.SMA_7, price.rolling(window=7).mean())
+    np.testing.assert_allclose(klines.BB_upper, mean + 2 * deviation)
+    np.testing.assert_allclose(klines.BB_bottom, mean - 2 * deviation)
+
+
+def test_shared_computations_are_reused(klines: DF):
+    cache = klines.indicator.cache
+    klines.indicator.simple_moving_average.apply(sma.Setup(number_samples=20))
+    misses = cache.misses
+
+    klines.indicator.bollinger_bands.apply(bollinger_bands.Setup())
+    assert cache.misses == misses + 1  # Just the rolling std is new
+
+
+def test_cache_invalidation_on_ohlcv_change(klines: DF):
+    klines.indicator.simple_moving_average.apply(sma.Setup(number_samples=3))
+    klines.loc[10, "Close"] = 2 * klines.loc[10, "Close"]
+    klines.indicator.simple_moving_average.apply(sma.Setup(number_samples=3))
+
+    price = klines[["Open", "High", "Low", "Close"]].mean(axis=1)
+    np.testing.assert_allclose(klines.SMA_3, price.rolling(window=3).mean())
@@ -0,0 +1,55 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import numpy as np
+import pandas as pd
+from src.lib.marketdata.klines.base import DF  # Registers the accessors
+from src.lib.marketdata.klines.operators.classifiers import didi_v1
+from src.lib.marketdata.klines.operators.indicators import (
+    simple_moving_average as sma,
+)
+from src.lib.marketdata.klines.operators.indicators.rolling import (
+    RollingWindow,
+)
+
+
+def test_rolling_window_matches_pandas():
+    values = np.random.default_rng(1).normal(100, 5, 200)
+    window = RollingWindow(size=20)
+    means, stds = list(), list()
+    for value in values:
+        window.append(value)
+        means.append(window.mean())
+        stds.append(window.std())
+
+    rolling = pd.Series(values).rolling(window=20)
+    np.testing.assert_allclose(means, rolling.mean())
+    np.testing.assert_allclose(stds, rolling.std())
+
+
+def test_sma_stream(klines: DF):
+    stream = sma.SimpleMovingAverageStream(sma.Setup(number_samples=7))
+    results = [stream.update(kline)["SMA_7"] for _, kline in klines.iterrows()]
+
+    klines.indicator.simple_moving_average.apply(sma.Setup(number_samples=7))
+    np.testing.assert_allclose(results, klines.SMA_7)
+
+
+def test_classifier_stream_matches_batch(klines: DF):
+    stream = didi_v1.DidiClassifierStream()
+    stream.warm_up(klines[:200])
+    results = pd.DataFrame(
+        [stream.update(kline) for kline in klines[200:].to_dict("records")]
+    )
+
+    klines.classifier.didi.apply()
+    for column in ["Didi_fast", "BB_upper", "Didi_score", "Score"]:
+        np.testing.assert_allclose(results[column], klines[column][200:])
+
+
+def test_repeated_kline_is_ignored(klines: DF):
+    stream = didi_v1.DidiClassifierStream()
+    last_result = stream.warm_up(klines)
+    assert stream.update(klines.iloc[-1]) is last_result
@@ -0,0 +1,40 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import numpy as np
+import pytest
+from src.lib.marketdata.klines.base import DF  # Registers the accessors
+from src.lib.marketdata.klines.operators.classifiers.didi_v1_sweep import (
+    SweepGrid,
+)
+
+grid = SweepGrid(
+    didi_number_samples=[(3, 8, 20), (4, 10, 30)],
+    bollinger_number_samples=[14, 20],
+    bollinger_number_STDs=[1.5, 2.0],
+    weights_if_only_upper_bb_opened=[0.7, 0.5],
+)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_scores_match_apply_for_each_setup(klines: DF, processes: int):
+    result = klines.classifier.didi_sweep.run(
+        grid, processes=processes, dtype="float64"
+    )
+    assert result.scores.shape == (16, len(klines))
+
+    for setup, scores in zip(result.setups, result.scores):
+        classified = klines.copy()
+        classified.classifier.didi.apply(setup)
+        np.testing.assert_array_equal(scores, classified.Score.to_numpy())
+
+
+def test_best_setup(klines: DF):
+    result = klines.classifier.didi_sweep.run(grid)
+    setup, value = result.best()
+
+    assert result.scores.dtype == np.float32
+    assert setup in result.setups
+    assert value == max(np.nanmean(np.abs(row)) for row in result.scores)
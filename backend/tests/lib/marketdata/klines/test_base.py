@@ -51,3 +51,15 @@ class TestGetInputSanitizer:
 
     def test_a_valid_since_but_invalid_number_samples(self):
         assert True
+
+
+def test_monthly_samples_follow_the_calendar():
+    sanitizer = GetInputSanitizer(
+        time_frame="1M",
+        min_timestamp=1577836800,  # '2020-01-01 00:00:00'
+        max_timestamp=1609459200,  # '2021-01-01 00:00:00'
+    )
+    since, until = sanitizer.sanitize(since=1577836800, number_samples=3)
+
+    assert until == 1583020800  # '2020-03-01 00:00:00'
+    assert sanitizer.shift(until, -2) == since
@@ -0,0 +1,143 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+# pylint: disable=protected-access
+
+import asyncio
+
+import pytest
+from src.lib.marketdata.klines import from_broker
+from src.lib.marketdata.klines.from_broker import GetterFromBroker
+from src.utils.databases.time_series_storage.models import StorageKlines
+from src.utils.exceptions import BrokerError
+from src.utils.schemas.generics import Ticker
+from tests.fake_binance import FIRST_OPEN_TIME, TIME_FRAME_SECONDS
+
+
+@pytest.mark.parametrize("download_workers", [1, 4])
+def test_windows_are_reassembled_in_order(binance_mock, download_workers):
+    getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+    getter.settings.return_as_human_readable = False
+    getter.settings.download_workers = download_workers
+
+    until = FIRST_OPEN_TIME + 2000 * TIME_FRAME_SECONDS
+    klines = getter.get(since=FIRST_OPEN_TIME, until=until)
+
+    assert binance_mock.called
+    assert klines.Open_time.iloc[0] == FIRST_OPEN_TIME
+    assert klines.Open_time.iloc[-1] == until
+    assert klines.Open_time.diff().dropna().eq(TIME_FRAME_SECONDS).all()
+
+
+def test_the_oldest_open_time_is_requested_once(binance_mock):
+    for _ in range(3):
+        getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+        assert getter.oldest_open_time() == FIRST_OPEN_TIME
+
+    assert binance_mock.call_count == 1
+
+
+@pytest.mark.parametrize("download_workers", [1, 4])
+def test_iter_klines_yields_the_get_klines_by_page(
+    binance_mock, download_workers
+):
+    getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+    getter.settings.return_as_human_readable = False
+    getter.settings.download_workers = download_workers
+
+    until = FIRST_OPEN_TIME + 1200 * TIME_FRAME_SECONDS
+    pages = list(getter.iter_klines(since=FIRST_OPEN_TIME, until=until))
+    klines = getter.get(since=FIRST_OPEN_TIME, until=until)
+
+    assert [len(page) for page in pages] == [500, 500, 201]
+    assert sum(
+        (page.Open_time.tolist() for page in pages), list()
+    ) == klines.Open_time.tolist()
+
+
+def test_iter_windows_with_overlap(binance_mock):
+    getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+    getter.settings.return_as_human_readable = False
+
+    since = FIRST_OPEN_TIME + 10 * TIME_FRAME_SECONDS
+    until = since + 999 * TIME_FRAME_SECONDS
+    windows = list(
+        getter.iter_windows(300, overlap=10, since=since, until=until)
+    )
+
+    assert [len(window.new) for window in windows] == [300, 300, 300, 100]
+    assert all(window.overlap == 10 for window in windows)
+    assert windows[0].klines.Open_time.iloc[0] == FIRST_OPEN_TIME
+    assert windows[1].klines.Open_time.iloc[:10].tolist() == (
+        windows[0].klines.Open_time.iloc[-10:].tolist()
+    )
+    new_open_times = sum(
+        (window.new.Open_time.tolist() for window in windows), list()
+    )
+    assert new_open_times == list(
+        range(since, until + 1, TIME_FRAME_SECONDS)
+    )
+
+
+def test_async_get_matches_get(binance_mock):
+    getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+    getter.settings.return_as_human_readable = False
+    getter.settings.download_workers = 3
+    broker, requested = getter._broker, list()
+
+    async def async_get_klines(ticker_symbol, time_frame, since):
+        requested.append(since)
+        await asyncio.sleep(0)
+        return broker.get_klines(ticker_symbol, time_frame, since=since)
+
+    broker.async_get_klines = async_get_klines
+    until = FIRST_OPEN_TIME + 1200 * TIME_FRAME_SECONDS
+    klines = asyncio.run(getter.async_get(since=FIRST_OPEN_TIME, until=until))
+
+    assert len(requested) == 3
+    assert klines.equals(getter.get(since=FIRST_OPEN_TIME, until=until))
+
+
+def test_failed_round_by_round_writes_are_retried(binance_mock, monkeypatch):
+    written, failures = list(), [ValueError("Storage down")]
+
+    def write(_storage, klines):
+        if failures:
+            raise failures.pop()
+        written.append(klines)
+
+    monkeypatch.setattr(StorageKlines, "_write", write)
+    monkeypatch.setattr(from_broker.time, "sleep", lambda seconds: None)
+    getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+    getter.store_klines_round_by_round = True
+
+    until = FIRST_OPEN_TIME + 1200 * TIME_FRAME_SECONDS
+    getter.get(since=FIRST_OPEN_TIME, until=until)
+
+    assert sum(len(klines) for klines in written) == 3 * 500
+    assert getter.storage.writer._thread is None  # Stopped
+
+
+def test_failed_requests_raise_or_are_retried(binance_mock, monkeypatch):
+    getter = GetterFromBroker("binance", Ticker(symbol="BTCUSDT"), "1h")
+    broker, get_klines = getter._broker, getter._broker.get_klines
+    failures = [BrokerError("Broker down")]
+
+    def flaky_get_klines(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return get_klines(*args, **kwargs)
+
+    broker.get_klines = flaky_get_klines
+    monkeypatch.setattr(from_broker.time, "sleep", lambda seconds: None)
+
+    getter.settings.infinite_request_attempts = False
+    with pytest.raises(BrokerError):
+        getter._request_window(FIRST_OPEN_TIME)
+
+    failures.append(BrokerError("Broker down"))
+    getter.settings.infinite_request_attempts = True
+    klines = getter._request_window(FIRST_OPEN_TIME)
+    assert klines.Open_time.iloc[0] == FIRST_OPEN_TIME
+    assert not failures
@@ -0,0 +1,72 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.lib.marketdata.klines.resampling import bucket_open_times, resample
+
+FIRST_OPEN_TIME = 1577836800  # '2020-01-01 00:00:00', a wednesday
+RULES = {"15m": "15min", "4h": "4H", "3d": "3D", "1w": "W-MON", "1M": "MS"}
+
+
+@pytest.fixture(name="one_minute_klines")
+def fixture_one_minute_klines():
+    rng = np.random.default_rng(1)
+    number_samples = 70 * 1440  # ~70 days
+    close = 100 + np.cumsum(rng.normal(0, 0.1, number_samples))
+    spread = np.abs(rng.normal(0, 0.05, number_samples))
+    return pd.DataFrame(
+        {
+            "Open_time": FIRST_OPEN_TIME + 60 * np.arange(number_samples),
+            "Open": close - rng.normal(0, 0.05, number_samples),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.uniform(0, 10, number_samples),
+        }
+    )
+
+
+def test_week_and_month_alignment():
+    open_times = [FIRST_OPEN_TIME, FIRST_OPEN_TIME + 40 * 86400]
+    weeks = bucket_open_times(open_times, "1w")
+    months = bucket_open_times(open_times, "1M")
+
+    assert list(pd.to_datetime(weeks, unit="s").dayofweek) == [0, 0]
+    assert list(pd.to_datetime(months, unit="s").strftime("%Y-%m-%d")) == [
+        "2020-01-01",
+        "2020-02-01",
+    ]
+
+
+@pytest.mark.parametrize("time_frame", list(RULES))
+def test_resample_matches_pandas(one_minute_klines, time_frame):
+    resampled = resample(one_minute_klines, time_frame, drop_unclosed=False)
+
+    indexed = one_minute_klines.set_index(
+        pd.to_datetime(one_minute_klines.Open_time, unit="s")
+    )
+    expected = (
+        indexed.resample(
+            RULES[time_frame], label="left", closed="left", origin="epoch"
+        )
+        .agg(
+            dict(
+                Open="first", High="max", Low="min", Close="last", Volume="sum"
+            )
+        )
+        .dropna()
+    )
+    assert list(resampled.Open_time) == list(
+        expected.index.view("int64") // 10 ** 9
+    )
+    np.testing.assert_allclose(
+        resampled[["Open", "High", "Low", "Close", "Volume"]].to_numpy(),
+        expected.to_numpy(),
+    )
+
+
+def test_the_unclosed_kline_is_dropped(one_minute_klines):
+    resampled = resample(one_minute_klines, "1M")
+    assert len(resampled) == 2  # January and february; march is open
@@ -0,0 +1,77 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+
+import numpy as np
+import pandas as pd
+from src.lib.marketdata.klines.storage import (
+    ScrapingFromBrokerToStorage,
+    missing_runs,
+)
+from src.utils.schemas.generics import Ticker
+from src.utils.tools.time_handlers import time_frame_to_seconds
+from tests.fake_binance import FIRST_OPEN_TIME, TIME_FRAME_SECONDS
+
+UNTIL = FIRST_OPEN_TIME + 10 * 86400 - TIME_FRAME_SECONDS  # 10 days
+HOLE = (FIRST_OPEN_TIME + 50 * 3600, FIRST_OPEN_TIME + 54 * 3600)
+
+
+class FakeStorage:
+    table = "binance_btcusdt"
+
+    def __init__(self, open_times):
+        self.open_times = set(open_times)
+        self.queries = list()
+
+    def count_by_time_range(self, since, until, bucket):
+        self.queries.append(bucket)
+        step = time_frame_to_seconds(bucket)
+        buckets = pd.Series(
+            [t // step * step for t in self.open_times if since <= t <= until]
+        )
+        counts = buckets.value_counts().sort_index()
+        return pd.DataFrame(
+            dict(Open_time=counts.index.astype("int64"), Count=counts.values)
+        )
+
+    def append_in_background(self, klines):
+        self.open_times.update(klines.Open_time.tolist())
+
+    def close(self):
+        pass
+
+
+def scraper_with_hole():
+    scraper = ScrapingFromBrokerToStorage(
+        "binance", Ticker(symbol="BTCUSDT"), "1h"
+    )
+    stored = set(range(FIRST_OPEN_TIME, UNTIL + 1, TIME_FRAME_SECONDS))
+    stored -= set(range(HOLE[0], HOLE[1] + 1, TIME_FRAME_SECONDS))
+    scraper.klines_getter.storage = FakeStorage(stored)
+    scraper.klines_getter.settings.return_as_human_readable = False
+    return scraper
+
+
+def test_missing_runs():
+    open_times = np.arange(0, 100, 10)
+    present = np.isin(open_times, [0, 10, 40, 50, 60, 90])
+    assert missing_runs(open_times, present, 10) == [(20, 30), (70, 80)]
+
+
+def test_coverage_finds_the_holes(binance_mock):
+    scraper = scraper_with_hole()
+    coverage = scraper.coverage(since=FIRST_OPEN_TIME, until=UNTIL)
+
+    assert coverage.gaps == [HOLE]
+    assert (coverage.expected, coverage.stored) == (240, 235)
+    # Only the incomplete day is listed kline by kline
+    assert scraper.klines_getter.storage.queries == ["1d", "1h"]
+
+
+def test_sync_downloads_only_the_gaps(binance_mock):
+    scraper = scraper_with_hole()
+    requests_before = binance_mock.call_count
+    scraper.sync(since=FIRST_OPEN_TIME, until=UNTIL)
+
+    assert binance_mock.call_count == requests_before + 1
+    assert not scraper.coverage(since=FIRST_OPEN_TIME, until=UNTIL).gaps
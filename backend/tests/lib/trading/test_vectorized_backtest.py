@@ -0,0 +1,95 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.preferences import Trading
+from src.lib.brokers_wrappers import BrokerFabric
+from src.lib.trading.vectorized_backtest import (
+    backtest,
+    event_driven_backtest,
+    summarize,
+    target_positions,
+)
+from src.utils.schemas.generics import Ticker
+
+TICKER = Ticker(symbol="BTCUSDT", base="BTC", quote="USDT")
+
+
+def scored_klines(number_samples: int, seed: int = 0) -> pd.DataFrame:
+    generator = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(generator.normal(0, 0.01, number_samples)))
+    score = generator.uniform(-1, 1, number_samples)
+    score[:20] = np.nan  # Warming up classifier
+
+    return pd.DataFrame(
+        dict(
+            Open_time=1609459200 + 60 * np.arange(number_samples),
+            Open=close * 0.999,
+            High=close * 1.002,
+            Low=close * 0.997,
+            Close=close,
+            Volume=1.0,
+            Score=score,
+        )
+    )
+
+
+def test_target_positions_hold_between_thresholds():
+    trading = Trading(allow_naked_sells=True, leverage=2.0)
+    score = np.array([np.nan, 0.5, 0.0, np.nan, -0.5, 0.1])
+
+    positions = target_positions(score, trading)
+    assert positions.tolist() == [0.0, 2.0, 2.0, 2.0, -2.0, -2.0]
+
+    spot = target_positions(score, Trading())
+    assert spot.tolist() == [0.0, 1.0, 1.0, 1.0, 0.0, 0.0]
+
+
+def test_short_with_leverage():
+    klines = pd.DataFrame(
+        dict(
+            Open_time=[0, 60, 120],
+            Close=[100.0, 110.0, 99.0],
+            Score=[-1.0, np.nan, 1.0],
+        )
+    )
+    trading = Trading(allow_naked_sells=True, leverage=2.0)
+
+    result = backtest(klines, trading, fee_rate=0.0, price_metrics="c")
+    assert result.Equity.tolist() == pytest.approx([1000.0, 800.0, 1020.0])
+    assert result.Trade.tolist() == [True, False, True]
+
+
+def test_matches_the_event_driven_path():
+    klines = scored_klines(2000)
+    broker = BrokerFabric("binance").backtesting(assets=[TICKER])
+    broker.load_klines(TICKER, klines)
+    fee_rate = broker.settings.fee_rate_decimal
+
+    vectorized = backtest(klines, fee_rate=fee_rate)
+    event_driven = event_driven_backtest(broker, "BTCUSDT", klines)
+
+    assert vectorized.Open_time.tolist() == event_driven.Open_time.tolist()
+    np.testing.assert_allclose(
+        vectorized.Equity, event_driven.Equity, rtol=1e-9
+    )
+
+    summary = summarize(vectorized)
+    assert summary.number_of_trades == len(broker.orders)
+    assert summary.fees == pytest.approx(
+        sum(order.fee for order in broker.orders), rel=1e-9
+    )
+
+
+def test_the_event_driven_path_rejects_margin_settings():
+    klines = scored_klines(100)
+    broker = BrokerFabric("binance").backtesting(assets=[TICKER])
+    broker.load_klines(TICKER, klines)
+
+    with pytest.raises(ValueError):
+        event_driven_backtest(
+            broker, "BTCUSDT", klines, Trading(allow_naked_sells=True)
+        )
@@ -0,0 +1,113 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lib.marketdata.klines.operators.classifiers.didi_v1 import Setup
+from src.lib.trading.vectorized_backtest import backtest
+from src.services.backtesting.runner import (
+    BacktestMatrix,
+    BacktestRunner,
+)
+from src.utils.databases.time_series_storage.shared_klines import (
+    SharedKlinesStore,
+)
+from src.utils.schemas.generics import Ticker
+
+FIRST_OPEN_TIME = 1577836800  # 2020-01-01 00:00:00
+TIME_FRAME_SECONDS = 6 * 3600
+PERIODS = [
+    (
+        FIRST_OPEN_TIME + 100 * TIME_FRAME_SECONDS,
+        FIRST_OPEN_TIME + 400 * TIME_FRAME_SECONDS,
+    ),
+    (
+        FIRST_OPEN_TIME + 300 * TIME_FRAME_SECONDS,
+        FIRST_OPEN_TIME + 999 * TIME_FRAME_SECONDS,
+    ),
+]
+
+
+def fake_klines(seed: int, since: int, until: int) -> pd.DataFrame:
+    generator = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(generator.normal(0, 0.02, 1000)))
+    klines = pd.DataFrame(
+        dict(
+            Open_time=FIRST_OPEN_TIME + TIME_FRAME_SECONDS * np.arange(1000),
+            Open=np.r_[100.0, close[:-1]],
+            High=close * 1.01,
+            Low=close * 0.99,
+            Close=close,
+            Volume=1.0,
+        )
+    )
+    return klines[klines.Open_time.between(since, until)]
+
+
+class FakeStorage:
+    def __init__(self, table, tables):
+        self.table = table
+        self.tables = tables
+
+    def append_in_background(self, result):
+        self.tables[self.table] = result
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(name="tables")
+def fixture_tables():
+    return dict()
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path, tables):
+    seeds = dict(BTCUSDT=0, ETHUSDT=1)
+    monkeypatch.setattr(
+        BacktestRunner,
+        "load_klines",
+        lambda self, ticker, time_frame, since, until: fake_klines(
+            seeds[ticker.symbol], since, until
+        ),
+    )
+    matrix = BacktestMatrix(
+        tickers=[Ticker(symbol=symbol) for symbol in seeds],
+        setups=[Setup(), Setup(weight_if_only_upper_bb_opened=0.2)],
+        periods=PERIODS,
+    )
+    _runner = BacktestRunner(
+        "binance",
+        matrix,
+        storage_factory=lambda table: FakeStorage(table, tables),
+    )
+    _runner.settings.workers = 2
+    _runner.store = SharedKlinesStore(str(tmp_path))
+    return _runner
+
+
+def test_runs_every_combination_and_streams_the_results(runner, tables):
+    summaries = runner.run()
+
+    assert len(summaries) == 8
+    assert len(tables) == 8
+    assert not runner.store.references()  # Released
+
+    task = next(
+        task
+        for task, _ in summaries
+        if task.ticker.symbol == "ETHUSDT"
+        and task.setup_index == 1
+        and task.period_index == 0
+    )
+    since, until = PERIODS[0]
+    klines = fake_klines(1, 0, until).reset_index(drop=True)
+    klines.classifier.didi.apply(task.setup)
+    expected = backtest(klines[klines.Open_time >= since])
+
+    result = tables[task.table]
+    assert result.Open_time.tolist() == expected.Open_time.tolist()
+    np.testing.assert_allclose(result.Equity, expected.Equity)
@@ -0,0 +1,83 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=protected-access
+
+from urllib.parse import parse_qs, urlparse
+
+from src.services.ingestion.scheduler import IngestionJob, IngestionScheduler
+from src.utils.schemas.generics import Ticker
+from tests.fake_binance import FIRST_OPEN_TIME, TIME_FRAME_SECONDS
+
+UNTIL = FIRST_OPEN_TIME + 999 * TIME_FRAME_SECONDS  # Two windows of 500
+
+
+class FakeStorage:
+    def __init__(self):
+        self.open_times = list()
+
+    def append(self, klines):
+        self.open_times += klines.Open_time.tolist()
+
+
+def scheduler(session_factory) -> IngestionScheduler:
+    jobs = [
+        IngestionJob(
+            ticker=Ticker(symbol=symbol),
+            time_frame="1h",
+            since=FIRST_OPEN_TIME,
+            until=UNTIL,
+            priority=priority,
+        )
+        for symbol, priority in (("BTCUSDT", 0), ("ETHUSDT", 1))
+    ]
+    _scheduler = IngestionScheduler("binance", jobs, session_factory)
+    _scheduler.settings.workers = 1
+    for index in range(len(jobs)):
+        _scheduler._getter(index).storage = FakeStorage()
+    return _scheduler
+
+
+def requested_windows(binance_mock) -> list:
+    windows = list()
+    for request in binance_mock.request_history:
+        query = parse_qs(urlparse(request.url).query)
+        since = int(query.get("startTime", [0])[0]) // 1000
+        if since > 1:  # Not the oldest kline request (since=1)
+            windows.append((query["symbol"][0], since))
+    return windows
+
+
+def test_windows_by_priority_then_newest_first(
+    binance_mock, memory_relational_database
+):
+    _scheduler = scheduler(memory_relational_database)
+    windows = [window.since for window in _scheduler.plan()[:3]]
+    stored = _scheduler.run()
+
+    assert windows == sorted(windows, reverse=True)
+    assert windows[-1] <= FIRST_OPEN_TIME
+    assert requested_windows(binance_mock) == [
+        ("ETHUSDT", window) for window in windows
+    ] + [("BTCUSDT", window) for window in windows]
+    assert stored == {"BTCUSDT_1h": 1000, "ETHUSDT_1h": 1000}
+    open_times = _scheduler._getter(0).storage.open_times
+    assert (min(open_times), max(open_times)) == (FIRST_OPEN_TIME, UNTIL)
+
+
+def test_a_restart_resumes_from_the_checkpoints(
+    binance_mock, memory_relational_database
+):
+    first_run = scheduler(memory_relational_database)
+    planned = first_run.plan()
+    first_run._ingest(planned[1])
+
+    restarted = scheduler(memory_relational_database)
+    assert len(restarted.plan()) == len(planned) - 1
+    restarted.run()
+
+    # Only the windows reaching beyond the time range are redone
+    assert not any(
+        window.complete
+        for window in scheduler(memory_relational_database).plan()
+    )
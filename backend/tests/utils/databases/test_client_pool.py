@@ -0,0 +1,67 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import threading
+import time
+
+from src.utils.databases.time_series_storage.engines.influxdb.base import (
+    ClientPool,
+)
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_clients_are_reused():
+    pool = ClientPool(factory=FakeClient, size=2)
+    with pool.client() as first:
+        pass
+    with pool.client() as second:
+        assert second is first
+
+
+def test_pool_size_is_respected_by_concurrent_threads():
+    created = list()
+    pool = ClientPool(
+        factory=lambda: created.append(1) or FakeClient(), size=2
+    )
+
+    def use_client():
+        with pool.client():
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=use_client) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 2
+
+
+def test_close():
+    pool = ClientPool(factory=FakeClient, size=1)
+    with pool.client() as client:
+        pass
+    pool.close()
+    assert client.closed
+    with pool.client() as new_client:
+        assert new_client is not client
+
+
+def test_clients_lent_while_closing_are_not_reused():
+    pool = ClientPool(factory=FakeClient, size=1)
+    with pool.client() as lent:
+        pool.close()
+        assert not lent.closed  # Still in use
+    assert lent.closed
+
+    with pool.client() as new_client:
+        assert new_client is not lent
+        assert not new_client.closed
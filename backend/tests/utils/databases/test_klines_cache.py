@@ -0,0 +1,96 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.databases.time_series_storage.klines_cache import (
+    KlinesCache,
+    invalidate_table,
+    missing_intervals,
+)
+
+STEP = 3600  # 1h
+SINCE = 1577836800  # '2020-01-01 00:00:00'
+NEWEST = SINCE + 24 * 90 * STEP  # End of march
+
+
+class FakeStorage:
+    def __init__(self):
+        self.queries = list()
+
+    def fetch(self, since: int, until: int) -> pd.core.frame.DataFrame:
+        self.queries.append((since, until))
+        open_times = np.arange(since, min(until, NEWEST) + 1, STEP)
+        prices = open_times / 1e6
+        return pd.DataFrame(
+            dict(
+                Open_time=open_times,
+                Open=prices,
+                High=prices + 1,
+                Low=prices - 1,
+                Close=prices,
+                Volume=np.ones(len(open_times)),
+            )
+        )
+
+    @staticmethod
+    def sealed_until() -> int:
+        return NEWEST - STEP
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return KlinesCache(str(tmp_path), "binance_btcusdt", "1h")
+
+
+def test_missing_intervals():
+    covered = [[10, 20], [40, 50]]
+    assert missing_intervals(0, 60, covered, step=5) == [
+        (0, 5),
+        (25, 35),
+        (55, 60),
+    ]
+    assert not missing_intervals(10, 20, covered, step=5)
+
+
+def test_only_the_missing_ranges_are_fetched(cache):
+    storage = FakeStorage()
+    first_until = SINCE + 24 * 40 * STEP  # Over two month partitions
+    first = cache.get(SINCE, first_until, storage.fetch, storage.sealed_until)
+    assert storage.queries == [(SINCE, first_until)]
+
+    wider = cache.get(
+        SINCE + 100, NEWEST - 10 * STEP, storage.fetch, storage.sealed_until
+    )
+    assert storage.queries[1] == (first_until + STEP, NEWEST - 10 * STEP)
+    assert wider.Open_time.iloc[0] == SINCE + STEP  # Rounded up to the grid
+
+    again = cache.get(SINCE, first_until, storage.fetch, storage.sealed_until)
+    assert len(storage.queries) == 2
+    pd.testing.assert_frame_equal(again, first)
+    pd.testing.assert_frame_equal(
+        again, storage.fetch(SINCE, first_until)[again.columns]
+    )
+
+
+def test_the_unsealed_klines_are_not_cached(cache):
+    storage = FakeStorage()
+    klines = cache.get(SINCE, NEWEST, storage.fetch, storage.sealed_until)
+    assert klines.Open_time.iloc[-1] == NEWEST
+
+    cache.get(SINCE, NEWEST, storage.fetch, storage.sealed_until)
+    assert storage.queries[-1] == (NEWEST, NEWEST)
+
+
+def test_invalidated_ranges_are_fetched_again(cache, tmp_path):
+    storage = FakeStorage()
+    until = SINCE + 24 * 10 * STEP
+    cache.get(SINCE, until, storage.fetch, storage.sealed_until)
+
+    invalidate_table(
+        str(tmp_path), "binance_btcusdt", SINCE + 30, SINCE + 2 * STEP
+    )
+    klines = cache.get(SINCE, until, storage.fetch, storage.sealed_until)
+    assert storage.queries[-1] == (SINCE, SINCE + 2 * STEP)
+    assert len(klines) == 24 * 10 + 1
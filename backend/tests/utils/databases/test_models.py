@@ -0,0 +1,47 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.config.databases import KlinesCacheSettings
+from src.utils.databases.time_series_storage.models import StorageKlines
+
+STEP = 3600  # 1h
+SINCE = 1577836800  # '2020-01-01 00:00:00'
+
+
+def test_iter_windows_queries_page_by_page(monkeypatch):
+    queries = list()
+
+    def query_time_range(_self, since, until):
+        queries.append((since, until))
+        open_times = np.arange(since, until + 1, STEP)
+        return pd.DataFrame(
+            dict(Open_time=open_times, Close=open_times / 1e6)
+        )
+
+    monkeypatch.setattr(StorageKlines, "_query_time_range", query_time_range)
+    storage = StorageKlines("binance_btcusdt", "1h")
+    storage.cache = None
+
+    until = SINCE + 4999 * STEP
+    windows = list(
+        storage.iter_windows(SINCE, until, 1000, overlap=24, page_samples=1000)
+    )
+
+    assert len(windows) == 5
+    assert windows[0].overlap == 24
+    assert windows[0].klines.Open_time.iloc[0] == SINCE - 24 * STEP
+    assert windows[-1].klines.Open_time.iloc[-1] == until
+    assert len(queries) == 6  # Pages of 1000 klines (plus the warm up)
+
+
+def test_the_klines_cache_is_opt_in():
+    settings = KlinesCacheSettings()
+
+    assert os.path.isabs(settings.directory)
+    if not settings.enabled:  # Unless KLINES_CACHE_ENABLED is set
+        assert StorageKlines("binance_btcusdt", "1h").cache is None
@@ -0,0 +1,126 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=redefined-outer-name
+
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.lib.marketdata.klines.base  # noqa: F401 # Registers the accessors
+from src.utils.databases.time_series_storage.shared_klines import (
+    SharedKlinesStore,
+)
+
+
+def klines(since: int = 1609459200, until: int = 1609465140) -> pd.DataFrame:
+    """The 1m klines of [since, until]"""
+
+    open_time = np.arange(since, until + 1, 60)
+    close = np.linspace(100.0, 200.0, len(open_time))
+    return pd.DataFrame(
+        dict(
+            Open_time=open_time,
+            Open=close,
+            High=close + 1,
+            Low=close - 1,
+            Close=close,
+            Volume=1.0,
+        )
+    )
+
+
+@pytest.fixture
+def store(tmp_path) -> SharedKlinesStore:
+    return SharedKlinesStore(str(tmp_path))
+
+
+def test_series_is_loaded_once_and_shared(store):
+    loads = list()
+
+    def load(since, until):
+        loads.append((since, until))
+        return klines()
+
+    first = store.open("binance", "BTCUSDT", "1m", load=load)
+    second = store.open("binance", "BTCUSDT", "1m", load=load)
+
+    assert len(loads) == 1
+    assert store.references() == dict(binance_btcusdt_1m=2)
+    assert second.array("Close").tolist() == klines().Close.tolist()
+
+    frame = first.frame()
+    assert np.shares_memory(frame.Close.to_numpy(), first.data)
+    with pytest.raises(ValueError):
+        first.array("Close")[0] = 0.0  # Read-only
+    frame.indicator.price.series("c")  # The accessors work on it
+
+    first.release()
+    first.release()  # Idempotent
+    assert store.references() == dict(binance_btcusdt_1m=1)
+    with second:
+        pass
+    assert not store.references()
+    assert sorted(os.listdir(store.directory)) == [
+        "registry.json",
+        "registry.lock",
+    ]
+
+
+def test_attach_only(store):
+    with pytest.raises(KeyError):
+        store.open("binance", "ETHUSDT", "1m")
+
+
+def test_series_is_reloaded_if_not_covering_the_range(store):
+    since = 1609459200
+    loads = list()
+
+    def load(_since, _until):
+        loads.append((_since, _until))
+        return klines(_since, _until)
+
+    first = store.open(
+        "binance", "BTCUSDT", "1m", since=since, until=since + 540, load=load
+    )
+    assert len(first) == 10
+    covered = store.open(
+        "binance", "BTCUSDT", "1m", since=since + 60, until=since + 540
+    )
+    assert len(covered) == 10
+
+    with pytest.raises(KeyError):  # Not covered, and nothing to load it
+        store.open("binance", "BTCUSDT", "1m", until=since + 59940)
+    extended = store.open(
+        "binance", "BTCUSDT", "1m", until=since + 59940, load=load
+    )
+    assert loads == [(since, since + 540), (since, since + 59940)]
+    assert len(extended) == 1000
+    assert len(first) == 10  # The handles given keep their series
+    expected = klines(since, since + 540).Close.tolist()
+    assert first.array("Close").tolist() == expected
+
+    for handle in (first, covered, extended):
+        handle.release()
+    assert not store.references()
+    assert sorted(os.listdir(store.directory)) == [
+        "registry.json",
+        "registry.lock",
+    ]
+
+
+def _open_and_exit(directory):
+    store = SharedKlinesStore(directory)
+    store.open("binance", "BTCUSDT", "1m", load=lambda *_: klines())
+
+
+def test_handles_of_dead_processes_are_pruned(store):
+    process = multiprocessing.get_context("fork").Process(
+        target=_open_and_exit, args=(store.directory,)
+    )
+    process.start()
+    process.join()
+
+    assert not store.references()
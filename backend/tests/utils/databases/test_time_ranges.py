@@ -0,0 +1,59 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+from src.utils.databases.time_series_storage.time_ranges import time_ranges
+
+KEY = ("storage", "binance_btcusdt", "1h")
+
+
+def test_the_open_time_is_computed_once():
+    calls = list()
+
+    def compute():
+        calls.append(1)
+        return 1577836800
+
+    for _ in range(3):
+        assert time_ranges.open_time(KEY, "oldest_open_time", compute) == (
+            1577836800
+        )
+    assert len(calls) == 1
+
+
+def test_extend_widens_the_cached_ranges():
+    time_ranges.open_time(KEY, "oldest_open_time", lambda: 7200)
+    time_ranges.open_time(KEY, "newest_open_time", lambda: 36000)
+
+    time_ranges.extend("storage", "binance_btcusdt", since=3000, until=50000)
+
+    def not_cached():
+        raise AssertionError("Should be cached")
+
+    oldest = time_ranges.open_time(KEY, "oldest_open_time", not_cached)
+    newest = time_ranges.open_time(KEY, "newest_open_time", not_cached)
+    assert (oldest, newest) == (3600, 46800)  # On the 1h grid
+
+
+def test_extend_aligns_weeks_and_months():
+    keys = [("storage", "binance_ethusdt", tf) for tf in ("1w", "1M")]
+    for key in keys:
+        time_ranges.open_time(key, "oldest_open_time", lambda: 1580515200)
+        time_ranges.open_time(key, "newest_open_time", lambda: 1580515200)
+
+    # '2020-01-15 00:00:00' (a wednesday), '2020-03-15 00:00:00'
+    time_ranges.extend(
+        "storage", "binance_ethusdt", since=1579046400, until=1584230400
+    )
+
+    def not_cached():
+        raise AssertionError("Should be cached")
+
+    week, month = (
+        (
+            time_ranges.open_time(key, "oldest_open_time", not_cached),
+            time_ranges.open_time(key, "newest_open_time", not_cached),
+        )
+        for key in keys
+    )
+    assert week == (1579478400, 1583712000)  # Mondays
+    assert month == (1580515200, 1583020800)  # '2020-02-01', '2020-03-01'
@@ -0,0 +1,116 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.databases.time_series_storage import writer as writer_module
+from src.utils.databases.time_series_storage.models import StorageKlines
+from src.utils.databases.time_series_storage.writer import (
+    BackgroundWriteError,
+    BackgroundWriter,
+)
+from src.utils.exceptions import StorageError
+
+
+@pytest.fixture(autouse=True)
+def no_cooldown(monkeypatch):
+    monkeypatch.setattr(writer_module.time, "sleep", lambda seconds: None)
+
+
+def dataframe(n_rows: int) -> pd.core.frame.DataFrame:
+    return pd.DataFrame({"Close": np.arange(n_rows, dtype="float64")})
+
+
+def test_writes_in_batches_and_retries_transient_errors():
+    written, failures = list(), [ConnectionError(), ConnectionError()]
+
+    def write(batch):
+        if failures:
+            raise failures.pop()
+        written.append(batch.Close.tolist())
+
+    writer = BackgroundWriter(write, batch_size=4)
+    writer.put(dataframe(10))
+    writer.flush()
+
+    assert written == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    metrics = writer.metrics.as_dict()
+    assert (metrics["points"], metrics["batches"]) == (10, 3)
+    assert (metrics["retries"], metrics["failures"]) == (2, 0)
+
+
+def test_flush_raises_the_background_error():
+    def write(batch):
+        raise ValueError("Not transient")
+
+    writer = BackgroundWriter(write)
+    writer.put(dataframe(3))
+    with pytest.raises(StorageError):
+        writer.flush()
+    assert writer.metrics.failures == 1
+    writer.flush()  # The error is reported once
+
+
+def test_the_rows_not_written_are_reported():
+    def write(batch):
+        if batch.Close.iloc[0] >= 4:
+            raise ValueError("Not transient")
+
+    writer = BackgroundWriter(write, batch_size=4)
+    writer.put(dataframe(10))
+    with pytest.raises(BackgroundWriteError) as error:
+        writer.flush()
+    assert [rows.Close.tolist() for rows in error.value.dataframes] == [
+        [4, 5, 6, 7, 8, 9]
+    ]
+
+
+def test_close_stops_the_thread():
+    written = list()
+    writer = BackgroundWriter(written.append)
+    writer.put(dataframe(3))
+    thread = writer._thread  # pylint: disable=protected-access
+    writer.close()
+
+    assert len(written) == 1
+    assert not thread.is_alive()
+    writer.put(dataframe(3))  # Started again
+    writer.close()
+    assert len(written) == 2
+
+
+def test_put_blocks_while_the_queue_is_full():
+    release = threading.Event()
+    writer = BackgroundWriter(lambda batch: release.wait(), max_pending=1)
+    writer.put(dataframe(1))  # Taken by the thread, which waits
+    writer.put(dataframe(1))  # Fills the queue
+
+    producer = threading.Thread(target=writer.put, args=(dataframe(1),))
+    producer.start()
+    producer.join(timeout=0.2)
+    assert producer.is_alive()
+
+    release.set()
+    producer.join(timeout=5)
+    writer.flush()
+    assert writer.metrics.batches == 3
+
+
+def test_storage_points_do_not_change_the_klines():
+    klines = pd.DataFrame(
+        {
+            "Open_time": ["2020-01-01 00:00:00", "2020-01-01 00:01:00"],
+            "Close": [1.0, 2.0],
+        }
+    )
+    points = StorageKlines(table="test", time_frame="1m")._points(klines)
+
+    assert list(points.index.view("int64") // 10 ** 9) == [
+        1577836800,
+        1577836860,
+    ]
+    assert list(points.columns) == ["Close"]
+    assert klines.Open_time.dtype == object
@@ -0,0 +1,50 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+
+import asyncio
+
+import pytest
+from src.utils.tools.coalescing import RequestCoalescer
+
+
+def test_a_cancelled_requester_does_not_cancel_the_others():
+    coalescer = RequestCoalescer()
+    executions = list()
+
+    async def query():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return "klines"
+
+    async def requests():
+        first = asyncio.ensure_future(coalescer.run("key", query))
+        second = asyncio.ensure_future(coalescer.run("key", query))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, coalescer.in_flight()
+
+    assert asyncio.run(requests()) == ("klines", 0)
+    assert len(executions) == 1
+
+
+def test_the_exception_is_shared():
+    coalescer = RequestCoalescer()
+    executions = list()
+
+    async def query():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        raise KeyError("missing")
+
+    async def requests():
+        return await asyncio.gather(
+            coalescer.run("key", query),
+            coalescer.run("key", query),
+            return_exceptions=True,
+        )
+
+    errors = asyncio.run(requests())
+    assert len(executions) == 1
+    assert all(isinstance(error, KeyError) for error in errors)
+    with pytest.raises(KeyError):
+        asyncio.run(coalescer.run("key", query))
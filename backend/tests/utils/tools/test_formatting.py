@@ -0,0 +1,141 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lib.brokers_wrappers.binance import Settings
+from src.utils.tools.formatting import (
+    FormatKlines,
+    KlinesBuilder,
+    KlinesSchema,
+    memory_usage,
+    overlapping_windows,
+)
+
+settings = Settings()
+
+
+def raw_kline(open_time_ms: int, value: str = "1.5") -> list:
+    return [
+        open_time_ms,
+        value,
+        value,
+        value,
+        value,
+        "10.0",
+        open_time_ms + 59999,
+        "15.0",
+        3,
+        "5.0",
+        "7.5",
+        "0",
+    ]
+
+
+def test_timestamps_to_seconds_with_open_time_truncated():
+    klines = FormatKlines(
+        [raw_kline(1593609165616)], settings
+    ).to_dataframe()
+
+    assert klines.Open_time.item() == 1593609120  # seconds reset to zero
+    assert klines.Close_time.item() == 1593609225
+    assert list(klines.columns) == settings.kline_information
+
+
+def test_fields_with_equal_values_are_formatted_by_position():
+    klines = FormatKlines(
+        [raw_kline(1593609120000, value="1593609120000")], settings
+    ).to_dataframe()
+
+    assert klines.Open.item() == 1593609120000.0
+    assert klines.Close.item() == 1593609120000.0
+    assert klines.Open_time.item() == 1593609120
+    assert klines.Open.dtype == np.float64  # Too precise for float32
+
+
+def test_empty_response():
+    klines = FormatKlines([], settings).to_dataframe()
+
+    assert klines.empty
+    assert list(klines.columns) == settings.kline_information
+
+
+def test_compact_dtypes():
+    klines = FormatKlines(
+        [raw_kline(1593609120000 + 60000 * i) for i in range(3)], settings
+    ).to_dataframe(columns=["Open_time", "Close", "Number_of_trades"])
+
+    assert list(klines.columns) == ["Open_time", "Close", "Number_of_trades"]
+    assert klines.Open_time.dtype == np.int32
+    assert klines.Close.dtype == np.float32
+    assert klines.Number_of_trades.dtype == np.int32
+
+
+def test_compact_schema_halves_the_footprint():
+    number_samples = 10000
+    klines = pd.DataFrame(
+        dict(
+            Open_time=1593609120 + 60 * np.arange(number_samples),
+            Close=np.round(np.linspace(9000, 9500, number_samples), 2),
+            Volume=np.round(np.linspace(1, 50, number_samples), 3),
+            Ticker=["BTCUSDT"] * number_samples,
+        )
+    )
+    before = memory_usage(klines)
+    after = memory_usage(KlinesSchema().apply(klines.copy()))
+
+    assert after.total < before.total / 2
+    assert klines.Close.tolist() == [
+        float("{:.2f}".format(close))
+        for close in KlinesSchema().apply(klines.copy()).Close.tolist()
+    ]
+    assert KlinesSchema(enabled=False).apply(klines.copy()).equals(klines)
+
+
+def test_klines_builder_concatenates_the_pages_once():
+    builder = KlinesBuilder()
+    for first in range(0, 30, 10):
+        builder.add(
+            pd.DataFrame(
+                dict(
+                    Open_time=np.arange(first, first + 10),
+                    Close=np.arange(first, first + 10, dtype="float32"),
+                )
+            )
+        )
+    builder.add(pd.DataFrame(columns=["Open_time", "Close"]))
+
+    klines = builder.build()
+    assert len(builder) == len(klines) == 30
+    assert klines.Open_time.tolist() == list(range(30))
+    assert klines.Close.dtype == np.float32
+    assert list(KlinesBuilder().build().columns) == list()
+
+
+def test_overlapping_windows():
+    pages = [
+        pd.DataFrame(dict(Open_time=np.arange(first, min(first + 7, 30))))
+        for first in range(0, 30, 7)
+    ]
+    windows = list(overlapping_windows(pages, 10, overlap=3, since=5))
+
+    assert [window.overlap for window in windows] == [3, 3, 3]
+    assert [window.klines.Open_time.tolist() for window in windows] == [
+        list(range(2, 15)),
+        list(range(12, 25)),
+        list(range(22, 30)),
+    ]
+    assert windows[1].new.Open_time.tolist() == list(range(15, 25))
+
+
+def test_overlapping_windows_arguments():
+    pages = [pd.DataFrame(dict(Open_time=np.arange(10)))]
+
+    with pytest.raises(ValueError):
+        overlapping_windows(pages, 0)
+    with pytest.raises(ValueError):
+        overlapping_windows(pages, 10, overlap=-1)
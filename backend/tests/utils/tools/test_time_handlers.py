@@ -0,0 +1,86 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-few-public-methods
+
+import pandas as pd
+import pytest
+from src.utils.exceptions import TimeFormatError
+from src.utils.tools import time_handlers
+from src.utils.tools.time_handlers import (
+    ParseDateTime,
+    int_timestamp,
+    strptime_format,
+    time_frame_to_seconds,
+)
+
+
+class TestDataFrameDateTimeconversion:
+    timestamps = [1587999600, 1593472500, 1593475199]
+
+    def test_same_output_as_parse_date_time(self):
+        frame = pd.DataFrame({"Open_time": self.timestamps})
+        frame.parse_datetime.to_human_readable(columns=["Open_time"])
+
+        assert list(frame.Open_time) == [
+            ParseDateTime(timestamp).to_human_readable()
+            for timestamp in self.timestamps
+        ]
+
+    def test_round_trip(self):
+        frame = pd.DataFrame({"Open_time": self.timestamps})
+        frame.parse_datetime.to_human_readable(columns=["Open_time"])
+        frame.parse_datetime.to_timestamp(columns=["Open_time"])
+
+        assert list(frame.Open_time) == self.timestamps
+
+    def test_round_trip_with_other_format(self, monkeypatch):
+        monkeypatch.setattr(
+            time_handlers.settings, "human_readable_format", "DD/MM/YYYY HH:mm"
+        )
+        timestamps = [1587999600, 1593472500]
+        frame = pd.DataFrame({"Open_time": timestamps})
+        frame.parse_datetime.to_human_readable(columns=["Open_time"])
+        assert list(frame.Open_time) == [
+            ParseDateTime(timestamp).to_human_readable()
+            for timestamp in timestamps
+        ]
+
+        frame.parse_datetime.to_timestamp(columns=["Open_time"])
+        assert list(frame.Open_time) == timestamps
+
+    def test_columns_already_converted_are_kept(self):
+        frame = pd.DataFrame({"Open_time": self.timestamps})
+        frame.parse_datetime.to_timestamp(columns=["Open_time"])
+
+        assert list(frame.Open_time) == self.timestamps
+
+    def test_empty_columns(self):
+        frame = pd.DataFrame({"Open_time": pd.Series([], dtype="int64")})
+        frame.parse_datetime.to_human_readable(columns=["Open_time"])
+        assert frame.empty
+
+        frame.parse_datetime.to_timestamp(columns=["Open_time"])
+        assert frame.empty
+
+    def test_invalid_datetime_strings(self):
+        frame = pd.DataFrame({"Open_time": ["2020-13-45 99:00:00"]})
+        with pytest.raises(TimeFormatError):
+            frame.parse_datetime.to_timestamp(columns=["Open_time"])
+
+
+def test_int_timestamp():
+    assert int_timestamp("1577836800") == 1577836800
+    assert int_timestamp("2020-01-01 00:00:00") == 1577836800
+    with pytest.raises(TimeFormatError):
+        int_timestamp("garbage")
+
+
+def test_strptime_format():
+    assert strptime_format("YYYY-MM-DD HH:mm:ss") == "%Y-%m-%d %H:%M:%S"
+
+
+def test_months_have_no_fixed_length():
+    assert time_frame_to_seconds("15m") == 900
+    with pytest.raises(ValueError):
+        time_frame_to_seconds("1M")